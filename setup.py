@@ -22,7 +22,6 @@ setup(
         "requests",
         "tqdm",
         "humanfriendly",
-        "prance",
         "openapi-spec-validator"
     ],
     entry_points="""
@@ -0,0 +1,44 @@
+"""Compares generated serializers with pyserde to_dict on request bodies.
+
+Usage: python -m tests.benchmarks.bench_serializers [number_of_objects]
+"""
+import sys
+import timeit
+
+from serde import to_dict
+
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailResult, TestRailSection
+from trcli.data_classes.serializers import fast_to_dict
+
+
+def build_objects(amount: int) -> dict:
+    results = [
+        TestRailResult(case_id=i, elapsed="1.5", comment="Type: \nMessage: \nText: ", attachments=[])
+        for i in range(amount)
+    ]
+    cases = [
+        TestRailCase(
+            title=f"test_{i}",
+            section_id=1,
+            custom_automation_id=f"tests.module.test_{i}",
+            case_fields={"template_id": 1},
+        )
+        for i in range(amount)
+    ]
+    sections = [TestRailSection(name=f"Section {i}", suite_id=1) for i in range(amount)]
+    return {"TestRailResult": results, "TestRailCase": cases, "TestRailSection": sections}
+
+
+def main(amount: int = 20000):
+    print(f"Serializing {amount} objects of each class (best of 3)")
+    for name, objects in build_objects(amount).items():
+        pyserde_time = min(timeit.repeat(lambda: [to_dict(obj) for obj in objects], number=1, repeat=3))
+        fast_time = min(timeit.repeat(lambda: [fast_to_dict(obj) for obj in objects], number=1, repeat=3))
+        print(
+            f"{name:<16} pyserde: {pyserde_time:.3f}s  generated: {fast_time:.3f}s  "
+            f"speedup: {pyserde_time / fast_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -1,6 +1,41 @@
 from typing import List
+
+from tests.helpers.api_client_helpers import TEST_RAIL_URL, create_url
 from trcli.api.api_request_handler import ProjectData
 from trcli.api.results_uploader import ResultsUploader
+from trcli.cli import Environment
+from trcli.data_classes.data_parsers import MatchersParser
+
+
+def api_environment(**parameters) -> Environment:
+    """Environment uploading silently to the mocked TestRail instance (see mock_project_metadata)."""
+    environment = Environment()
+    environment.host = TEST_RAIL_URL
+    environment.project = "Test Project"
+    environment.batch_size = 10
+    environment.silent = True
+    environment.auto_creation_response = True
+    environment.case_matcher = MatchersParser.AUTO
+    for name, value in parameters.items():
+        setattr(environment, name, value)
+    return environment
+
+
+def mock_project_metadata(requests_mock, suites: List[dict]):
+    """
+    Mocks multi-suite project "Test Project" (ID 1) with the given suites and automation ID case field.
+    :returns: mocks of get_projects and get_case_fields requests
+    """
+    get_projects = requests_mock.get(
+        create_url("get_projects"),
+        json={"_links": {"next": None}, "projects": [{"id": 1, "name": "Test Project", "suite_mode": 3}]},
+    )
+    get_case_fields = requests_mock.get(
+        create_url("get_case_fields"),
+        json=[{"system_name": "custom_automation_id", "is_active": True, "configs": []}],
+    )
+    requests_mock.get(create_url("get_suites/1"), json=suites)
+    return get_projects, get_case_fields
 
 
 def upload_results_inner_functions_mocker(
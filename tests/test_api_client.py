@@ -1,7 +1,10 @@
+import json
+
 import pytest
 from trcli.constants import FAULT_MAPPING
 from trcli.cli import Environment
 from trcli.api.api_client import APIClient
+from trcli.api.json_stream import EntityListDecoder
 from requests.exceptions import RequestException, Timeout, ConnectionError
 from tests.helpers.api_client_helpers import (
     TEST_RAIL_URL,
@@ -66,6 +69,34 @@ class TestAPIClient:
         check_calls_count(requests_mock)
         check_response(201, FAKE_PROJECT_DATA, "", response)
 
+    @pytest.mark.api_client
+    def test_send_get_with_fields_projection(self, api_resources, requests_mock):
+        """The purpose of this test is to check that only requested fields of returned entities are kept,
+        also for paginated responses."""
+        mocked_response = {
+            "offset": 0,
+            "_links": {"next": None, "prev": None},
+            "tests": [
+                {"id": 1, "case_id": 10, "title": "Test 1", "custom_steps": "Long text"},
+                {"id": 2, "case_id": 20, "title": "Test 2", "custom_steps": "Long text"},
+            ],
+        }
+        requests_mock.get(create_url("get_tests/1"), status_code=200, json=mocked_response)
+        api_client = api_resources
+        response = api_client.send_get("get_tests/1", fields=("id", "case_id"))
+
+        check_calls_count(requests_mock)
+        check_response(
+            200,
+            {
+                "offset": 0,
+                "_links": {"next": None, "prev": None},
+                "tests": [{"id": 1, "case_id": 10}, {"id": 2, "case_id": 20}],
+            },
+            "",
+            response,
+        )
+
     @pytest.mark.api_client
     def test_send_get_status_code_not_success(self, api_resources, requests_mock):
         """The purpose of this test is to check behaviour of send_get one receiving not successful status code.
@@ -280,3 +311,23 @@ class TestAPIClient:
         else:
             with pytest.raises(AssertionError):
                 environment.log.assert_has_calls([mocker.call(TIMEOUT_PARSE_ERROR)])
+
+    @pytest.mark.api_client
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024], ids=["1 byte", "7 bytes", "64KB"])
+    def test_entity_list_decoder_projects_while_streaming(self, chunk_size):
+        """The purpose of this test is to check that entity lists split in any chunks are decoded
+        the same as with json module, keeping only requested fields."""
+        page = {
+            "offset": 0,
+            "limit": 250,
+            "_links": {"next": "/api/v2/get_cases/1&offset=250", "prev": None},
+            "cases": [
+                {"id": 1, "section_id": 2, "title": "Café case", "custom_steps": [{"content": "step"}]},
+                {"id": 12345, "section_id": 2, "title": "Second", "custom_automation_id": "a.b"},
+            ],
+            "size": 2,
+        }
+        body = json.dumps(page, indent=2, ensure_ascii=False).encode("utf-8")
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        decoded = EntityListDecoder("cases", ("id", "title", "custom_automation_id")).decode(chunks)
+        assert decoded == APIClient.project_fields(page, ("id", "title", "custom_automation_id"))
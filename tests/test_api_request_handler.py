@@ -382,7 +382,8 @@ class TestApiRequestHandler:
 
         with patch("builtins.open", mock_open()) as mock_file:
             resources_added, error, results_added = api_request_handler.add_results(run_id)
-            assert [mocked_response] == resources_added, "Invalid response from add_results"
+            assert [[{"id": result_id, "test_id": 4}]] == resources_added, \
+                "Only fields needed for attachments should be kept from add_results response"
             assert error == "", "Error occurred in add_results"
             assert results_added == len(mocked_response), \
                 f"Expected {len(mocked_response)} results to be added but got {results_added} instead."
@@ -448,6 +449,50 @@ class TestApiRequestHandler:
         assert missing_ids, "There is one missing test case"
         assert error == "", "Error occurred in check"
 
+    @pytest.mark.api_handler
+    def test_check_missing_test_cases_ids_uses_case_index(
+        self, api_request_handler: ApiRequestHandler, requests_mock
+    ):
+        project_id = 3
+        suite_id = api_request_handler.suites_data_from_provider.suite_id
+        api_request_handler.case_index = {}
+        mocked_response = {
+            "_links": {"next": None, "prev": None},
+            "cases": [
+                {"title": "testCase1", "custom_automation_id": "Skipped test.testCase1", "id": 1, "section_id": 1234},
+            ],
+        }
+        get_cases = requests_mock.get(
+            create_url(f"get_cases/{project_id}&suite_id={suite_id}"),
+            json=mocked_response,
+        )
+        api_request_handler.check_missing_test_cases_ids(project_id)
+        missing_ids, error = api_request_handler.check_missing_test_cases_ids(project_id)
+
+        assert get_cases.call_count == 1, "Cases should be fetched only once"
+        assert api_request_handler.case_index == {suite_id: mocked_response["cases"]}
+        assert missing_ids, "There are missing test cases"
+        assert error == "", "Error occurred in check"
+
+    @pytest.mark.api_handler
+    def test_add_cases_to_run(self, api_request_handler: ApiRequestHandler, requests_mock):
+        run_id = 11
+        requests_mock.get(
+            create_url(f"get_tests/{run_id}"),
+            json={"_links": {"next": None, "prev": None}, "tests": [{"id": 100, "case_id": 5}]},
+        )
+        update_run = requests_mock.post(create_url(f"update_run/{run_id}"), json={"id": run_id})
+
+        assert api_request_handler.add_cases_to_run(run_id) == "", "Error occurred in add_cases_to_run"
+        assert update_run.last_request.json() == {"case_ids": [5, 1]}, "Missing case should be added to the run"
+
+        requests_mock.get(
+            create_url(f"get_tests/{run_id}"),
+            json={"_links": {"next": None, "prev": None}, "tests": [{"id": 100, "case_id": 5}, {"id": 101, "case_id": 1}]},
+        )
+        api_request_handler.add_cases_to_run(run_id)
+        assert update_run.call_count == 1, "Run should not be updated when all cases are included"
+
     @pytest.mark.api_handler
     def test_check_missing_test_cases_ids_false(
         self, api_request_handler: ApiRequestHandler, requests_mock, mocker
@@ -105,6 +105,45 @@ class TestCli:
             expected_output in result.output
         ), f"Error message: '{expected_output}' expected.\nGot: {result.output} instead."
 
+    @pytest.mark.cli
+    @pytest.mark.parametrize(
+        "other_args, other_option",
+        [
+            (["--special-parser", "saucectl"], "--special-parser saucectl"),
+            (["--watch", "."], "--watch"),
+        ],
+        ids=["saucectl", "watch"],
+    )
+    def test_pipeline_rejected_with_unsupported_options(self, other_args, other_option, mocker, cli_resources):
+        cli_agrs_helper, cli_runner = cli_resources
+        args = [
+            "--host", "https://fake_host.com/",
+            *cli_agrs_helper.get_all_required_parameters_without_specified(["host"]),
+            "--pipeline",
+            *other_args,
+        ]
+        mocker.patch("sys.argv", ["trcli", *args])
+        result = cli_runner.invoke(cli, args)
+        assert result.exit_code == 1, f"Exit code 1 expected. Got: {result.exit_code} instead."
+        assert FAULT_MAPPING["incompatible_options"].format(option="--pipeline", other_option=other_option) \
+            in result.output
+
+    @pytest.mark.cli
+    def test_flag_deleted_requires_sync_state(self, mocker, cli_resources):
+        cli_agrs_helper, cli_runner = cli_resources
+        args = [
+            "--host", "https://fake_host.com/",
+            *cli_agrs_helper.get_all_required_parameters_without_specified(["host", "parse_junit", "title", "file"]),
+            "parse_openapi",
+            "--file", "fake_spec.yaml",
+            "--flag-deleted",
+        ]
+        mocker.patch("sys.argv", ["trcli", *args])
+        result = cli_runner.invoke(cli, args)
+        assert result.exit_code == 1, f"Exit code 1 expected. Got: {result.exit_code} instead."
+        assert FAULT_MAPPING["option_requires_other"].format(option="--flag-deleted", other_option="--sync-state") \
+            in result.output
+
     @pytest.mark.api_client
     @pytest.mark.parametrize(
         "host",
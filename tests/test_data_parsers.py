@@ -0,0 +1,47 @@
+import pytest
+
+from trcli.data_classes.data_parsers import FieldsParser, MatchersParser
+
+
+class TestMatchersParser:
+    @pytest.mark.data_parsers
+    @pytest.mark.parametrize(
+        "case_name, expected",
+        [
+            ("C123 my test case", (123, "my test case")),
+            ("my test case C123", (123, "my test case")),
+            ("C123_my_test_case", (123, "my_test_case")),
+            ("my_test_case_C123", (123, "my_test_case")),
+            ("module_1_C123_my_test_case", (123, "module_1_my_test_case")),
+            ("[C123] my test case", (123, "my test case")),
+            ("my test case [C123]", (123, "my test case")),
+            ("module 1 [C123] my test case", (123, "module 1 my test case")),
+            ("my_test_C1 case C2", (2, "my_test_C1 case")),
+            ("my test case [C1a] c123x", (None, "my test case [C1a] c123x")),
+            ("my test case", (None, "my test case")),
+        ],
+    )
+    def test_parse_name_with_id(self, case_name: str, expected: tuple):
+        assert MatchersParser.parse_name_with_id(case_name) == expected
+
+
+class TestFieldsParser:
+    @pytest.mark.data_parsers
+    def test_resolve_fields_parses_literals_safely(self):
+        fields, error = FieldsParser.resolve_fields(
+            ["refs:[1, 2]", "nested:[1, [2, 'a']]", "code:[__import__('os').getcwd()]", "plain:value"]
+        )
+        assert error is None
+        assert fields == {
+            "refs": [1, 2],
+            "nested": [1, [2, "a"]],
+            "code": "[__import__('os').getcwd()]",
+            "plain": "value",
+        }
+
+    @pytest.mark.data_parsers
+    def test_resolve_fields_returns_own_copies_of_cached_literals(self):
+        first, _ = FieldsParser.resolve_fields(["refs:[1, 2]"])
+        first["refs"].append(3)
+        second, _ = FieldsParser.resolve_fields(["refs:[1, 2]"])
+        assert second["refs"] == [1, 2]
@@ -9,7 +9,9 @@ from trcli.data_classes.dataclass_testrail import (
     TestRailCase,
     TestRailSection,
 )
+from serde import to_dict
 from serde.json import to_json
+from trcli.data_classes.serializers import fast_to_dict
 from trcli.data_classes.validation_exception import ValidationException
 
 
@@ -91,3 +93,21 @@ class TestDataClassCreation:
     def test_validation_error_for_section(self):
         with pytest.raises(ValidationException):
             TestRailSection(suite_id=1, name="")
+
+    @pytest.mark.dataclass
+    @pytest.mark.parametrize(
+        "dataclass_instance",
+        [
+            TestRailResult(case_id=1, elapsed="40", comment="", attachments=["file.txt"]),
+            TestRailResult(),
+            TestRailCase(title="Case", section_id=1, custom_automation_id="module.Case", case_fields={"a": 1}),
+            TestRailSection(name="Section", suite_id=1, section_id=3),
+            TestRailSuite(name="Suite", description="Description", source="file.xml"),
+            TestRailProperty("Some property", "True"),
+        ],
+        ids=["Result", "Empty result", "Case", "Section", "Suite", "Property"],
+    )
+    def test_fast_serializer_matches_pyserde(self, dataclass_instance):
+        assert fast_to_dict(dataclass_instance) == to_dict(
+            dataclass_instance
+        ), "Generated serializer output differs from pyserde"
@@ -1,4 +1,13 @@
+import functools
+import gzip
 import json
+import multiprocessing
+import os
+import re
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
 from pathlib import Path
 from typing import Union
@@ -6,7 +15,7 @@ from xml.etree.ElementTree import ParseError
 
 import pytest
 from deepdiff import DeepDiff
-from junitparser import JUnitXmlError
+from junitparser import JUnitXml, JUnitXmlError
 
 from trcli import settings
 from trcli.cli import Environment
@@ -14,6 +23,7 @@ from trcli.data_classes.data_parsers import MatchersParser
 from trcli.data_classes.dataclass_testrail import TestRailSuite
 from trcli.data_classes.validation_exception import ValidationException
 from trcli.readers.junit_xml import JunitParser
+from trcli.readers.parse_cache import ParseCache
 
 
 class TestJunitParser:
@@ -91,6 +101,51 @@ class TestJunitParser:
         _compare(junit_outputs[0], Path(__file__).parent / "test_data/json/sauce1.json",)
         _compare(junit_outputs[1], Path(__file__).parent / "test_data/json/sauce2.json", )
 
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize("columnar", [False, True], ids=["objects", "columnar"])
+    def test_junit_xml_parser_sauce_properties_after_test_cases(self, columnar, freezer, tmp_path):
+        freezer.move_to("2020-05-20 01:00:00")
+        report = (Path(__file__).parent / "test_data/XML/sauce.xml").read_text()
+        moved = re.sub(r"(\s*<properties>.*?</properties>)(.*?)(\s*</testsuite>)", r"\2\1\3", report, flags=re.DOTALL)
+        assert moved != report
+        (tmp_path / "sauce.xml").write_text(moved)
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.special_parser = "saucectl"
+        env.columnar_results = columnar
+        env.file = Path(__file__).parent / "test_data/XML/sauce.xml"
+        expected = JunitParser(env).parse_file()
+        env.file = tmp_path / "sauce.xml"
+        parsed = JunitParser(env).parse_file()
+        if columnar:
+            assert [suite.result_store.comments for suite in parsed] == \
+                [suite.result_store.comments for suite in expected]
+            for suite in parsed + expected:
+                suite.result_store = None
+        else:
+            parsed = [self.__clear_unparsable_junit_elements(suite) for suite in parsed]
+            expected = [self.__clear_unparsable_junit_elements(suite) for suite in expected]
+        assert DeepDiff([asdict(suite) for suite in parsed], [asdict(suite) for suite in expected]) == {}, \
+            "Session URL should be added to results of test cases preceding the properties"
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_parser_sauce_columnar(self, freezer):
+        freezer.move_to("2020-05-20 01:00:00")
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = Path(__file__).parent / "test_data/XML/sauce.xml"
+        env.special_parser = "saucectl"
+        env.columnar_results = True
+        suites = JunitParser(env).parse_file()
+        assert [suite.name for suite in suites] == ["Firefox", "Chrome"]
+        for suite in suites:
+            store = suite.result_store
+            assert [store.automation_id(row) for row in range(len(store))] == [
+                case.custom_automation_id for section in suite.testsections for case in section.testcases
+            ]
+            assert all(comment.startswith("SauceLabs session: https://") for comment in store.comments)
+        assert suites[1].result_store.status_ids.tolist() == [5, 1]
+
     @pytest.mark.parse_junit
     @pytest.mark.parametrize(
         "matcher, input_xml_path, expected_path",
@@ -148,9 +203,11 @@ class TestJunitParser:
             JunitParser(env)
 
     @pytest.mark.parse_junit
-    def test_junit_xml_parser_validation_error(self):
+    @pytest.mark.parametrize("columnar", [False, True], ids=["objects", "columnar"])
+    def test_junit_xml_parser_validation_error(self, columnar):
         env = Environment()
         env.file = Path(__file__).parent / "test_data/XML/empty.xml"
+        env.columnar_results = columnar
         file_reader = JunitParser(env)
         with pytest.raises(ValidationException):
             file_reader.parse_file()
@@ -164,3 +221,208 @@ class TestJunitParser:
             for case in section.testcases:
                 case.result.junit_result_unparsed = []
         return test_rail_suite
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize(
+        "file_name",
+        ["root.xml", "no_root.xml", "required_only.xml", "milliseconds.xml", "nested_suites.xml"],
+    )
+    def test_junit_xml_streaming_matches_dom_parsing(self, file_name: str, freezer):
+        freezer.move_to("2020-05-20 01:00:00")
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = Path(__file__).parent / "test_data/XML" / file_name
+        file_reader = JunitParser(env)
+        streamed = self.__clear_unparsable_junit_elements(file_reader.parse_file()[0])
+        dom_suite = JUnitXml.fromfile(
+            file_reader.filepath, parse_func=JunitParser._add_root_element_to_tree
+        )
+        parsed = self.__clear_unparsable_junit_elements(file_reader._parse_suite(dom_suite))
+        assert DeepDiff(asdict(streamed), asdict(parsed)) == {}, \
+            f"Streamed parsing differs from parsing whole document \n{DeepDiff(asdict(streamed), asdict(parsed))}"
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_multiple_files_merged_in_memory(self, freezer, tmp_path, monkeypatch):
+        freezer.move_to("2020-05-20 01:00:00")
+        monkeypatch.chdir(tmp_path)
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = Path(__file__).parent / "test_data/XML/merge/report_*.xml"
+        file_reader = JunitParser(env)
+        parsed = self.__clear_unparsable_junit_elements(file_reader.parse_file()[0])
+        reports = sorted(env.file.parent.glob(env.file.name))
+        merged_report = JUnitXml.fromfile(str(reports[0]), parse_func=JunitParser._add_root_element_to_tree)
+        for report in reports[1:]:
+            merged_report += JUnitXml.fromfile(str(report))
+        expected = self.__clear_unparsable_junit_elements(file_reader._parse_suite(merged_report))
+        assert [section.name for section in parsed.testsections] == ["Login", "Logout", "Login", "Search"]
+        assert DeepDiff(asdict(parsed), asdict(expected)) == {}, \
+            f"Reports merged in memory differ from merged report \n{DeepDiff(asdict(parsed), asdict(expected))}"
+        assert not list(tmp_path.iterdir()), "Merged report should not be written"
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize(
+        "file_name",
+        ["root.xml", "no_root.xml", "required_only.xml", "nested_suites.xml", "sauce.xml", "merge/report_2.xml"],
+    )
+    def test_junit_xml_parallel_parsing_matches_streaming(self, file_name: str, freezer, monkeypatch):
+        freezer.move_to("2020-05-20 01:00:00")
+        monkeypatch.setattr("trcli.readers.junit_xml.MAX_WORKERS_PARSE_FILES", 2)
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = Path(__file__).parent / "test_data/XML" / file_name
+        streamed = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+        env.parallel_parsing = True
+        parsed = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+        assert DeepDiff(asdict(parsed), asdict(streamed)) == {}, \
+            f"Parallel parsing differs from streamed parsing \n{DeepDiff(asdict(parsed), asdict(streamed))}"
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_multiple_files_parsed_by_spawned_workers(self, freezer, tmp_path, monkeypatch):
+        freezer.move_to("2020-05-20 01:00:00")
+        monkeypatch.setattr(
+            "trcli.readers.junit_xml.ProcessPoolExecutor",
+            functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+        )
+        monkeypatch.setattr(settings, "ALLOW_ELAPSED_MS", True)
+        report = (Path(__file__).parent / "test_data/XML/milliseconds.xml").read_bytes()
+        (tmp_path / "report_1.xml").write_bytes(report)
+        (tmp_path / "report_2.xml").write_bytes(report)
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = tmp_path / "report_1.xml"
+        expected = JunitParser(env).parse_file()[0]
+        env.file = tmp_path / "report_*.xml"
+        parsed = JunitParser(env).parse_file()[0]
+        elapsed = lambda suite: [case.result.elapsed for section in suite.testsections for case in section.testcases]
+        assert elapsed(expected) == ["0.005s", "10.001s"]
+        assert elapsed(parsed) == elapsed(expected) * 2, "Workers should use elapsed format of the command"
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize("parallel", [False, True], ids=["multiple files", "parallel parsing"])
+    def test_junit_xml_invalid_case_parsed_by_workers(self, parallel, tmp_path, monkeypatch):
+        monkeypatch.setattr("trcli.readers.junit_xml.MAX_WORKERS_PARSE_FILES", 2)
+        valid = '<testsuite name="valid"><testcase classname="c" name="test"/></testsuite>'
+        invalid = '<testsuite name="invalid"><testcase classname="c" name=""/></testsuite>'
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        if parallel:
+            (tmp_path / "report.xml").write_text(f"<testsuites>{valid}{invalid}</testsuites>")
+            env.file = tmp_path / "report.xml"
+            env.parallel_parsing = True
+            assert len(JunitParser.split_report(env.file)) == 2
+        else:
+            (tmp_path / "report_1.xml").write_text(valid)
+            (tmp_path / "report_2.xml").write_text(invalid)
+            env.file = tmp_path / "report_*.xml"
+        with pytest.raises(ValidationException) as exception:
+            JunitParser(env).parse_file()
+        assert (exception.value.field_name, exception.value.class_name, exception.value.reason) == \
+            ("title", "TestRailCase", "Title is empty.")
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_split_report_skips_comments(self, tmp_path):
+        report = tmp_path / "report.xml"
+        report.write_text(
+            '<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="root">'
+            '<testsuite name="first"><testsuite name="nested"/></testsuite>'
+            '<!-- <testsuite name="commented"> -->'
+            '<testsuite name="second" tests="0"/>'
+            '<testsuite name="third"><testcase name="test" classname="a"><system-out>'
+            '<![CDATA[</testsuite>]]></system-out></testcase></testsuite>'
+            '</testsuites>'
+        )
+        chunks = JunitParser.split_report(report)
+        content = report.read_bytes()
+        assert b"".join(content[start:end] for _, start, end, _ in chunks) == \
+            content[content.index(b"<testsuite "):content.rindex(b"</testsuites>")]
+        for _, start, _, _ in chunks:
+            assert content[start:].startswith((b'<testsuite name="first"', b'<testsuite name="second"',
+                                               b'<testsuite name="third"'))
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize("archive_name", ["reports.zip", "reports.tar", "reports.tar.gz", "reports.xml.gz"])
+    @pytest.mark.parametrize("parallel", [False, True], ids=["sequential", "parallel"])
+    def test_junit_xml_compressed_and_archived_reports(
+        self, archive_name: str, parallel: bool, freezer, tmp_path, monkeypatch
+    ):
+        freezer.move_to("2020-05-20 01:00:00")
+        monkeypatch.setattr("trcli.readers.junit_xml.MAX_WORKERS_PARSE_FILES", 2)
+        reports = sorted((Path(__file__).parent / "test_data/XML/merge").glob("report_*.xml"))
+        if archive_name.endswith(".xml.gz"):
+            reports = reports[:1]
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = reports[0] if len(reports) == 1 else reports[0].parent / "report_*.xml"
+        expected = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+
+        archive = tmp_path / archive_name
+        if archive_name.endswith(".zip"):
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as bundle:
+                for report in reports:
+                    bundle.write(report, f"results/{report.name}")
+                bundle.writestr("results/log.txt", "not a report")
+        elif archive_name.endswith(".xml.gz"):
+            archive.write_bytes(gzip.compress(reports[0].read_bytes()))
+        else:
+            with tarfile.open(archive, "w:gz" if archive_name.endswith(".gz") else "w") as bundle:
+                # Compressed reports inside of archives are decompressed too
+                bundle.add(reports[1], f"results/{reports[1].name}")
+                (tmp_path / f"{reports[0].name}.gz").write_bytes(gzip.compress(reports[0].read_bytes()))
+                bundle.add(tmp_path / f"{reports[0].name}.gz", f"results/{reports[0].name}.gz")
+        env.file = archive
+        env.parallel_parsing = parallel
+        parsed = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+        if len(reports) == 1:
+            assert parsed.source == "reports.xml.gz"
+            expected.source = parsed.source
+        assert DeepDiff(asdict(parsed), asdict(expected)) == {}, \
+            f"Archived reports differ from plain reports \n{DeepDiff(asdict(parsed), asdict(expected))}"
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_parse_cache(self, freezer, tmp_path, monkeypatch):
+        freezer.move_to("2020-05-20 01:00:00")
+        monkeypatch.setattr("trcli.readers.junit_xml.PARSE_CACHE_DIR", tmp_path / "cache")
+        report = tmp_path / "report.xml"
+        report.write_bytes((Path(__file__).parent / "test_data/XML/no_root.xml").read_bytes())
+        env = Environment()
+        env.case_matcher = MatchersParser.AUTO
+        env.file = report
+        env.parse_cache = True
+        parsed = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+
+        freezer.move_to("2020-05-21 01:00:00")
+        monkeypatch.setattr(JunitParser, "_iter_suites", lambda *args: pytest.fail("Report parsed again"))
+        cached = self.__clear_unparsable_junit_elements(JunitParser(env).parse_file()[0])
+        assert cached.name == "report.xml 21-05-20 01:00:00", "Generated suite name should use current time"
+        cached.name = parsed.name
+        assert DeepDiff(asdict(cached), asdict(parsed)) == {}, \
+            f"Cached report differs from parsed report \n{DeepDiff(asdict(cached), asdict(parsed))}"
+
+        env.case_matcher = MatchersParser.NAME
+        with pytest.raises(pytest.fail.Exception, match="Report parsed again"):
+            JunitParser(env).parse_file()
+
+    @pytest.mark.parse_junit
+    def test_junit_xml_parse_cache_eviction(self, tmp_path):
+        cache = ParseCache(tmp_path, max_size=300, max_age=60)
+        for key in ("old", "unused"):
+            assert cache.store(key, b"x" * 100)
+        now = time.time()
+        os.utime(tmp_path / "old.pickle", (now - 30, now - 30))
+        os.utime(tmp_path / "unused.pickle", (now - 20, now - 20))
+        assert cache.load("old") is not None, "Loaded entry should become recently used"
+        assert cache.store("newest", b"x" * 100)
+        assert sorted(path.stem for path in tmp_path.iterdir()) == ["newest", "old"]
+
+        os.utime(tmp_path / "old.pickle", (now - 120, now - 120))
+        (tmp_path / "stale.tmp").write_bytes(b"x")
+        os.utime(tmp_path / "stale.tmp", (now - 120, now - 120))
+        cache.evict()
+        assert [path.name for path in tmp_path.iterdir()] == ["newest.pickle"]
+
+        nested = []
+        for _ in range(100000):
+            nested = [nested]
+        assert not cache.store("nested", nested)
+        assert [path.name for path in tmp_path.iterdir()] == ["newest.pickle"], "Temporary file should be removed"
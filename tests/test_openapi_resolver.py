@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from openapi_spec_validator.readers import read_from_filename
+
+from trcli.readers.openapi_resolver import OpenApiRefResolver, ResolutionCache
+
+
+class TestOpenApiRefResolver:
+    @pytest.mark.parse_openapi
+    def test_references_share_resolved_objects(self):
+        spec = {
+            "paths": {
+                "/users": {"get": {"responses": {"200": {"$ref": "#/components/responses/Users"}}}},
+                "/admins": {"get": {"responses": {"200": {"$ref": "#/components/responses/Users"}}}},
+            },
+            "components": {
+                "responses": {"Users": {"description": "Users", "schema": {"$ref": "#/components/schemas/User"}}},
+                "schemas": {"User": {"type": "object", "properties": {"name": {"type": "string"}}}},
+            },
+        }
+        resolved = OpenApiRefResolver(spec).resolve()
+
+        users = resolved["paths"]["/users"]["get"]["responses"]["200"]
+        assert users == {"description": "Users", "schema": spec["components"]["schemas"]["User"]}
+        assert users is resolved["paths"]["/admins"]["get"]["responses"]["200"]
+        assert users["schema"] is resolved["components"]["schemas"]["User"]
+        assert "$ref" in spec["paths"]["/users"]["get"]["responses"]["200"], "Specification should not be modified"
+
+    @pytest.mark.parse_openapi
+    def test_sibling_keys_of_references_ignored(self):
+        spec = {
+            "components": {
+                "schemas": {
+                    "Kind": {"type": "string", "description": "Kind"},
+                    "Role": {"properties": {"kind": {"$ref": "#/components/schemas/Kind", "description": "Role kind"}}},
+                }
+            }
+        }
+        resolver = OpenApiRefResolver(spec)
+        resolved = resolver.resolve()
+
+        kind = resolved["components"]["schemas"]["Role"]["properties"]["kind"]
+        assert kind == {"type": "string", "description": "Kind"}
+        assert resolver.ignored_siblings == ["#/components/schemas/Kind"]
+
+    @pytest.mark.parse_openapi
+    def test_cyclic_references_are_kept(self):
+        spec = {
+            "components": {
+                "schemas": {
+                    "Node": {"type": "object", "properties": {"children": {"$ref": "#/components/schemas/Nodes"}}},
+                    "Nodes": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+                    "Loop": {"$ref": "#/components/schemas/Loop"},
+                }
+            }
+        }
+        resolved = OpenApiRefResolver(spec).resolve()
+
+        nodes = resolved["components"]["schemas"]["Node"]["properties"]["children"]
+        assert nodes["items"] == {"$ref": "#/components/schemas/Node"}
+        assert resolved["components"]["schemas"]["Loop"] == {"$ref": "#/components/schemas/Loop"}
+        json.dumps(resolved)
+
+    @pytest.mark.parse_openapi
+    def test_file_references_and_escaped_pointers(self, tmp_path):
+        (tmp_path / "common.json").write_text(
+            json.dumps({"schemas": {"a/b": {"type": "string"}, "Ref": {"$ref": "#/schemas/a~1b"}}})
+        )
+        spec = {"paths": {"/a": {"$ref": "common.json#/schemas/Ref"}, "/b": {"$ref": "#/paths/~1a"}}}
+        resolved = OpenApiRefResolver(spec, tmp_path / "spec.json").resolve()
+
+        assert resolved["paths"] == {"/a": {"type": "string"}, "/b": {"type": "string"}}
+        with pytest.raises(ValueError, match="Unresolvable reference"):
+            OpenApiRefResolver({"a": {"$ref": "#/missing"}}).resolve()
+
+    @pytest.mark.parse_openapi
+    def test_resolution_cache_shared_by_specs(self, tmp_path, monkeypatch):
+        (tmp_path / "common.json").write_text(json.dumps({"schemas": {"User": {"$ref": "types.json#/Name"}}}))
+        (tmp_path / "types.json").write_text(json.dumps({"Name": {"type": "string"}}))
+        reads = []
+        monkeypatch.setattr(
+            "trcli.readers.openapi_resolver.read_from_filename", lambda path: reads.append(path) or read_from_filename(path)
+        )
+        cache = ResolutionCache()
+        resolvers = [
+            OpenApiRefResolver({"paths": {name: {"$ref": "common.json#/schemas/User"}}}, tmp_path / f"{name}.json", cache)
+            for name in ("users", "admins")
+        ]
+        users, admins = [resolver.resolve() for resolver in resolvers]
+
+        assert users["paths"]["users"] == {"type": "string"}
+        assert users["paths"]["users"] is admins["paths"]["admins"], "Shared components should be resolved once"
+        assert len(reads) == 2, "Referenced files should be read once"
+        assert resolvers[1].external_documents == [str(tmp_path / "common.json"), str(tmp_path / "types.json")]
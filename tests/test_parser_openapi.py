@@ -1,12 +1,21 @@
+import json
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
+import yaml
 
 from trcli.cli import Environment
 from trcli.data_classes.data_parsers import MatchersParser
 from trcli.data_classes.dataclass_testrail import TestRailSuite
-from trcli.readers.openapi import OpenApiParser
+from trcli.data_providers.api_data_provider import ApiDataProvider
+from trcli.readers.file_parser import BufferedLog
+from trcli.readers.openapi import OpenApiParser, parse_openapi_specs, OpenApiTestCase, SchemaRenderer
+from trcli.readers.openapi_resolver import OpenApiRefResolver
 
 
 class TestOpenApiParser:
@@ -75,6 +84,255 @@ class TestOpenApiParser:
     def test_openapi_parser_system(self, data_flow):
         self.__parser_check(data_flow, type="system")
 
+    @pytest.mark.parse_openapi
+    @pytest.mark.parametrize(
+        "file_name, validation, valid",
+        [
+            ("undefined_path_parameter.json", "full", False),
+            ("undefined_path_parameter.json", "structural", True),
+            ("system/ui_doorway_swagger.json", "structural", False),
+            ("system/ui_doorway_swagger.json", "off", True),
+            ("layout/openapi_20.json", "off", False),
+        ],
+    )
+    def test_openapi_parser_validation_modes(self, file_name, validation, valid, tmp_path, monkeypatch):
+        # Structurally valid spec with a path parameter which is not defined
+        (tmp_path / "undefined_path_parameter.json").write_text(json.dumps({
+            "openapi": "3.0.1",
+            "info": {"title": "Users", "version": "1.0"},
+            "paths": {"/users/{user_id}": {"get": {"responses": {"200": {"description": "User"}}}}},
+        }))
+        env = Environment()
+        env.file = tmp_path / file_name if file_name == "undefined_path_parameter.json" \
+            else Path(__file__).parent / "test_data/openapi" / file_name
+        env.validation = validation
+        parser = OpenApiParser(env)
+        monkeypatch.setattr(parser, "log", MagicMock())
+        if valid:
+            assert parser.resolve_openapi_spec()["paths"]
+        else:
+            with pytest.raises(Exception):
+                parser.resolve_openapi_spec()
+
+    @pytest.mark.parse_openapi
+    def test_openapi_parser_validation_off_parses_rejected_spec(self, monkeypatch):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/system/authn_swagger.json"
+        env.silent = True
+        parser = OpenApiParser(env)
+        monkeypatch.setattr(parser, "log", MagicMock())
+        with pytest.raises(Exception):
+            parser.resolve_openapi_spec()
+        env.validation = "off"
+        parser = OpenApiParser(env)
+        monkeypatch.setattr(parser, "log", MagicMock())
+        suite = parser.parse_file(False)[0]
+        assert [case for section in suite.testsections for case in section.testcases], \
+            "Spec with tag groups rejected by full validation should be parsed"
+
+    @pytest.mark.parse_openapi
+    def test_openapi_parser_parse_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("trcli.readers.openapi.PARSE_CACHE_DIR", tmp_path / "cache")
+        spec = tmp_path / "openapi_30.json"
+        spec.write_bytes((Path(__file__).parent / "test_data/openapi/layout/openapi_30.json").read_bytes())
+        env = Environment()
+        env.file = spec
+        env.parse_cache = True
+        resolved = OpenApiParser(env).resolve_openapi_spec()
+
+        with monkeypatch.context() as patch:
+            patch.setattr(OpenApiRefResolver, "resolve", lambda *args: pytest.fail("Spec resolved again"))
+            assert OpenApiParser(env).resolve_openapi_spec() == resolved
+
+        spec.write_text(spec.read_text().replace('"openapi": "3.0', '"openapi": "1.0', 1))
+        with pytest.raises(Exception) as error:
+            OpenApiParser(env).resolve_openapi_spec()
+        with monkeypatch.context() as patch:
+            patch.setattr(OpenApiRefResolver, "resolve", lambda *args: pytest.fail("Spec resolved again"))
+            with pytest.raises(type(error.value)):
+                OpenApiParser(env).resolve_openapi_spec()
+
+    @pytest.mark.parse_openapi
+    def test_openapi_schema_rendering_memoized(self, monkeypatch):
+        schema = {"type": "object", "properties": {"name": {"type": "string", "description": "Name"}}}
+        renderer = SchemaRenderer()
+        text = renderer.render(schema)
+        assert text == "".join(f"    {line}" for line in yaml.safe_dump(schema).splitlines(keepends=True))
+
+        monkeypatch.setattr("trcli.readers.openapi.yaml.dump", lambda *args, **kwargs: pytest.fail("Rendered again"))
+        case = OpenApiTestCase(
+            "/users", "get", "200", "Users", request_details={}, response_details={"content": schema},
+            renderer=renderer
+        )
+        assert case.expected.endswith(text)
+
+    @pytest.mark.parse_openapi
+    def test_openapi_shared_schema_rendering(self, monkeypatch):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/layout/openapi_30.json"
+        env.silent = True
+        inline = OpenApiParser(env).parse_file(False)[0]
+        env.schema_rendering = "shared"
+        shared = OpenApiParser(env).parse_file(False)[0]
+        monkeypatch.setattr("trcli.readers.openapi.OPENAPI_PARALLEL_MIN_OPERATIONS", 1)
+        monkeypatch.setattr("trcli.readers.openapi.MAX_WORKERS_OPENAPI_CASES", 2)
+        shared_parallel = OpenApiParser(env).parse_file(False)[0]
+
+        inline_cases, shared_cases, shared_parallel_cases = [
+            [case for section in suite.testsections for case in section.testcases]
+            for suite in (inline, shared, shared_parallel)
+        ]
+        inline.case_renderer.render(inline_cases)
+        shared.case_renderer.render(shared_cases)
+        shared_parallel.case_renderer.render(shared_parallel_cases)
+        assert [case.case_fields for case in shared_cases] == [case.case_fields for case in shared_parallel_cases]
+        fields = ("custom_preconds", "custom_steps", "custom_expected")
+        texts = lambda case: [case.case_fields[field] for field in fields]
+        size = lambda cases: sum(len(text) for case in cases for text in texts(case))
+        assert size(shared_cases) < size(inline_cases)
+        assert any(
+            "$ref: '#/components/schemas/" in case.case_fields["custom_expected"] for case in shared_cases
+        ), "Component schemas should be referenced by name"
+        for section in shared.testsections:
+            referenced = {
+                name
+                for case in section.testcases
+                for text in texts(case)
+                for name in re.findall(r"\$ref: '#/components/schemas/([^']+)'", text)
+            }
+            for name in referenced:
+                assert f"\n    {name}:\n" in section.description, f"Schema {name} should be in section {section.name}"
+
+    @pytest.mark.parse_openapi
+    def test_openapi_case_text_limit(self):
+        details = {"content": {"application/json": {"schema": {"type": "string", "description": "x" * 500}}}}
+        case = OpenApiTestCase("/users", "get", "200", "Users", request_details={}, response_details=details)
+        limited = OpenApiTestCase(
+            "/users", "get", "200", "Users", request_details={}, response_details=details, text_limit=100
+        )
+        texts, limited_texts = case.texts, limited.texts
+        assert limited_texts["custom_steps"] == texts["custom_steps"]
+        assert limited_texts["custom_expected"] == (
+            texts["custom_expected"][:100]
+            + f"\n\n... ({len(texts['custom_expected']) - 100} more characters, see the specification)"
+        )
+
+    @pytest.mark.parse_openapi
+    def test_openapi_shared_schema_renderer_pickled(self):
+        user = {"type": "object", "properties": {"name": {"type": "string"}}}
+        users = {"type": "array", "items": user}
+        renderer = pickle.loads(pickle.dumps(SchemaRenderer({"User": user, "Users": users})))
+        # Schemas are resolved in the spec, the unpickled renderer recognizes schemas of the unpickled spec
+        users = renderer.schemas["Users"]
+        assert renderer.render({"schema": users}) == "    schema:\n      $ref: '#/components/schemas/Users'\n"
+        assert renderer.component_names([{"schema": users}]) == ["Users", "User"]
+        assert "$ref: '#/components/schemas/User'" in renderer.render_components(["Users"])
+
+    @pytest.mark.parse_openapi
+    def test_openapi_parallel_case_rendering(self, monkeypatch):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/layout/openapi_30.json"
+        env.silent = True
+        expected = OpenApiParser(env).parse_file(False)[0]
+        monkeypatch.setattr("trcli.readers.openapi.OPENAPI_PARALLEL_MIN_OPERATIONS", 1)
+        monkeypatch.setattr("trcli.readers.openapi.MAX_WORKERS_OPENAPI_CASES", 2)
+        parsed = OpenApiParser(env).parse_file(False)[0]
+        parsed_cases = [case for section in parsed.testsections for case in section.testcases]
+        assert not any(case.rendered for case in parsed_cases), "Texts should be rendered only when needed"
+        parsed.case_renderer.render(parsed_cases)
+        expected.case_renderer.render([case for section in expected.testsections for case in section.testcases])
+        assert [section.name for section in parsed.testsections] == [section.name for section in expected.testsections]
+        assert [
+            (case.custom_automation_id, case.case_fields) for section in parsed.testsections for case in section.testcases
+        ] == [
+            (case.custom_automation_id, case.case_fields) for section in expected.testsections for case in section.testcases
+        ]
+
+    @pytest.mark.parse_openapi
+    def test_openapi_parallel_case_rendering_in_thread(self, monkeypatch):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/layout/openapi_30.json"
+        env.silent = True
+        expected = OpenApiParser(env).parse_file(False)[0]
+        expected_cases = [case for section in expected.testsections for case in section.testcases]
+        expected.case_renderer.render(expected_cases)
+        monkeypatch.setattr("trcli.readers.openapi.OPENAPI_PARALLEL_MIN_OPERATIONS", 1)
+        monkeypatch.setattr("trcli.readers.openapi.MAX_WORKERS_OPENAPI_CASES", 2)
+        start_methods = []
+
+        def process_pool(*args, mp_context=None, **kwargs):
+            start_methods.append(mp_context.get_start_method() if mp_context else None)
+            return ProcessPoolExecutor(*args, mp_context=mp_context, **kwargs)
+
+        monkeypatch.setattr("trcli.readers.openapi.ProcessPoolExecutor", process_pool)
+        parsed = OpenApiParser(env).parse_file(False)[0]
+        parsed_cases = [case for section in parsed.testsections for case in section.testcases]
+        # Suites are uploaded by threads, workers rendering cases are not forked from the multi-threaded process
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(parsed.case_renderer.render, parsed_cases).result()
+        assert start_methods == ["spawn"]
+        assert [case.case_fields for case in parsed_cases] == [case.case_fields for case in expected_cases]
+
+    @pytest.mark.parse_openapi
+    def test_openapi_case_texts_rendered_when_sent(self):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/layout/openapi_30.json"
+        env.silent = True
+        suite = OpenApiParser(env).parse_file(False)[0]
+        cases = [case for section in suite.testsections for case in section.testcases]
+        for case_id, case in enumerate(cases[1:], start=1):
+            case.case_id = case_id
+
+        added_cases = ApiDataProvider(suite).add_cases()
+        assert added_cases == [cases[0]]
+        assert cases[0].rendered and "custom_steps" in cases[0].to_dict()
+        assert not any(case.rendered for case in cases[1:]), "Texts of matched cases should not be rendered"
+        assert "custom_steps" in cases[1].to_dict(), "Texts should be rendered when the body is needed"
+
+    @pytest.mark.parse_openapi
+    @pytest.mark.parametrize("verbose", [False, True])
+    def test_openapi_parser_diagnostics(self, verbose, capsys):
+        env = Environment()
+        env.file = Path(__file__).parent / "test_data/openapi/layout/openapi_30.json"
+        env.verbose = verbose
+        suite = OpenApiParser(env).parse_file(False)[0]
+        output = capsys.readouterr().out
+        case_lines = [f" ... {case.title}" for section in suite.testsections for case in section.testcases]
+        assert all((line in output) == verbose for line in case_lines), "Case lines should be logged only in verbose mode"
+        assert output.index("=====") < output.index(" test cases in "), "Diagnostics should be written before summary"
+
+    @pytest.mark.parse_openapi
+    def test_buffered_log_keeps_order(self, capsys):
+        env = Environment()
+        env.verbose = False
+        with BufferedLog(env, buffer_lines=3, background=True) as log:
+            for index in range(10):
+                log.log(f"line {index}")
+                log.vlog(f"verbose {index}")
+        assert capsys.readouterr().out.splitlines() == [f"line {index}" for index in range(10)]
+
+    @pytest.mark.parse_openapi
+    def test_openapi_parse_several_specs(self, monkeypatch):
+        data = Path(__file__).parent / "test_data/openapi"
+        specs = OpenApiParser.list_specs([data / "layout/openapi_3*.json", data / "layout/openapi_30.json"])
+        assert [spec.name for spec in specs] == ["openapi_30.json", "openapi_31.json"]
+        with pytest.raises(FileNotFoundError):
+            OpenApiParser.list_specs([data / "layout/openapi_30.json", data / "missing_*.json"])
+
+        env = Environment()
+        env.silent = True
+        expected = parse_openapi_specs(env, specs)
+        monkeypatch.setattr("trcli.readers.openapi.MAX_WORKERS_PARSE_FILES", 2)
+        parsed = parse_openapi_specs(env, specs)
+        assert [suite.source for suite in parsed] == ["openapi_30.json", "openapi_31.json"]
+        for parsed_suite, expected_suite in zip(parsed, expected):
+            cases = [case for section in parsed_suite.testsections for case in section.testcases]
+            parsed_suite.case_renderer.render(cases)
+            assert parsed_suite.case_renderer.env is env
+            assert [case.to_dict() for case in cases] == [
+                case.to_dict() for section in expected_suite.testsections for case in section.testcases
+            ]
+
     def __parser_check(self, data: {"file_name": str, "compatible": bool}, type: str):
 
         file_name = data["file_name"]
@@ -0,0 +1,65 @@
+import bz2
+import gzip
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from trcli.readers.report_sources import INVALID_SOURCE_ERRORS, ReportSource, iter_sequential_contents, open_report
+
+
+def write_archive(path, members: dict):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+
+class TestReportSources:
+    @pytest.mark.report_sources
+    @pytest.mark.parametrize("read_ahead", [0, 1024], ids=["re-read", "read ahead"])
+    def test_sequential_contents_in_order_of_sources(self, read_ahead, tmp_path):
+        archive = tmp_path / "reports.tar.gz"
+        write_archive(archive, {"c.xml": b"<c/>", "a.xml": b"<a/>", "log.txt": b"log", "b.xml": b"<b/>"})
+        sources = [ReportSource(str(archive), member) for member in ("a.xml", "b.xml", "c.xml")]
+        expected_sources = list(sources)
+
+        assert list(iter_sequential_contents(sources, read_ahead)) == [b"<a/>", b"<b/>", b"<c/>"]
+        assert sources == expected_sources, "Sources of the caller should not be modified"
+
+    @pytest.mark.report_sources
+    def test_sequential_contents_missing_member(self, tmp_path):
+        archive = tmp_path / "reports.tar.gz"
+        write_archive(archive, {"a.xml": b"<a/>"})
+        sources = [ReportSource(str(archive), member) for member in ("a.xml", "b.xml")]
+
+        contents = iter_sequential_contents(sources)
+        assert next(contents) == b"<a/>"
+        with pytest.raises(tarfile.ReadError, match="b.xml"):
+            next(contents)
+
+    @pytest.mark.report_sources
+    @pytest.mark.parametrize("file_name", ["report.xml.gz", "report.xml.bz2", "reports.zip"])
+    def test_corrupted_source_raises_invalid_source_error(self, file_name, tmp_path):
+        report = b"<testsuite>" + b"<testcase name='test' classname='a'/>" * 100 + b"</testsuite>"
+        compressed = {
+            "report.xml.gz": lambda: gzip.compress(report),
+            "report.xml.bz2": lambda: bz2.compress(report),
+            "reports.zip": lambda: self.zip_content(report),
+        }[file_name]()
+        path = tmp_path / file_name
+        # Header is kept, so that the corruption is found only while reading
+        path.write_bytes(compressed[:12] + bytes(len(compressed) - 12))
+        member = "report.xml" if file_name.endswith(".zip") else None
+        with pytest.raises(INVALID_SOURCE_ERRORS):
+            with open_report(ReportSource(str(path), member)) as stream:
+                stream.read()
+
+    @staticmethod
+    def zip_content(report: bytes) -> bytes:
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("report.xml", report)
+        return content.getvalue()
@@ -0,0 +1,71 @@
+import functools
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from trcli.cli import Environment
+from trcli.commands.cmd_parse_junit import upload_watched_reports
+from trcli.data_classes.data_parsers import MatchersParser
+from trcli.readers.report_watcher import ReportWatcher
+
+
+class TestReportWatcher:
+    @pytest.mark.report_watcher
+    def test_yields_completed_reports(self, tmp_path):
+        (tmp_path / "module_b.xml").write_text("<testsuites/>")
+        (tmp_path / "module_a.xml").write_text("<testsuites/>")
+        (tmp_path / "empty.xml").write_text("")
+        (tmp_path / "notes.txt").write_text("not a report")
+        watcher = ReportWatcher(tmp_path, timeout=0.05, poll_interval=0.01, use_inotify=False)
+
+        assert [report.name for report in watcher] == ["module_a.xml", "module_b.xml"]
+
+    @pytest.mark.report_watcher
+    def test_waits_until_report_is_complete(self, tmp_path):
+        report = tmp_path / "module.xml"
+        report.write_text("<testsuites>")
+        watcher = iter(ReportWatcher(tmp_path, timeout=1, poll_interval=0.01, use_inotify=False))
+        # First poll only records the report, it is yielded once it does not change between polls
+        report.write_text("<testsuites></testsuites>")
+
+        assert next(watcher) == report
+        assert list(watcher) == [], "Report should be yielded only once"
+
+    @pytest.mark.report_watcher
+    def test_missing_directory(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            iter(ReportWatcher(tmp_path / "missing"))
+
+    @pytest.mark.report_watcher
+    def test_retried_report_yielded_again_once_changed(self, tmp_path):
+        report = tmp_path / "module.xml"
+        report.write_text("<testsuites>")
+        watcher = ReportWatcher(tmp_path, timeout=0.2, poll_interval=0.01, use_inotify=False)
+        reports = iter(watcher)
+        assert next(reports) == report
+        watcher.retry(report)
+        report.write_text("<testsuites></testsuites>")
+
+        assert next(reports) == report
+        assert list(reports) == [], "Unchanged report should not be retried"
+
+    @pytest.mark.report_watcher
+    def test_unparsable_report_does_not_stop_watching(self, tmp_path, monkeypatch, capsys):
+        (tmp_path / "a_partial.xml").write_text("<testsuites><testsuite")
+        (tmp_path / "b_complete.xml").write_bytes((Path(__file__).parent / "test_data/XML/no_root.xml").read_bytes())
+        monkeypatch.setattr(
+            "trcli.commands.cmd_parse_junit.ReportWatcher",
+            functools.partial(ReportWatcher, poll_interval=0.01, use_inotify=False),
+        )
+        uploader = MagicMock()
+        monkeypatch.setattr("trcli.commands.cmd_parse_junit.ResultsUploader", uploader)
+        env = Environment()
+        env.watch = tmp_path
+        env.file = "*.xml"
+        env.watch_timeout = 0.1
+        env.case_matcher = MatchersParser.AUTO
+
+        upload_watched_reports(env)
+        assert "a_partial.xml could not be parsed" in capsys.readouterr().err
+        assert uploader.call_count == 1
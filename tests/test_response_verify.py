@@ -102,3 +102,12 @@ class TestResponseVerify:
         assert api_response_verify.verify_returned_data(
             input_data_estimate, response_data_estimate
         ), "Added data and returned data should match"
+
+    @pytest.mark.verifier
+    def test_comparison_plan_reused_for_payload_shape(
+        self, api_response_verify: ApiResponseVerify
+    ):
+        first_plan = api_response_verify.comparison_plan(("title", "estimate"))
+        second_plan = api_response_verify.comparison_plan(("title", "estimate"))
+        assert first_plan is second_plan, "Plan should be computed once per payload shape"
+        assert [key for key, _ in first_plan] == ["title", "estimate"]
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pytest
+
+from trcli.cli import Environment
+from trcli.data_classes.data_parsers import MatchersParser
+from trcli.data_classes.dataclass_testrail import TestRailCase
+from trcli.data_classes.result_store import ResultStore
+from trcli.data_providers.api_data_provider import ApiDataProvider
+from trcli.readers.junit_xml import JunitParser
+
+
+def parse_report(file_name: str, matcher: str, columnar: bool):
+    env = Environment()
+    env.case_matcher = matcher
+    env.columnar_results = columnar
+    env.file = Path(__file__).parent / "test_data/XML" / file_name
+    return JunitParser(env).parse_file()[0]
+
+
+class TestResultStore:
+    @pytest.mark.result_store
+    @pytest.mark.parametrize(
+        "file_name, matcher",
+        [
+            ("root.xml", MatchersParser.PROPERTY),
+            ("root_id_in_name.xml", MatchersParser.NAME),
+            ("milliseconds.xml", MatchersParser.AUTO),
+            ("duplicate_automation_ids.xml", MatchersParser.AUTO),
+        ],
+        ids=["Property matcher", "Name matcher", "Auto matcher", "Duplicate automation IDs"],
+    )
+    def test_result_bodies_match_object_results(self, file_name, matcher):
+        object_suite = parse_report(file_name, matcher, columnar=False)
+        columnar_suite = parse_report(file_name, matcher, columnar=True)
+        assert object_suite.result_store is None
+        assert columnar_suite.result_store is not None
+        for section in columnar_suite.testsections:
+            for case in section.testcases:
+                assert case.result is None, "Results should live only in the store"
+        global_fields = {"version": "global", "custom_global": 1}
+        object_provider = ApiDataProvider(object_suite, result_fields=global_fields)
+        columnar_provider = ApiDataProvider(columnar_suite, result_fields=global_fields)
+        if matcher == MatchersParser.AUTO:
+            # Cases are matched by automation ID the same way as by ApiRequestHandler.check_missing_test_cases_ids
+            for provider in (object_provider, columnar_provider):
+                cases = [case for section in provider.suites_input.testsections for case in section.testcases]
+                provider.update_data(
+                    case_data=[
+                        {
+                            "case_id": 10 + index,
+                            "section_id": 1,
+                            "title": case.title,
+                            "custom_automation_id": case.custom_automation_id,
+                        }
+                        for index, case in enumerate(cases)
+                    ]
+                )
+        expected = object_provider.add_results_for_cases(2)
+        actual = columnar_provider.add_results_for_cases(2)
+        assert actual == expected, "Columnar bodies should match bodies built from result objects"
+
+    @pytest.mark.result_store
+    def test_case_ids_updated_from_added_cases(self):
+        suite = parse_report("root.xml", MatchersParser.AUTO, columnar=True)
+        provider = ApiDataProvider(suite)
+        assert provider.add_results_for_cases(10) == []
+        case = suite.testsections[0].testcases[0]
+        provider.update_data(
+            case_data=[
+                {
+                    "case_id": 10,
+                    "section_id": 1,
+                    "title": case.title,
+                    "custom_automation_id": case.custom_automation_id,
+                }
+            ]
+        )
+        results = provider.add_results_for_cases(10)[0]["results"]
+        assert [result["case_id"] for result in results] == [10]
+
+    @pytest.mark.result_store
+    def test_summary_statistics(self):
+        store = ResultStore()
+        store.append(1, 1, 1.5, "module", "test_a")
+        store.append(2, 5, 2.0, "module", "test_b", comment="Failed")
+        store.append(None, 1, None, "module", "test_c")
+        assert store.status_counts() == {1: 2, 5: 1}
+        assert store.total_elapsed() == 3.5
+        assert store.titles[0] is store.titles[0]
+        assert [body["case_id"] for body in store.result_bodies()] == [1, 2]
+
+    @pytest.mark.result_store
+    def test_extend_with_row_range(self):
+        store = ResultStore()
+        store.append(1, 1, 1.5, "module", "test_a")
+        store.append(2, 5, 2.0, "module", "test_b", attachments=["b.png"])
+        store.append(3, 1, None, "module", "test_c", result_fields={"version": "1"})
+        target = ResultStore()
+        target.append(4, 1, 1.0, "module", "test_d", attachments=["d.png"])
+        target.extend(store, range(1, 3))
+        assert target.case_ids.tolist() == [4, 2, 3]
+        assert [body["attachments"] for body in target.result_bodies()] == [["d.png"], ["b.png"], []]
+        assert list(target.result_bodies())[2]["version"] == "1"
+
+    @pytest.mark.result_store
+    def test_automation_id_of_names_with_surrounding_whitespace(self):
+        store = ResultStore()
+        store.append(None, 1, 1.0, " module", "test_a ")
+        case = TestRailCase(title="test_a", custom_automation_id=" module.test_a ")
+        assert store.automation_id(0) == case.custom_automation_id
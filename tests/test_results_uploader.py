@@ -1,11 +1,17 @@
+import re
 import sys
+import threading
+from pathlib import Path
 
 import pytest
 
+from tests.helpers.api_client_helpers import create_url
 from tests.helpers.results_uploader_helper import (
     get_project_id_mocker,
     upload_results_inner_functions_mocker,
     api_request_handler_delete_mocker,
+    api_environment,
+    mock_project_metadata,
 )
 from tests.test_data.results_provider_test_data import (
     TEST_UPLOAD_RESULTS_FLOW_TEST_DATA,
@@ -22,10 +28,18 @@ from tests.test_data.results_provider_test_data import (
     TEST_REVERT_FUNCTIONS_IDS,
 )
 from trcli.api.api_request_handler import ProjectData
-from trcli.api.results_uploader import ResultsUploader
+from trcli.api.case_sync import CaseSyncState
+from trcli.api.results_uploader import ResultsUploader, PipelinedResultsUploader
 from trcli.cli import Environment
+from trcli.commands.cmd_parse_openapi import upload_suites
 from trcli.constants import FAULT_MAPPING, PROMPT_MESSAGES, SuiteModes
 from trcli.data_classes.data_parsers import MatchersParser
+from trcli.data_classes.dataclass_testrail import (
+    TestRailCase,
+    TestRailResult,
+    TestRailSection,
+    TestRailSuite,
+)
 from trcli.readers.junit_xml import JunitParser
 from trcli.constants import ProjectErrors
 
@@ -795,3 +809,244 @@ class TestResultsUploader:
         assert (
             results_uploader.rollback_changes(1, [1, 2], [1, 2], 2) == expected_result
         ), "Revert process not completed as expected in test."
+
+
+class TestPipelinedResultsUploader:
+    @pytest.mark.results_uploader
+    def test_upload_results_while_parsing(self, requests_mock):
+        environment = api_environment(
+            title="Pipelined run", suite_id=4, file=Path(__file__).parent / "test_data/XML/merge/report_1.xml"
+        )
+        mock_project_metadata(requests_mock, [{"id": 4}])
+        get_cases = requests_mock.get(
+            create_url("get_cases/1&suite_id=4"),
+            json={
+                "_links": {"next": None},
+                "cases": [
+                    {"id": 1, "section_id": 10, "title": "test_valid_login",
+                     "custom_automation_id": "tests.login.test_valid_login"},
+                ],
+            },
+        )
+        requests_mock.get(
+            create_url("get_sections/1&suite_id=4"),
+            json={"_links": {"next": None}, "sections": [{"id": 10, "suite_id": 4, "name": "Login"}]},
+        )
+        requests_mock.post(create_url("add_section/1"), json={"id": 11, "suite_id": 4, "name": "Logout"})
+        new_case_ids = {"test_invalid_login": 2, "test_logout": 3}
+        requests_mock.post(
+            re.compile(r"add_case/\d+$"),
+            json=lambda request, context: {
+                "id": new_case_ids[request.json()["title"]],
+                "section_id": int(request.url.rsplit("/", 1)[1]),
+                "title": request.json()["title"],
+            },
+        )
+        add_run = requests_mock.post(create_url("add_run/1"), json={"id": 20})
+        add_results = requests_mock.post(
+            create_url("add_results_for_cases/20"),
+            json=lambda request, context: [
+                {"id": 100 + result["case_id"], "test_id": 200 + result["case_id"]}
+                for result in request.json()["results"]
+            ],
+        )
+        requests_mock.get(
+            create_url("get_tests/20"), json={"_links": {"next": None}, "tests": [{"id": 201, "case_id": 1}]}
+        )
+        update_run = requests_mock.post(create_url("update_run/20"), json={"id": 20})
+
+        prompt_threads = []
+        environment.get_prompt_response_for_auto_creation = \
+            lambda message: prompt_threads.append(threading.current_thread()) or True
+
+        suite, sections = JunitParser(environment).parse_file_streamed()
+        PipelinedResultsUploader(environment=environment, suite=suite, sections=sections).upload_results()
+
+        assert prompt_threads and all(thread is threading.main_thread() for thread in prompt_threads), \
+            "User should be prompted only on the main thread"
+        assert suite.name == "merged suites root"
+        assert get_cases.call_count == 1, "Cases should be fetched only once"
+        assert add_run.last_request.json()["case_ids"] == [1], "Run should be created for matched cases"
+        assert sorted(update_run.last_request.json()["case_ids"]) == [1, 2, 3], "Added cases should be added to run"
+        results_by_call = [
+            sorted(result["case_id"] for result in call.json()["results"]) for call in add_results.request_history
+        ]
+        assert results_by_call == [[1], [2, 3]], "Results of matched cases should be added before the others"
+
+
+class TestCaseSync:
+    @staticmethod
+    def parsed_suite(cases: dict, source: str = "pets.yaml") -> TestRailSuite:
+        section = TestRailSection("Pets")
+        for automation_id, description in cases.items():
+            section.testcases.append(
+                TestRailCase(
+                    automation_id,
+                    custom_automation_id=automation_id,
+                    result=TestRailResult(),
+                    case_fields={"template_id": 1, "custom_description": description},
+                )
+            )
+        return TestRailSuite("Pet API", testsections=[section], source=source)
+
+    @pytest.fixture
+    def sync(self, requests_mock, tmp_path):
+        """Mocks suite 4 of TestRail and returns a function syncing parsed cases, which returns bodies of updates."""
+        environment = api_environment(suite_id=4, sync_state=tmp_path / "sync.json")
+        testrail_cases = [
+            {"id": 1, "section_id": 10, "title": "GET /pets 200", "custom_automation_id": "GET /pets 200"},
+            {"id": 2, "section_id": 10, "title": "POST /pets 201", "custom_automation_id": "POST /pets 201"},
+        ]
+        mock_project_metadata(requests_mock, [{"id": 4}])
+        requests_mock.get(
+            create_url("get_cases/1&suite_id=4"),
+            json=lambda request, context: {"_links": {"next": None}, "cases": testrail_cases},
+        )
+        requests_mock.get(
+            create_url("get_sections/1&suite_id=4"),
+            json={"_links": {"next": None}, "sections": [{"id": 10, "suite_id": 4, "name": "Pets"}]},
+        )
+
+        def add_case(request, context):
+            case = {"id": len(testrail_cases) + 1, "section_id": 10, "title": request.json()["title"]}
+            testrail_cases.append(dict(case, custom_automation_id=request.json()["custom_automation_id"]))
+            return case
+
+        add_case_mock = requests_mock.post(re.compile(r"add_case/\d+$"), json=add_case)
+        update_case_mock = requests_mock.post(
+            re.compile(r"update_case/\d+$"),
+            json=lambda request, context: {
+                "id": int(request.url.rsplit("/", 1)[1]), "section_id": 10, "title": "updated"
+            },
+        )
+
+        def sync(suite: TestRailSuite, flag_deleted: bool = False) -> dict:
+            environment.flag_deleted = flag_deleted
+            update_case_mock.reset()
+            add_case_mock.reset()
+            ResultsUploader(environment=environment, suite=suite, skip_run=True).upload_results()
+            return {int(call.url.rsplit("/", 1)[1]): call.json() for call in update_case_mock.request_history}
+
+        sync.add_case_mock = add_case_mock
+        return sync
+
+    @pytest.mark.results_uploader
+    def test_sync_updates_changed_cases_only(self, sync, mocker):
+        fingerprint = mocker.spy(CaseSyncState, "fingerprint")
+        cases = {"GET /pets 200": "List", "POST /pets 201": "Create", "DELETE /pets 204": "Delete"}
+        updates = sync(self.parsed_suite(cases))
+        assert sorted(updates) == [1, 2], "Cases synced for the first time should be updated"
+        assert updates[1]["custom_description"] == "List"
+        assert "section_id" not in updates[1] and "case_id" not in updates[1]
+        assert sync.add_case_mock.call_count == 1, "Missing case should be added"
+
+        fingerprint.reset_mock()
+        assert sync(self.parsed_suite(cases)) == {}, "Unchanged cases should not be updated"
+        assert sync.add_case_mock.call_count == 0, "Synced cases should be matched instead of added again"
+        assert fingerprint.call_count == 3, "Each synced case should be fingerprinted once"
+
+        cases = {"GET /pets 200": "List all", "DELETE /pets 204": "Delete"}
+        updates = sync(self.parsed_suite(cases), flag_deleted=True)
+        assert updates == {
+            1: {"title": "GET /pets 200", "template_id": 1, "custom_description": "List all",
+                "custom_automation_id": "GET /pets 200"},
+            2: {"title": "[DELETED] POST /pets 201"},
+        }, "Changed case should be updated and deleted case flagged"
+
+        assert sync(self.parsed_suite(cases), flag_deleted=True) == {}, "Flagged cases should be flagged only once"
+
+    @pytest.mark.results_uploader
+    def test_sync_several_specs_into_one_suite(self, sync):
+        pets = self.parsed_suite({"GET /pets 200": "List"}, source="pets.yaml")
+        orders = self.parsed_suite({"POST /pets 201": "Create"}, source="orders.yaml")
+        assert sorted(sync(pets, flag_deleted=True)) == [1]
+        assert sorted(sync(orders, flag_deleted=True)) == [2], "Cases of the other spec should not be flagged"
+
+        pets = self.parsed_suite({"GET /pets 200": "List"}, source="pets.yaml")
+        assert sync(pets, flag_deleted=True) == {}, "Cases of the other spec should not be flagged"
+        orders = self.parsed_suite({}, source="orders.yaml")
+        assert sync(orders, flag_deleted=True) == {2: {"title": "[DELETED] POST /pets 201"}}
+
+
+class TestSectionDescriptions:
+    @pytest.mark.results_uploader
+    @pytest.mark.parametrize("schema_rendering, updated", [("shared", [10]), ("inline", [])], ids=["shared", "inline"])
+    def test_changed_descriptions_of_existing_sections_updated(self, schema_rendering, updated, requests_mock):
+        environment = api_environment(suite_id=4, schema_rendering=schema_rendering)
+        mock_project_metadata(requests_mock, [{"id": 4}])
+        requests_mock.get(
+            create_url("get_cases/1&suite_id=4"),
+            json={"_links": {"next": None}, "cases": [
+                {"id": 1, "section_id": 10, "title": "GET /pets 200", "custom_automation_id": "GET /pets 200"},
+                {"id": 2, "section_id": 11, "title": "GET /users 200", "custom_automation_id": "GET /users 200"},
+            ]},
+        )
+        requests_mock.get(
+            create_url("get_sections/1&suite_id=4"),
+            json={"_links": {"next": None}, "sections": [
+                {"id": 10, "suite_id": 4, "name": "Pets", "description": "Schemas\n=======\nPet: old"},
+                {"id": 11, "suite_id": 4, "name": "Users", "description": "Schemas\n=======\nUser"},
+            ]},
+        )
+        update_section = requests_mock.post(
+            re.compile(r"update_section/\d+$"),
+            json=lambda request, context: {
+                "id": int(request.url.rsplit("/", 1)[1]), "suite_id": 4, "name": "Pets",
+                "description": request.json()["description"],
+            },
+        )
+        sections = []
+        for name, description in (("Pets", "Schemas\n=======\nPet: new"), ("Users", "Schemas\n=======\nUser")):
+            section = TestRailSection(name, description=description)
+            automation_id = f"GET /{name.lower()} 200"
+            section.testcases.append(TestRailCase(automation_id, custom_automation_id=automation_id, result=TestRailResult()))
+            sections.append(section)
+
+        ResultsUploader(environment=environment, suite=TestRailSuite("Pet API", testsections=sections), skip_run=True)\
+            .upload_results()
+
+        assert [int(call.url.rsplit("/", 1)[1]) for call in update_section.request_history] == updated
+        if updated:
+            assert update_section.last_request.json() == {"description": "Schemas\n=======\nPet: new"}
+
+
+class TestUploadSuites:
+    @pytest.mark.results_uploader
+    def test_upload_suites_concurrently_sharing_metadata(self, requests_mock):
+        environment = api_environment()
+        get_projects, get_case_fields = mock_project_metadata(
+            requests_mock, [{"id": 4, "name": "Pet API"}, {"id": 5, "name": "User API"}]
+        )
+        for suite_id in (4, 5):
+            requests_mock.get(
+                create_url(f"get_cases/1&suite_id={suite_id}"), json={"_links": {"next": None}, "cases": []}
+            )
+            requests_mock.get(
+                create_url(f"get_sections/1&suite_id={suite_id}"),
+                json={"_links": {"next": None}, "sections": [{"id": 10 * suite_id, "suite_id": suite_id, "name": "API"}]},
+            )
+        # Suites are added in multi-suite projects when suite ID is not given
+        requests_mock.post(
+            create_url("add_suite/1"),
+            json=lambda request, context: {"id": {"Pet API": 4, "User API": 5}[request.json()["name"]],
+                                           "name": request.json()["name"]},
+        )
+        add_case = requests_mock.post(
+            re.compile(r"add_case/\d+$"),
+            json=lambda request, context: {
+                "id": int(request.url.rsplit("/", 1)[1]) + 1, "section_id": int(request.url.rsplit("/", 1)[1]),
+                "title": request.json()["title"],
+            },
+        )
+        suites = []
+        for name in ("Pet API", "User API"):
+            section = TestRailSection("API")
+            section.testcases.append(TestRailCase(f"GET {name}", custom_automation_id=name, result=TestRailResult()))
+            suites.append(TestRailSuite(name, testsections=[section]))
+
+        upload_suites(environment, suites)
+
+        assert sorted(call.url.rsplit("/", 1)[1] for call in add_case.request_history) == ["40", "50"]
+        assert get_projects.call_count == 1, "Projects should be fetched once"
+        assert get_case_fields.call_count == 1, "Case fields should be fetched once"
+        assert [suite.suite_id for suite in suites] == [4, 5]
@@ -2,13 +2,14 @@ import json
 from pathlib import Path
 
 import requests
-from typing import Union, Callable
+from typing import Union, Callable, Iterable
 from time import sleep
 
 import urllib3
 from requests.auth import HTTPBasicAuth
 from json import JSONDecodeError
 from requests.exceptions import RequestException, Timeout, ConnectionError
+from trcli.api.json_stream import EntityListDecoder
 from trcli.constants import FAULT_MAPPING
 from trcli.settings import DEFAULT_API_CALL_TIMEOUT, DEFAULT_API_CALL_RETRIES
 from dataclasses import dataclass
@@ -36,6 +37,7 @@ class APIClient:
     SUFFIX_API_V2_VERSION = f"{PREFIX}{VERSION}"
     RETRY_ON = [429, 500, 502]
     USER_AGENT = "TRCLI"
+    STREAM_CHUNK_SIZE = 64 * 1024
 
     def __init__(
         self,
@@ -61,27 +63,40 @@ class APIClient:
         if not verify:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-    def send_get(self, uri: str) -> APIClientResult:
+    def send_get(self, uri: str, fields: Iterable[str] = None, entity: str = None) -> APIClientResult:
         """
         Sends GET request to host specified by host_name.
         Handles retries taking into consideration retries parameter. Retry will occur when one of the following happens:
             * got status code 429 in a response from host
             * timeout occurred
             * connection error occurred
+        When fields are given, only those fields of returned entities are kept in the response.
+        When entity (e.g. cases) is given too, the entity list is decoded incrementally while it is downloaded.
         """
-        return self.__send_request("GET", uri, None)
+        return self.__send_request("GET", uri, None, fields=fields, entity=entity)
 
-    def send_post(self, uri: str, payload: dict = None, files: {str: Path} = None) -> APIClientResult:
+    def send_post(
+        self, uri: str, payload: dict = None, files: {str: Path} = None, fields: Iterable[str] = None
+    ) -> APIClientResult:
         """
         Sends POST request to host specified by host_name.
         Handles retries taking into consideration retries parameter. Retry will occur when one of the following happens:
             * got status code 429 in a response from host
             * timeout occurred
             * connection error occurred
+        When fields are given, only those fields of returned entities are kept in the response.
         """
-        return self.__send_request("POST", uri, payload, files)
+        return self.__send_request("POST", uri, payload, files, fields)
 
-    def __send_request(self, method: str, uri: str, payload: dict, files: {str: Path} = None) -> APIClientResult:
+    def __send_request(
+        self,
+        method: str,
+        uri: str,
+        payload: dict,
+        files: {str: Path} = None,
+        fields: Iterable[str] = None,
+        entity: str = None,
+    ) -> APIClientResult:
         status_code = -1
         response_text = ""
         error_message = ""
@@ -91,6 +106,7 @@ class APIClient:
         headers = {"User-Agent": self.USER_AGENT}
         if files is None:
             headers["Content-Type"] = "application/json"
+        stream = entity is not None and fields is not None
         verbose_log_message = ""
         for i in range(self.retries + 1):
             error_message = ""
@@ -110,7 +126,13 @@ class APIClient:
                     )
                 else:
                     response = requests.get(
-                        url=url, auth=auth, json=payload, timeout=self.timeout, verify=self.verify, headers=headers
+                        url=url,
+                        auth=auth,
+                        json=payload,
+                        timeout=self.timeout,
+                        verify=self.verify,
+                        headers=headers,
+                        stream=stream,
                     )
             except Timeout:
                 error_message = FAULT_MAPPING["no_response_from_host"]
@@ -131,14 +153,37 @@ class APIClient:
                 if status_code == 429:
                     retry_time = float(response.headers["Retry-After"])
                     sleep(retry_time)
+                # Successful entity lists are decoded while downloaded, keeping only requested fields
+                streamed = stream and status_code == 200
                 try:
-                    response_text = response.json()
+                    if streamed:
+                        response_text = EntityListDecoder(entity, fields).decode(
+                            response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+                        )
+                    else:
+                        response_text = response.json()
                     error_message = response_text.get("error", "")
+                    if fields is not None and not error_message and not streamed:
+                        response_text = APIClient.project_fields(response_text, fields)
                 except (JSONDecodeError, ValueError):
-                    response_text = str(response.content)
-                    error_message = response.content
+                    if streamed:
+                        response_text = ""
+                        error_message = FAULT_MAPPING["invalid_response_content"].format(uri=uri)
+                    else:
+                        response_text = str(response.content)
+                        error_message = response.content
                 except AttributeError:
                     error_message = ""
+                    if fields is not None and not streamed:
+                        response_text = APIClient.project_fields(response_text, fields)
+                except RequestException:
+                    # Connection broken while downloading streamed response
+                    status_code = -1
+                    error_message = FAULT_MAPPING["connection_error"]
+                    self.verbose_logging_function(verbose_log_message)
+                    continue
+                finally:
+                    response.close()
                 verbose_log_message = (
                     verbose_log_message
                     + APIClient.format_response_for_vlog(
@@ -172,6 +217,23 @@ class APIClient:
             )
             self.timeout = DEFAULT_API_CALL_TIMEOUT
 
+    @staticmethod
+    def project_fields(response_text: Union[dict, list], fields: Iterable[str]) -> Union[dict, list]:
+        """
+        Keeps only requested fields of returned entities. Handles single entities,
+        lists of entities and paginated responses (entities listed next to _links).
+        """
+        if isinstance(response_text, list):
+            return [APIClient.project_fields(entity, fields) for entity in response_text]
+        if not isinstance(response_text, dict):
+            return response_text
+        if "_links" in response_text:
+            return {
+                key: APIClient.project_fields(value, fields) if isinstance(value, list) else value
+                for key, value in response_text.items()
+            }
+        return {field: response_text[field] for field in fields if field in response_text}
+
     @staticmethod
     def format_request_for_vlog(method: str, url: str, payload: dict):
         return (
@@ -1,6 +1,7 @@
 import html
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Union, Tuple
+from typing import Any, Callable, Dict, List, Union, Tuple
 
 from trcli.api.api_client import APIClient, APIClientResult
 from trcli.api.api_response_verify import ApiResponseVerify
@@ -10,27 +11,71 @@ from trcli.constants import (
     FAULT_MAPPING,
 )
 from trcli.data_classes.data_parsers import MatchersParser
-from trcli.data_classes.dataclass_testrail import TestRailSuite, TestRailCase, ProjectData
+from trcli.data_classes.dataclass_testrail import TestRailSuite, TestRailSection, TestRailCase, ProjectData
 from trcli.data_providers.api_data_provider import ApiDataProvider
-from trcli.settings import MAX_WORKERS_ADD_RESULTS, MAX_WORKERS_ADD_CASE
+from trcli.settings import MAX_WORKERS_ADD_RESULTS, MAX_WORKERS_ADD_CASE, VERIFY_BATCH_SIZE
+
+
+class MetadataCache:
+    """
+    Project metadata (projects, suites, case fields) fetched by request handlers, shared by handlers uploading
+    several suites, so that metadata is fetched only once. Failed requests are not cached.
+    """
+
+    def __init__(self):
+        self.__data = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key: str, fetch: Callable[[], Tuple[Any, str]]) -> Tuple[Any, str]:
+        """Returns data and error message of the key, fetched by fetch function if not cached yet."""
+        with self.__lock:
+            if key in self.__data:
+                return self.__data[key], ""
+            data, error_message = fetch()
+            if not error_message:
+                self.__data[key] = data
+            return data, error_message
+
+    def invalidate(self, key: str):
+        with self.__lock:
+            self.__data.pop(key, None)
 
 
 class ApiRequestHandler:
     """Sends requests based on DataProvider bodies"""
 
+    # Fields of returned entities kept in memory by the methods using them
+    ADD_CASE_FIELDS = ("id", "section_id", "title")
+    ADD_RESULTS_FIELDS = ("id", "test_id")
+    TESTS_IN_RUN_FIELDS = ("id", "case_id")
+    CASES_FIELDS = ("id", "section_id", "title", "custom_automation_id")
+
     def __init__(
         self,
         environment: Environment,
         api_client: APIClient,
         suites_data: TestRailSuite,
         verify: bool = False,
+        case_index: dict = None,
+        metadata: MetadataCache = None,
     ):
+        """
+        :param case_index: cases of suites by suite ID, shared by handlers uploading several reports
+            so that cases are fetched only once
+        :param metadata: project metadata shared by handlers uploading several suites
+        """
         self.environment = environment
         self.client = api_client
         self.suffix = api_client.VERSION
         self.data_provider = ApiDataProvider(suites_data, environment.case_fields, environment.run_description, environment.result_fields)
         self.suites_data_from_provider = self.data_provider.suites_input
         self.response_verifier = ApiResponseVerify(verify)
+        self.case_index = case_index
+        self.metadata = metadata
+        self.__cases_by_automation_id = None
+        self.__case_ids = None
+        # Descriptions in TestRail of sections matched by check_missing_section_ids, by section ID
+        self.__section_descriptions = {}
 
     def check_automation_id_field(self, project_id: int) -> Union[str, None]:
         """
@@ -38,7 +83,7 @@ class ApiRequestHandler:
         :param project_id: the id of the project
         :return: error message
         """
-        response = self.client.send_get("get_case_fields")
+        response = self.__send_get_metadata("get_case_fields")
         if not response.error_message:
             fields: list = response.response_text
             automation_id_field = next(
@@ -118,7 +163,7 @@ class ApiRequestHandler:
         :returns: True if exists in suites. False if not.
         """
         suite_id = self.suites_data_from_provider.suite_id
-        response = self.client.send_get(f"get_suites/{project_id}")
+        response = self.__send_get_metadata(f"get_suites/{project_id}")
         if not response.error_message:
             available_suites = [suite["id"] for suite in response.response_text]
             return (
@@ -135,7 +180,7 @@ class ApiRequestHandler:
         :returns: tuple with id of the suite and error message"""
         suite_id = -1
         error_message = ""
-        response = self.client.send_get(f"get_suites/{project_id}")
+        response = self.__send_get_metadata(f"get_suites/{project_id}")
         if not response.error_message:
             suites = response.response_text
             suite = next(
@@ -157,7 +202,7 @@ class ApiRequestHandler:
         available_suites = []
         returned_resources = []
         error_message = ""
-        response = self.client.send_get(f"get_suites/{project_id}")
+        response = self.__send_get_metadata(f"get_suites/{project_id}")
         if not response.error_message:
             for suite in response.response_text:
                 available_suites.append(int(suite["id"]))
@@ -198,6 +243,8 @@ class ApiRequestHandler:
             else:
                 error_message = response.error_message
                 break
+        if responses and self.metadata is not None:
+            self.metadata.invalidate(f"get_suites/{project_id}")
 
         returned_resources = [
             {
@@ -231,6 +278,7 @@ class ApiRequestHandler:
                         "suite_id": section_json["suite_id"],
                         "name": section_json["name"],
                     })
+                    self.__section_descriptions[section_json["id"]] = section_json.get("description")
                 else:
                     missing_test_sections = True
             self.data_provider.update_data(section_data=section_data)
@@ -274,6 +322,36 @@ class ApiRequestHandler:
         ) > 0 else "Update skipped"
         return returned_resources, error_message
 
+    def update_section_descriptions(self) -> Tuple[List[dict], str]:
+        """
+        Updates descriptions of sections matched by check_missing_section_ids, which differ from the parsed ones.
+        :returns: Tuple with list of dict updated resources and error string.
+        """
+        responses = []
+        error_message = ""
+        for section in self.suites_data_from_provider.testsections:
+            if section.description is None or section.section_id not in self.__section_descriptions:
+                continue
+            if section.description == self.__section_descriptions[section.section_id]:
+                continue
+            response = self.client.send_post(
+                f"update_section/{section.section_id}", {"description": section.description}
+            )
+            if response.error_message:
+                error_message = response.error_message
+                break
+            self.__section_descriptions[section.section_id] = section.description
+            responses.append(response)
+        returned_resources = [
+            {
+                "section_id": response.response_text["id"],
+                "suite_id": response.response_text["suite_id"],
+                "name": response.response_text["name"],
+            }
+            for response in responses
+        ]
+        return returned_resources, error_message
+
     def check_missing_test_cases_ids(self, project_id: int) -> Tuple[bool, str]:
         """
         Check what test cases id's are missing in DataProvider.
@@ -324,6 +402,50 @@ class ApiRequestHandler:
 
         return missing_cases_number > 0, ""
 
+    def match_test_cases(self, project_id: int, sections: List[TestRailSection]) -> Tuple[int, str]:
+        """
+        Matches cases of given sections with cases of the suite, which are fetched only once.
+        Matched cases get their IDs, so that their results can be added.
+        Used when sections are matched as they are parsed, otherwise see check_missing_test_cases_ids.
+        :project_id: project_id
+        :sections: sections to match
+        :returns: Tuple with number of cases not matching any TestRail case and error string.
+        """
+        missing_cases_number = 0
+        if self.__cases_by_automation_id is None:
+            suite_id = self.suites_data_from_provider.suite_id
+            returned_cases, error_message = self.__get_all_cases(project_id, suite_id)
+            if error_message:
+                return 0, error_message
+            self.__cases_by_automation_id = {}
+            for case in returned_cases:
+                aut_case_id = case.get("custom_automation_id")
+                aut_case_id = aut_case_id if not aut_case_id else html.unescape(aut_case_id)
+                self.__cases_by_automation_id[aut_case_id] = case
+            self.__case_ids = {case["id"] for case in returned_cases}
+        nonexistent_ids = []
+        for section in sections:
+            for test_case in section.testcases:
+                if self.environment.case_matcher == MatchersParser.AUTO:
+                    case = self.__cases_by_automation_id.get(test_case.custom_automation_id)
+                    if case is None:
+                        missing_cases_number += 1
+                        continue
+                    test_case.case_id = case["id"]
+                    test_case.section_id = case["section_id"]
+                    if test_case.result is not None:
+                        test_case.result.case_id = case["id"]
+                    else:
+                        self.suites_data_from_provider.result_store.set_case_id(test_case.result_row, case["id"])
+                elif not test_case.case_id:
+                    missing_cases_number += 1
+                elif int(test_case.case_id) not in self.__case_ids:
+                    nonexistent_ids.append(test_case.case_id)
+        if nonexistent_ids:
+            self.environment.elog(f"Nonexistent case IDs found in the report file: {nonexistent_ids}")
+            return missing_cases_number, "Case IDs not in TestRail project or suite were detected in the report file."
+        return missing_cases_number, ""
+
     def add_cases(self) -> Tuple[List[dict], str]:
         """
         Add cases that doesn't have ID in DataProvider.
@@ -361,6 +483,36 @@ class ApiRequestHandler:
         ]
         return returned_resources, error_message
 
+    def update_cases(self, bodies: Dict[int, dict]) -> Tuple[List[dict], str]:
+        """
+        Update existing cases.
+        :bodies: bodies of updated fields by case ID
+        :returns: Tuple with list of dict updated resources and error string.
+        """
+        fields = None if self.response_verifier.verify else self.ADD_CASE_FIELDS
+        with self.environment.get_progress_bar(
+            results_amount=len(bodies), prefix="Updating test cases"
+        ) as progress_bar:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS_ADD_CASE) as executor:
+                futures = {
+                    executor.submit(self.client.send_post, f"update_case/{case_id}", body, fields=fields): body
+                    for case_id, body in bodies.items()
+                }
+                responses, error_message = self.handle_futures(
+                    futures=futures, action_string="update_case", progress_bar=progress_bar
+                )
+            if error_message:
+                responses = ApiRequestHandler.retrieve_results_after_cancelling(futures)
+        returned_resources = [
+            {
+                "case_id": response.response_text["id"],
+                "section_id": response.response_text["section_id"],
+                "title": response.response_text["title"]
+            }
+            for response in responses
+        ]
+        return returned_resources, error_message
+
     def add_run(self, project_id: int, run_name: str, milestone_id: int = None) -> Tuple[int, str]:
         """
         Creates a new test run.
@@ -372,6 +524,30 @@ class ApiRequestHandler:
         response = self.client.send_post(f"add_run/{project_id}", add_run_data)
         return response.response_text.get("id"), response.error_message
 
+    def add_cases_to_run(self, run_id: int) -> str:
+        """
+        Adds cases of the report which are not yet included in the run (without custom case selection).
+        :run_id: run id
+        :returns: error string
+        """
+        tests_in_run, error_message = self.__get_all_tests_in_run(run_id)
+        if error_message:
+            return error_message
+        run_case_ids = [test["case_id"] for test in tests_in_run]
+        included = set(run_case_ids)
+        missing_case_ids = []
+        for case in (case for section in self.suites_data_from_provider.testsections for case in section.testcases):
+            case_id = int(case)
+            if case_id > 0 and case_id not in included:
+                included.add(case_id)
+                missing_case_ids.append(case_id)
+        if not missing_case_ids:
+            return ""
+        response = self.client.send_post(
+            f"update_run/{run_id}", {"case_ids": run_case_ids + missing_case_ids}, fields=("id",)
+        )
+        return response.error_message
+
     def upload_attachments(self, report_results: [dict], results: list[dict], run_id: int):
         """ Getting test result id and upload attachments for it. """
         tests_in_run, error = self.__get_all_tests_in_run(run_id)
@@ -389,16 +565,17 @@ class ApiRequestHandler:
         else:
             self.environment.elog(f"Unable to upload attachments due to API request error: {error}")
 
-    def add_results(self, run_id: int) -> Tuple[list, str, int]:
+    def add_results(self, run_id: int, cases: List[TestRailCase] = None) -> Tuple[list, str, int]:
         """
         Adds one or more new test results.
         :run_id: run id
+        :cases: cases to add results for (all cases with ID by default)
         :returns: Tuple with dict created resources and error string.
         """
         responses = []
         error_message = ""
         add_results_data_chunks = self.data_provider.add_results_for_cases(
-            self.environment.batch_size
+            self.environment.batch_size, cases
         )
         results_amount = sum(
             [len(results["results"]) for results in add_results_data_chunks]
@@ -410,7 +587,10 @@ class ApiRequestHandler:
             with ThreadPoolExecutor(max_workers=MAX_WORKERS_ADD_RESULTS) as executor:
                 futures = {
                     executor.submit(
-                        self.client.send_post, f"add_results_for_cases/{run_id}", body
+                        self.client.send_post,
+                        f"add_results_for_cases/{run_id}",
+                        body,
+                        fields=self.ADD_RESULTS_FIELDS,
                     ): body
                     for body in add_results_data_chunks
                 }
@@ -446,42 +626,79 @@ class ApiRequestHandler:
         return responses, error_message, progress_bar.n
 
     def handle_futures(self, futures, action_string, progress_bar) -> Tuple[list, str]:
+        """
+        Collects responses of finished requests. When verification is enabled, responses are verified
+        in batches on a separate thread, so collecting responses is not stalled by verification.
+        """
         responses = []
         error_message = ""
-        try:
-            for future in as_completed(futures):
-                arguments = futures[future]
-                response = future.result()
-                if not response.error_message:
-                    responses.append(response)
-                    if action_string == "add_results":
-                        progress_bar.update(len(arguments["results"]))
+        verify = self.response_verifier.verify and action_string != "add_results"
+        pending_verification = []
+        verification_futures = []
+        with ThreadPoolExecutor(max_workers=1) as verification_executor:
+            try:
+                for future in as_completed(futures):
+                    arguments = futures[future]
+                    response = future.result()
+                    if not response.error_message:
+                        responses.append(response)
+                        if action_string == "add_results":
+                            progress_bar.update(len(arguments["results"]))
+                        else:
+                            if verify:
+                                pending_verification.append((arguments, response.response_text))
+                                if len(pending_verification) >= VERIFY_BATCH_SIZE:
+                                    verification_futures.append(verification_executor.submit(
+                                        self.__verify_batch, action_string, pending_verification
+                                    ))
+                                    pending_verification = []
+                                if self.__verification_failed(verification_futures, wait=False):
+                                    error_message = FAULT_MAPPING["data_verification_error"]
+                                    self.__cancel_running_futures(futures, action_string)
+                                    break
+                            progress_bar.update(1)
                     else:
-                        if action_string == "add_case":
-                            arguments = arguments.to_dict()
-                            arguments.pop("case_id")
-                        if not self.response_verifier.verify_returned_data(
-                            arguments, response.response_text
-                        ):
-                            responses.append(response)
-                            error_message = FAULT_MAPPING["data_verification_error"]
-                            self.__cancel_running_futures(futures, action_string)
-                            break
-                        progress_bar.update(1)
+                        error_message = response.error_message
+                        self.environment.log(
+                            f"\nError during {action_string}. Trying to cancel scheduled tasks."
+                        )
+                        self.__cancel_running_futures(futures, action_string)
+                        break
                 else:
-                    error_message = response.error_message
-                    self.environment.log(
-                        f"\nError during {action_string}. Trying to cancel scheduled tasks."
-                    )
-                    self.__cancel_running_futures(futures, action_string)
-                    break
-            else:
-                progress_bar.set_postfix_str(s="Done.")
-        except KeyboardInterrupt:
-            self.__cancel_running_futures(futures, action_string)
-            raise KeyboardInterrupt
+                    if pending_verification:
+                        verification_futures.append(verification_executor.submit(
+                            self.__verify_batch, action_string, pending_verification
+                        ))
+                    if self.__verification_failed(verification_futures, wait=True):
+                        error_message = FAULT_MAPPING["data_verification_error"]
+                    else:
+                        progress_bar.set_postfix_str(s="Done.")
+            except KeyboardInterrupt:
+                self.__cancel_running_futures(futures, action_string)
+                for verification_future in verification_futures:
+                    verification_future.cancel()
+                raise KeyboardInterrupt
         return responses, error_message
 
+    def __verify_batch(self, action_string: str, batch: List[tuple]) -> bool:
+        added_data = []
+        returned_data = []
+        for arguments, response_text in batch:
+            if action_string == "add_case":
+                arguments = arguments.to_dict()
+                arguments.pop("case_id")
+            added_data.append(arguments)
+            returned_data.append(response_text)
+        return self.response_verifier.verify_returned_data_for_list(added_data, returned_data)
+
+    @staticmethod
+    def __verification_failed(verification_futures: list, wait: bool) -> bool:
+        return any(
+            not verification_future.result()
+            for verification_future in verification_futures
+            if wait or verification_future.done()
+        )
+
     def close_run(self, run_id: int) -> Tuple[dict, str]:
         """
         Closes an existing test run and archives its tests & results.
@@ -553,11 +770,25 @@ class ApiRequestHandler:
         case_body = case.to_dict()
         if self.environment.case_matcher != MatchersParser.AUTO and "custom_automation_id" in case_body:
             case_body.pop("custom_automation_id")
-        response = self.client.send_post(f"add_case/{case_body.pop('section_id')}", case_body)
+        # Verification compares all fields of the body, so full response is needed then
+        fields = None if self.response_verifier.verify else self.ADD_CASE_FIELDS
+        response = self.client.send_post(f"add_case/{case_body.pop('section_id')}", case_body, fields=fields)
         if response.status_code == 200:
             case.case_id = response.response_text["id"]
-            case.result.case_id = response.response_text["id"]
+            if case.result is not None:
+                case.result.case_id = response.response_text["id"]
+            else:
+                self.suites_data_from_provider.result_store.set_case_id(case.result_row, response.response_text["id"])
             case.section_id = response.response_text["section_id"]
+            if self.case_index is not None and self.suites_data_from_provider.suite_id in self.case_index:
+                self.case_index[self.suites_data_from_provider.suite_id].append(
+                    {
+                        "id": case.case_id,
+                        "section_id": case.section_id,
+                        "title": response.response_text["title"],
+                        "custom_automation_id": case.custom_automation_id,
+                    }
+                )
         return response
 
     def __cancel_running_futures(self, futures, action_string):
@@ -569,9 +800,16 @@ class ApiRequestHandler:
 
     def __get_all_cases(self, project_id=None, suite_id=None) -> Tuple[List[dict], str]:
         """
-        Get all cases from all pages
+        Get all cases from all pages (from case index, if cases of the suite were already fetched)
         """
-        return self.__get_all_entities('cases', f"get_cases/{project_id}&suite_id={suite_id}")
+        if self.case_index is not None and suite_id in self.case_index:
+            return self.case_index[suite_id], ""
+        cases, error_message = self.__get_all_entities(
+            'cases', f"get_cases/{project_id}&suite_id={suite_id}", fields=self.CASES_FIELDS, stream=True
+        )
+        if self.case_index is not None and not error_message:
+            self.case_index[suite_id] = cases
+        return cases, error_message
 
     def __get_all_sections(self, project_id=None, suite_id=None) -> Tuple[List[dict], str]:
         """
@@ -583,23 +821,40 @@ class ApiRequestHandler:
         """
         Get all tests from all pages
         """
-        return self.__get_all_entities('tests', f"get_tests/{run_id}")
+        return self.__get_all_entities('tests', f"get_tests/{run_id}", fields=self.TESTS_IN_RUN_FIELDS)
 
     def __get_all_projects(self) -> Tuple[List[dict], str]:
         """
         Get all cases from all pages
         """
-        return self.__get_all_entities('projects', f"get_projects")
+        if self.metadata is None:
+            return self.__get_all_entities('projects', f"get_projects")
+        return self.metadata.get("get_projects", lambda: self.__get_all_entities('projects', f"get_projects"))
 
-    def __get_all_entities(self, entity: str, link=None, entities=[]) -> Tuple[List[dict], str]:
+    def __send_get_metadata(self, uri: str) -> APIClientResult:
+        """Sends GET request for project metadata, the response is shared when metadata cache is given."""
+        if self.metadata is None:
+            return self.client.send_get(uri)
+        response, _ = self.metadata.get(uri, lambda: self.__with_error(self.client.send_get(uri)))
+        return response
+
+    @staticmethod
+    def __with_error(response: APIClientResult) -> Tuple[APIClientResult, str]:
+        return response, response.error_message
+
+    def __get_all_entities(
+        self, entity: str, link=None, entities=[], fields=None, stream=False
+    ) -> Tuple[List[dict], str]:
         """
         Get all entities from all pages if number of entities is too big to return in single response.
         Function using next page field in API response.
         Entity examples: cases, sections
+        When fields are given, only those fields of entities are kept.
+        With stream, pages are decoded incrementally while they are downloaded (fields are required).
         """
         if link.startswith(self.suffix):
             link = link.replace(self.suffix, "")
-        response = self.client.send_get(link)
+        response = self.client.send_get(link, fields=fields, entity=entity if stream else None)
         if not response.error_message:
             # Endpoints without pagination (legacy)
             if isinstance(response.response_text, list):
@@ -607,7 +862,13 @@ class ApiRequestHandler:
             # Endpoints with pagination
             entities = entities + response.response_text[entity]
             if response.response_text["_links"]["next"] is not None:
-                return self.__get_all_entities(entity, link=response.response_text["_links"]["next"], entities=entities)
+                return self.__get_all_entities(
+                    entity,
+                    link=response.response_text["_links"]["next"],
+                    entities=entities,
+                    fields=fields,
+                    stream=stream,
+                )
             else:
                 return entities, response.error_message
         else:
@@ -1,7 +1,8 @@
-from serde.json import to_dict
-from typing import List, Union, Any, Callable
+from typing import List, Union, Any, Callable, Tuple
 from humanfriendly import parse_timespan
 
+from trcli.data_classes.serializers import fast_to_dict
+
 
 class ApiResponseVerify:
     """Class for verifying if new resources added to Test Rail are created correctly.
@@ -11,6 +12,7 @@ class ApiResponseVerify:
 
     def __init__(self, verify: bool = False):
         self.verify = verify
+        self.__plans = {}
 
     def verify_returned_data(self, added_data: Union[dict, Any], returned_data: dict):
         """
@@ -23,14 +25,21 @@ class ApiResponseVerify:
         """
         if not self.verify:
             return True  # skip verification
-        added_data_json = to_dict(added_data)
-        returned_data_json = to_dict(returned_data)
-        for key, value in added_data_json.items():
-            if not self.field_compare(key)(returned_data_json[key], value):
+        added_data_json = added_data if isinstance(added_data, dict) else fast_to_dict(added_data)
+        for key, compare in self.comparison_plan(tuple(added_data_json)):
+            if not compare(returned_data[key], added_data_json[key]):
                 return False
 
         return True
 
+    def comparison_plan(self, keys: Tuple[str, ...]) -> Tuple[Tuple[str, Callable], ...]:
+        """Returns comparators for all fields of a payload shape. Plans are computed once per shape."""
+        plan = self.__plans.get(keys)
+        if plan is None:
+            plan = tuple((key, self.field_compare(key)) for key in keys)
+            self.__plans[keys] = plan
+        return plan
+
     def verify_returned_data_for_list(
         self, added_data: List[dict], returned_data: List[dict]
     ):
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from trcli.data_classes.dataclass_testrail import TestRailCase
+
+
+class CaseSyncState:
+    """
+    Fingerprints of cases synced to TestRail, stored in a JSON file, so that subsequent syncs only update
+    cases whose body changed. Entries are kept per suite and per source (spec file name) synced to the suite,
+    keyed by automation ID:
+    {"suites": {"<suite ID>": {"<source>": {"<automation ID>": {"case_id": 1, "title": "...", "fingerprint": "..."}}}}}
+    Cases no longer parsed from a source are deleted only from the entries of that source, so that several
+    specs can be synced to one suite. The state can be shared by uploaders of several suites running concurrently.
+    """
+
+    FORMAT_VERSION = 2
+    DELETED_PREFIX = "[DELETED] "
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.__suites: Dict[str, Dict[str, Dict[str, dict]]] = {}
+        self.__lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                state = json.load(file)
+            if state.get("format") == self.FORMAT_VERSION:
+                self.__suites = state["suites"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError):
+            # Corrupted state, all cases are updated once and the state is rewritten
+            pass
+
+    @staticmethod
+    def case_body(case: TestRailCase) -> dict:
+        """Returns body of the case sent to TestRail, without IDs assigned by TestRail."""
+        body = case.to_dict()
+        body.pop("case_id", None)
+        body.pop("section_id", None)
+        return body
+
+    @classmethod
+    def fingerprint(cls, case: TestRailCase) -> str:
+        body = json.dumps(cls.case_body(case), sort_keys=True, default=str)
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def fingerprints(cls, cases: List[TestRailCase]) -> Dict[str, str]:
+        """Returns fingerprints of the given cases keyed by automation ID."""
+        return {case.custom_automation_id: cls.fingerprint(case) for case in cases}
+
+    def changed_cases(
+        self, suite_id: int, source: str, cases: List[TestRailCase], fingerprints: Optional[Dict[str, str]] = None
+    ) -> List[TestRailCase]:
+        """
+        Returns cases which were never synced or whose body changed since the last sync.
+
+        :param fingerprints: fingerprints of the cases keyed by automation ID, computed here if not given
+        """
+        if fingerprints is None:
+            fingerprints = self.fingerprints(cases)
+        synced = self.__suites.get(str(suite_id), {}).get(source or "", {})
+        return [
+            case
+            for case in cases
+            if synced.get(case.custom_automation_id, {}).get("fingerprint") != fingerprints[case.custom_automation_id]
+        ]
+
+    def deleted_cases(self, suite_id: int, source: str, cases: List[TestRailCase]) -> List[dict]:
+        """Returns entries of cases synced from the source, which are no longer among the given cases."""
+        automation_ids = {case.custom_automation_id for case in cases}
+        return [
+            dict(entry, custom_automation_id=automation_id)
+            for automation_id, entry in self.__suites.get(str(suite_id), {}).get(source or "", {}).items()
+            if automation_id not in automation_ids
+        ]
+
+    def update(
+        self,
+        suite_id: int,
+        source: str,
+        cases: List[TestRailCase],
+        deleted: Optional[List[dict]] = None,
+        fingerprints: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Records fingerprints of cases synced from the source. Cases moved from another source
+        of the suite are forgotten there.
+
+        :param cases: cases in TestRail (having case ID) matching their current body
+        :param deleted: entries of deleted cases, which are forgotten
+        :param fingerprints: fingerprints of the cases keyed by automation ID, computed here if not given
+        """
+        if fingerprints is None:
+            fingerprints = self.fingerprints(cases)
+        entries = {
+            case.custom_automation_id: {
+                "case_id": case.case_id,
+                "title": case.title,
+                "fingerprint": fingerprints[case.custom_automation_id],
+            }
+            for case in cases
+        }
+        with self.__lock:
+            sources = self.__suites.setdefault(str(suite_id), {})
+            for other_source, other_synced in sources.items():
+                if other_source != (source or ""):
+                    for automation_id in entries:
+                        other_synced.pop(automation_id, None)
+            synced = sources.setdefault(source or "", {})
+            synced.update(entries)
+            for entry in deleted or []:
+                synced.pop(entry["custom_automation_id"], None)
+
+    def save(self):
+        """Writes the state atomically, so that an interrupted sync never leaves a truncated file."""
+        file = None
+        with self.__lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    "w", dir=self.path.parent, suffix=".tmp", delete=False, encoding="utf-8"
+                ) as file:
+                    json.dump({"format": self.FORMAT_VERSION, "suites": self.__suites}, file, indent=1, sort_keys=True)
+                os.replace(file.name, self.path)
+            except OSError:
+                if file is not None:
+                    with suppress(OSError):
+                        os.remove(file.name)
+                raise
@@ -0,0 +1,118 @@
+import codecs
+import json
+from json import JSONDecodeError
+from typing import Iterable, Iterator, Union
+
+
+class EntityListDecoder:
+    """
+    Incrementally decodes responses of entity list endpoints (e.g. get_cases) while they are downloaded.
+    Only requested fields of each entity are kept, so the raw body and full entities are never held in memory
+    all at once. Both legacy responses (bare list of entities) and paginated responses
+    (object with entities listed under entity key, next to _links) are supported.
+    """
+
+    def __init__(self, entity: str, fields: Iterable[str]):
+        self.entity = entity
+        self.fields = tuple(fields)
+        self.__decoder = json.JSONDecoder()
+        self.__text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.__chunks: Iterator[bytes] = iter(())
+        self.__buffer = ""
+        self.__pos = 0
+        self.__exhausted = False
+
+    def decode(self, chunks: Iterable[bytes]) -> Union[dict, list]:
+        self.__chunks = iter(chunks)
+        self.__buffer = ""
+        self.__pos = 0
+        self.__exhausted = False
+        char = self.__next_char()
+        if char == "[":
+            return self.__entities()
+        if char == "{":
+            return self.__object()
+        # Not a list nor an object, decode it as it is
+        return self.__value()
+
+    def __object(self) -> dict:
+        result = {}
+        self.__pos += 1
+        char = self.__next_char()
+        while char != "}":
+            key = self.__value()
+            if self.__next_char() != ":":
+                self.__raise("Expecting ':' delimiter")
+            self.__pos += 1
+            if key == self.entity and self.__next_char() == "[":
+                result[key] = self.__entities()
+            else:
+                result[key] = self.__value()
+            char = self.__next_char()
+            if char == ",":
+                self.__pos += 1
+                self.__next_char()
+            elif char != "}":
+                self.__raise("Expecting ',' delimiter")
+        self.__pos += 1
+        return result
+
+    def __entities(self) -> list:
+        entities = []
+        self.__pos += 1
+        char = self.__next_char()
+        while char != "]":
+            entity = self.__value()
+            if isinstance(entity, dict):
+                entity = {field: entity[field] for field in self.fields if field in entity}
+            entities.append(entity)
+            char = self.__next_char()
+            if char == ",":
+                self.__pos += 1
+                self.__next_char()
+            elif char != "]":
+                self.__raise("Expecting ',' delimiter")
+        self.__pos += 1
+        return entities
+
+    def __value(self):
+        self.__next_char()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__pos)
+            except JSONDecodeError:
+                if self.__fill():
+                    continue
+                raise
+            # Value touching the end of buffer might be cut (e.g. a number), make sure it is complete
+            if end == len(self.__buffer) and self.__fill():
+                continue
+            self.__pos = end
+            return value
+
+    def __next_char(self) -> str:
+        """Skips whitespaces and returns next character without consuming it (empty string at the end)"""
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos] in " \t\n\r":
+                self.__pos += 1
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                return ""
+
+    def __fill(self) -> bool:
+        """Reads next chunk into buffer, dropping already consumed text. Returns False at the end of the stream."""
+        if self.__exhausted:
+            return False
+        try:
+            chunk = next(self.__chunks)
+            text = self.__text_decoder.decode(chunk)
+        except StopIteration:
+            self.__exhausted = True
+            text = self.__text_decoder.decode(b"", final=True)
+        self.__buffer = self.__buffer[self.__pos:] + text
+        self.__pos = 0
+        return True
+
+    def __raise(self, message: str):
+        raise JSONDecodeError(message, self.__buffer, self.__pos)
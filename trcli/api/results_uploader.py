@@ -1,13 +1,18 @@
+import queue
+import threading
 import time
-from typing import Tuple, Callable, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Callable, List, Iterable
 
 from trcli.api.api_client import APIClient
-from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.api_request_handler import ApiRequestHandler, MetadataCache
+from trcli.api.case_sync import CaseSyncState
 from trcli.cli import Environment
 from trcli.constants import PROMPT_MESSAGES, FAULT_MAPPING, SuiteModes
 from trcli.constants import ProjectErrors, RevertMessages
-from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.data_classes.dataclass_testrail import TestRailSuite, TestRailSection, TestRailCase
 from trcli.data_classes.data_parsers import MatchersParser
+from trcli.settings import PIPELINE_QUEUE_SIZE
 
 
 class ResultsUploader:
@@ -16,8 +21,27 @@ class ResultsUploader:
     Initialized with environment object and result file parser object (any parser derived from FileParser).
     """
 
-    def __init__(self, environment: Environment, suite: TestRailSuite, skip_run: bool = False):
+    def __init__(
+        self,
+        environment: Environment,
+        suite: TestRailSuite,
+        skip_run: bool = False,
+        api_client: APIClient = None,
+        case_index: dict = None,
+        extend_run: bool = False,
+        metadata: MetadataCache = None,
+        sync_state: CaseSyncState = None,
+    ):
+        """
+        :param api_client: client to reuse, new client is instantiated if not given
+        :param case_index: cases of suites by suite ID, shared when uploading several reports (see watch mode)
+        :param extend_run: add cases missing in the updated run before adding results
+        :param metadata: project metadata, shared when uploading several suites
+        :param sync_state: sync state, shared when uploading several suites (loaded from --sync-state if not given)
+        """
         self.project = None
+        self.run_id = None
+        self.extend_run = extend_run
         self.environment = environment
         self.skip_run = skip_run
         self.run_name = self.environment.title
@@ -26,11 +50,14 @@ class ResultsUploader:
         if self.environment.suite_id:
             suite.suite_id = self.environment.suite_id
         self.api_request_handler = ApiRequestHandler(
-            api_client=self.instantiate_api_client(),
+            api_client=api_client or self.instantiate_api_client(),
             environment=self.environment,
             suites_data=suite,
             verify=self.environment.verify,
+            case_index=case_index,
+            metadata=metadata,
         )
+        self.sync_state = sync_state
 
     def upload_results(self):
         """
@@ -43,18 +70,7 @@ class ResultsUploader:
         results_amount = None
 
         # Validate project settings
-        self.environment.log("Checking project. ", new_line=False)
-        self.project = self.api_request_handler.get_project_data(
-            self.environment.project, self.environment.project_id
-        )
-        self._validate_project_id()
-        if self.environment.auto_creation_response:
-            if self.environment.case_matcher == MatchersParser.AUTO:
-                automation_id_error = self.api_request_handler.check_automation_id_field(self.project.project_id)
-                if automation_id_error:
-                    self.environment.elog(automation_id_error)
-                    exit(1)
-        self.environment.log("Done.")
+        self.check_project()
 
         # Resolve test suite
         added_suite_id, result_code = self.get_suite_id(
@@ -73,6 +89,10 @@ class ResultsUploader:
                     missing_item="missing test cases", error_message=error_message
                 )
             )
+        # Cases matched before missing ones are added, only these might need an update
+        matched_test_cases = []
+        if self.environment.sync_state:
+            matched_test_cases = self.api_request_handler.data_provider.existing_cases()
         added_sections = None
         added_test_cases = None
         if self.environment.auto_creation_response:
@@ -85,6 +105,8 @@ class ResultsUploader:
                 )
                 self.environment.log("\n".join(revert_logs))
                 exit(1)
+            if self.environment.schema_rendering == "shared":
+                self.update_section_descriptions()
 
             if missing_test_cases:
                 added_test_cases, result_code = self.add_missing_test_cases()
@@ -100,31 +122,15 @@ class ResultsUploader:
                 exit(1)
 
         if self.skip_run:
+            if self.environment.sync_state:
+                self.sync_test_cases(matched_test_cases)
             stop = time.time()
             if added_test_cases:
                 self.environment.log(f"Submitted {len(added_test_cases)} test cases in {stop - start:.1f} secs.")
             return
 
         # Create/update test run
-        if not self.environment.run_id:
-            self.environment.log(f"Creating test run. ", new_line=False)
-            added_run, error_message = self.api_request_handler.add_run(
-                self.project.project_id, self.run_name, self.environment.milestone_id
-            )
-            if error_message:
-                self.environment.elog("\n" + error_message)
-                revert_logs = self.rollback_changes(
-                    added_suite_id=added_suite_id,
-                    added_sections=added_sections,
-                    added_test_cases=added_test_cases,
-                )
-                self.environment.log("\n".join(revert_logs))
-                exit(1)
-            run_id = added_run
-            self.environment.log(f"Run created: {self.environment.host.rstrip('/')}/index.php?/runs/view/{run_id}")
-        else:
-            run_id = self.environment.run_id
-            self.environment.log(f"Updating run: {self.environment.host.rstrip('/')}/index.php?/runs/view/{run_id}")
+        run_id = self.resolve_run(added_suite_id, added_sections, added_test_cases)
         added_results, error_message, results_amount = self.api_request_handler.add_results(run_id)
         if error_message:
             self.environment.elog(error_message)
@@ -148,6 +154,111 @@ class ResultsUploader:
         if results_amount:
             self.environment.log(f"Submitted {results_amount} test results in {stop - start:.1f} secs.")
 
+    def check_project(self):
+        """Gets and validates project data. Exits with result code 1 on failure."""
+        self.environment.log("Checking project. ", new_line=False)
+        self.project = self.api_request_handler.get_project_data(
+            self.environment.project, self.environment.project_id
+        )
+        self._validate_project_id()
+        if self.environment.auto_creation_response:
+            if self.environment.case_matcher == MatchersParser.AUTO:
+                automation_id_error = self.api_request_handler.check_automation_id_field(self.project.project_id)
+                if automation_id_error:
+                    self.environment.elog(automation_id_error)
+                    exit(1)
+        self.environment.log("Done.")
+
+    def update_section_descriptions(self):
+        """
+        Updates descriptions of existing sections, which list component schemas referenced by their cases
+        (see --schema-rendering shared), if the schemas changed. Exits with result code 1 on failure.
+        """
+        updated_sections, error_message = self.api_request_handler.update_section_descriptions()
+        if error_message:
+            self.environment.elog("\n" + error_message)
+            exit(1)
+        if updated_sections:
+            self.environment.log(f"Updated descriptions of {len(updated_sections)} sections.")
+
+    def sync_test_cases(self, matched_test_cases: List[TestRailCase]) -> int:
+        """
+        Updates matched cases whose body changed since the last sync (see CaseSyncState) and reports cases
+        synced from the source of the suite which are no longer parsed, flagging them if requested. Fingerprints
+        of synced cases are saved to the sync state file. Exits with result code 1 on failure.
+        Returns number of updated cases.
+        """
+        state = self.sync_state or CaseSyncState(self.environment.sync_state)
+        suite = self.api_request_handler.suites_data_from_provider
+        parsed_cases = [case for section in suite.testsections for case in section.testcases]
+        synced_cases = [case for case in parsed_cases if case.case_id is not None]
+        # Texts of synced cases are rendered at once and each case is fingerprinted only once
+        if suite.case_renderer is not None:
+            suite.case_renderer.render(synced_cases)
+        fingerprints = state.fingerprints(synced_cases)
+        changed_cases = state.changed_cases(suite.suite_id, suite.source, matched_test_cases, fingerprints)
+        bodies = {case.case_id: state.case_body(case) for case in changed_cases}
+        deleted_cases = state.deleted_cases(suite.suite_id, suite.source, parsed_cases)
+        if deleted_cases:
+            self.environment.log(f"Found {len(deleted_cases)} synced test cases no longer present.")
+            if self.environment.flag_deleted:
+                for entry in deleted_cases:
+                    if not entry["title"].startswith(CaseSyncState.DELETED_PREFIX):
+                        bodies[entry["case_id"]] = {"title": CaseSyncState.DELETED_PREFIX + entry["title"]}
+        if bodies:
+            _, error_message = self.api_request_handler.update_cases(bodies)
+            if error_message:
+                self.environment.elog("\n" + error_message)
+                exit(1)
+        else:
+            self.environment.log("No test cases changed since the last sync.")
+        state.update(
+            suite.suite_id,
+            suite.source,
+            synced_cases,
+            deleted_cases if self.environment.flag_deleted else None,
+            fingerprints,
+        )
+        try:
+            state.save()
+        except OSError as error:
+            self.environment.elog(f"Unable to save sync state: {error}")
+        return len(bodies)
+
+    def resolve_run(self, added_suite_id: int, added_sections: list, added_test_cases: list) -> int:
+        """
+        Creates new test run or uses the run given by run ID. Rolls back added items and exits
+        with result code 1 on failure.
+        Returns ID of the run.
+        """
+        if not self.environment.run_id:
+            self.environment.log(f"Creating test run. ", new_line=False)
+            added_run, error_message = self.api_request_handler.add_run(
+                self.project.project_id, self.run_name, self.environment.milestone_id
+            )
+            if error_message:
+                self.environment.elog("\n" + error_message)
+                revert_logs = self.rollback_changes(
+                    added_suite_id=added_suite_id,
+                    added_sections=added_sections,
+                    added_test_cases=added_test_cases,
+                )
+                self.environment.log("\n".join(revert_logs))
+                exit(1)
+            run_id = added_run
+            self.environment.log(f"Run created: {self.environment.host.rstrip('/')}/index.php?/runs/view/{run_id}")
+        else:
+            run_id = self.environment.run_id
+            self.environment.log(f"Updating run: {self.environment.host.rstrip('/')}/index.php?/runs/view/{run_id}")
+            if self.extend_run:
+                # Run might have been created for another report, not containing all cases of this one
+                error_message = self.api_request_handler.add_cases_to_run(run_id)
+                if error_message:
+                    self.environment.elog(error_message)
+                    exit(1)
+        self.run_id = run_id
+        return run_id
+
     def get_suite_id(self, project_id: int, suite_mode: int) -> Tuple[int, int]:
         """
         Gets and checks suite ID for specified project_id.
@@ -247,8 +358,9 @@ class ResultsUploader:
         ) = self.api_request_handler.check_missing_section_ids(project_id)
         if missing_sections:
             if self.api_request_handler.data_provider.check_section_names_duplicates():
+                source = self.api_request_handler.suites_data_from_provider.source or self.environment.file
                 self.environment.elog(
-                    f"Error: Section duplicates detected in {self.environment.file}. "
+                    f"Error: Section duplicates detected in {source}. "
                     f"This will result to failure to upload all cases."
                 )
                 return added_sections, result_code
@@ -414,3 +526,153 @@ class ResultsUploader:
                 )
             )
             exit(1)
+
+
+class PipelinedResultsUploader(ResultsUploader):
+    """
+    Uploads results while the report is still being parsed. Sections are parsed on a separate thread while
+    the project and suite are checked and cases of the suite are fetched, then each section is matched
+    as soon as it is parsed. Run is created for matched cases and their results are added while missing
+    cases are added to TestRail. Results of added cases follow, once they are included in the run.
+    """
+
+    def __init__(self, environment: Environment, suite: TestRailSuite, sections: Iterable[TestRailSection]):
+        """
+        :param suite: suite without sections, parsed sections are added to it as they are matched
+        :param sections: sections of the suite, parsed lazily
+        """
+        super().__init__(environment=environment, suite=suite)
+        self.sections = sections
+        self.__sections_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.__parse_error = None
+
+    def upload_results(self):
+        start = time.time()
+        suite = self.api_request_handler.suites_data_from_provider
+        parser_thread = threading.Thread(target=self.__parse_sections, daemon=True)
+        parser_thread.start()
+
+        self.check_project()
+        project_id = self.project.project_id
+        # Suite name is known once first section is parsed
+        section = self.__sections_queue.get()
+        added_suite_id, result_code = self.get_suite_id(project_id=project_id, suite_mode=self.project.suite_mode)
+        if result_code == -1:
+            exit(1)
+
+        # Match sections while they are parsed
+        missing_cases_number = 0
+        matching_error = ""
+        while section is not None:
+            section.suite_id = suite.suite_id
+            suite.testsections.append(section)
+            if not matching_error:
+                missing_in_section, matching_error = self.api_request_handler.match_test_cases(project_id, [section])
+                missing_cases_number += missing_in_section
+            section = self.__sections_queue.get()
+        parser_thread.join()
+        if self.__parse_error is not None:
+            self.environment.log("\n".join(self.rollback_changes(added_suite_id=added_suite_id)))
+            raise self.__parse_error
+        cases_count = sum(len(section.testcases) for section in suite.testsections)
+        self.environment.log(f"Processed {cases_count} test cases in {len(suite.testsections)} sections.")
+        if matching_error:
+            self.environment.elog(
+                FAULT_MAPPING["error_checking_missing_item"].format(
+                    missing_item="missing test cases", error_message=matching_error
+                )
+            )
+            missing_cases_number = 0
+        elif missing_cases_number:
+            if self.environment.case_matcher == MatchersParser.AUTO:
+                self.environment.log(f"Found {missing_cases_number} test cases not matching any TestRail case.")
+            else:
+                self.environment.log(f"Found {missing_cases_number} test cases without case ID in the report file.")
+
+        added_sections = None
+        if self.environment.auto_creation_response:
+            added_sections, result_code = self.add_missing_sections(project_id)
+            if result_code == -1:
+                revert_logs = self.rollback_changes(added_suite_id=added_suite_id, added_sections=added_sections)
+                self.environment.log("\n".join(revert_logs))
+                exit(1)
+
+        add_cases = bool(self.environment.auto_creation_response and missing_cases_number)
+        if add_cases:
+            # Confirmation is resolved here, the worker adding cases never prompts the user
+            prompt_message = PROMPT_MESSAGES["create_missing_test_cases"].format(project_name=self.environment.project)
+            if not self.environment.get_prompt_response_for_auto_creation(prompt_message):
+                self.environment.elog(FAULT_MAPPING["no_user_agreement"].format(type="test cases"))
+                self.__rollback_and_exit(added_suite_id, added_sections, None, self.environment.run_id)
+            self.environment.log("Adding missing test cases to the suite.")
+
+        matched_cases = [
+            case for section in suite.testsections for case in section.testcases if case.case_id is not None
+        ]
+        run_id = self.resolve_run(added_suite_id, added_sections, added_test_cases=None)
+        # Results in result store can not be split, they are added at once after adding cases
+        split_results = suite.result_store is None
+        results_amount = 0
+        results_error = ""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            adding_cases = executor.submit(self.api_request_handler.add_cases) if add_cases else None
+            if split_results and matched_cases:
+                _, results_error, results_amount = self.api_request_handler.add_results(run_id, matched_cases)
+            added_test_cases, adding_error = adding_cases.result() if adding_cases else (None, "")
+        if adding_error or results_error:
+            for error_message in (adding_error, results_error):
+                if error_message:
+                    self.environment.elog(error_message)
+            self.__rollback_and_exit(added_suite_id, added_sections, added_test_cases, run_id)
+
+        if added_test_cases and (run_id != self.environment.run_id or self.extend_run):
+            error_message = self.api_request_handler.add_cases_to_run(run_id)
+            if error_message:
+                self.environment.elog(error_message)
+                self.__rollback_and_exit(added_suite_id, added_sections, added_test_cases, run_id)
+        if split_results:
+            matched = {id(case) for case in matched_cases}
+            remaining_cases = [
+                case
+                for section in suite.testsections
+                for case in section.testcases
+                if case.case_id is not None and id(case) not in matched
+            ]
+        else:
+            remaining_cases = None
+        if remaining_cases is None or remaining_cases:
+            _, results_error, added_results = self.api_request_handler.add_results(run_id, remaining_cases)
+            results_amount += added_results
+            if results_error:
+                self.environment.elog(results_error)
+                self.__rollback_and_exit(added_suite_id, added_sections, added_test_cases, run_id)
+
+        if self.environment.close_run:
+            self.environment.log("Closing test run. ", new_line=False)
+            _, error_message = self.api_request_handler.close_run(run_id)
+            if error_message:
+                self.environment.elog("\n" + error_message)
+                exit(1)
+
+        stop = time.time()
+        if results_amount:
+            self.environment.log(f"Submitted {results_amount} test results in {stop - start:.1f} secs.")
+
+    def __parse_sections(self):
+        try:
+            for section in self.sections:
+                self.__sections_queue.put(section)
+        except BaseException as exception:
+            self.__parse_error = exception
+        finally:
+            self.__sections_queue.put(None)
+
+    def __rollback_and_exit(self, added_suite_id: int, added_sections: list, added_test_cases: list, run_id: int):
+        revert_logs = self.rollback_changes(
+            added_suite_id=added_suite_id,
+            added_sections=added_sections,
+            added_test_cases=added_test_cases,
+            run_id=0 if run_id == self.environment.run_id else run_id,
+        )
+        self.environment.log("\n".join(revert_logs))
+        exit(1)
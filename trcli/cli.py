@@ -57,6 +57,17 @@ class Environment:
         self._case_fields = None
         self._result_fields = None
         self.allow_ms = False
+        self.columnar_results = False
+        self.parallel_parsing = False
+        self.parse_cache = False
+        self.watch = None
+        self.pipeline = False
+        self.watch_timeout = None
+        self.validation = "full"
+        self.sync_state = None
+        self.flag_deleted = False
+        self.schema_rendering = "inline"
+        self.case_text_limit = None
 
     @property
     def case_fields(self):
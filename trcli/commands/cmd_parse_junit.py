@@ -1,14 +1,17 @@
+from pathlib import Path
 from xml.etree.ElementTree import ParseError
 
 import click
 from junitparser import JUnitXmlError
 from trcli import settings, __version__
 
-from trcli.api.results_uploader import ResultsUploader
+from trcli.api.results_uploader import ResultsUploader, PipelinedResultsUploader
 from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
 from trcli.constants import FAULT_MAPPING
 from trcli.data_classes.validation_exception import ValidationException
 from trcli.readers.junit_xml import JunitParser
+from trcli.readers.report_sources import INVALID_SOURCE_ERRORS
+from trcli.readers.report_watcher import ReportWatcher
 
 
 def print_config(env: Environment):
@@ -23,6 +26,51 @@ def print_config(env: Environment):
             f"\n> Auto-create entities: {env.auto_creation_response}")
 
 
+def upload_watched_reports(env: Environment):
+    """
+    Uploads reports as they appear in the watched directory. Run is created for the first report
+    and results of all following reports are added to it, reusing API client and fetched cases.
+    """
+    close_run = env.close_run
+    env.close_run = False
+    watcher = ReportWatcher(env.watch, pattern=Path(env.file).name, timeout=env.watch_timeout)
+    result_uploader = None
+    case_index = {}
+    env.log(f"Watching {env.watch} for reports.")
+    try:
+        for report in watcher:
+            env.log(f"Processing report {report.name}.")
+            env.file = report
+            try:
+                suites = JunitParser(env).parse_file()
+            except (JUnitXmlError, ParseError, *INVALID_SOURCE_ERRORS):
+                # Report can be picked up while it is still written, it is parsed again once it changes
+                env.elog(f"Report {report.name} could not be parsed, it is retried when it changes.")
+                watcher.retry(report)
+                continue
+            for suite in suites:
+                result_uploader = ResultsUploader(
+                    environment=env,
+                    suite=suite,
+                    api_client=result_uploader.api_request_handler.client if result_uploader else None,
+                    case_index=case_index,
+                    extend_run=True,
+                )
+                result_uploader.upload_results()
+                env.run_id = env.run_id or result_uploader.run_id
+                env.suite_id = env.suite_id or result_uploader.api_request_handler.suites_data_from_provider.suite_id
+    except KeyboardInterrupt:
+        env.log("Watching interrupted.")
+    env.log("Watching stopped.")
+    if close_run and result_uploader and env.run_id:
+        env.log("Closing test run. ", new_line=False)
+        _, error_message = result_uploader.api_request_handler.close_run(env.run_id)
+        if error_message:
+            env.elog("\n" + error_message)
+            exit(1)
+        env.log("Done.")
+
+
 @click.command(context_settings=CONTEXT_SETTINGS)
 @click.option("-f", "--file", type=click.Path(), metavar="", help="Filename and path.")
 @click.option("--close-run", is_flag=True, help="Close the newly created run")
@@ -77,25 +125,80 @@ def print_config(env: Environment):
     help="Optional special parser option for specialized JUnit reports."
 )
 @click.option("--allow-ms", is_flag=True, help="Allows using milliseconds for elapsed times.")
+@click.option(
+    "--columnar-results",
+    is_flag=True,
+    help="Keep parsed results in a compact columnar store (for very large reports).",
+)
+@click.option(
+    "--parallel-parsing",
+    is_flag=True,
+    help="Parse large reports in parallel, split at top level testsuite elements.",
+)
+@click.option(
+    "--parse-cache",
+    is_flag=True,
+    help="Reuse parsed reports from previous runs if report files did not change.",
+)
+@click.option(
+    "--watch",
+    type=click.Path(file_okay=False),
+    metavar="",
+    help="Directory to watch for reports, uploaded to the same run as they appear "
+         "(-f is the report name pattern, *.xml by default).",
+)
+@click.option(
+    "--watch-timeout",
+    type=click.IntRange(min=1),
+    default=600,
+    metavar="",
+    help="Seconds without new reports after which watching stops.",
+)
+@click.option(
+    "--pipeline",
+    is_flag=True,
+    help="Match and upload results while the report is parsed (not for saucectl reports or --watch).",
+)
 @click.pass_context
 @pass_environment
 def cli(environment: Environment, context: click.Context, *args, **kwargs):
     """Parse JUnit report and upload results to TestRail"""
     environment.set_parameters(context)
+    if environment.watch and not environment.file:
+        environment.file = "*.xml"
     environment.check_for_required_parameters()
+    if environment.pipeline:
+        for other_option, used in (
+            ("--watch", environment.watch),
+            ("--special-parser saucectl", environment.special_parser == "saucectl"),
+        ):
+            if used:
+                environment.elog(
+                    FAULT_MAPPING["incompatible_options"].format(option="--pipeline", other_option=other_option)
+                )
+                exit(1)
     settings.ALLOW_ELAPSED_MS = environment.allow_ms
     print_config(environment)
     try:
-        parsed_suites = JunitParser(environment).parse_file()
-        for suite in parsed_suites:
-            result_uploader = ResultsUploader(environment=environment, suite=suite)
-            result_uploader.upload_results()
+        if environment.watch:
+            upload_watched_reports(environment)
+        elif environment.pipeline:
+            suite, sections = JunitParser(environment).parse_file_streamed()
+            PipelinedResultsUploader(environment=environment, suite=suite, sections=sections).upload_results()
+        else:
+            parsed_suites = JunitParser(environment).parse_file()
+            for suite in parsed_suites:
+                result_uploader = ResultsUploader(environment=environment, suite=suite)
+                result_uploader.upload_results()
     except FileNotFoundError:
         environment.elog(FAULT_MAPPING["missing_file"])
         exit(1)
-    except (JUnitXmlError, ParseError):
+    except (JUnitXmlError, ParseError, *INVALID_SOURCE_ERRORS):
         environment.elog(FAULT_MAPPING["invalid_file"])
         exit(1)
+    except ImportError as exception:
+        environment.elog(str(exception))
+        exit(1)
     except ValidationException as exception:
         environment.elog(
             FAULT_MAPPING["dataclass_validation_error"].format(
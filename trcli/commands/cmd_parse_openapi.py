@@ -1,27 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from xml.etree.ElementTree import ParseError
 
 import click
 from junitparser import JUnitXmlError
 
 from trcli import settings
+from trcli.api.api_request_handler import MetadataCache
+from trcli.api.case_sync import CaseSyncState
 from trcli.api.results_uploader import ResultsUploader
 from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
-from trcli.constants import FAULT_MAPPING
+from trcli.constants import FAULT_MAPPING, SuiteModes
+from trcli.data_classes.data_parsers import MatchersParser
 from trcli.data_classes.validation_exception import ValidationException
-from trcli.readers.openapi import OpenApiParser
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.readers.openapi import OpenApiParser, parse_openapi_specs
 
 
 def print_config(env: Environment):
+    files = env.file if isinstance(env.file, (list, tuple)) else [env.file]
     env.log(f"Parse OpenAPI Execution Parameters"
-            f"\n> OpenAPI file: {env.file}"
+            f"\n> OpenAPI file: {', '.join(map(str, files))}"
             f"\n> Config file: {env.config}"
             f"\n> TestRail instance: {env.host} (user: {env.username})"
             f"\n> Project: {env.project if env.project else env.project_id}"
             f"\n> Auto-create entities: {env.auto_creation_response}")
 
 
+def upload_suites(env: Environment, suites: list[TestRailSuite]):
+    """
+    Uploads suites of several specs, concurrently unless the user is prompted for confirmations. Suites uploaded
+    to the same TestRail suite are uploaded one after another. Uploaders share API client, fetched cases,
+    project metadata and sync state.
+    """
+    metadata = MetadataCache()
+    case_index = {}
+    sync_state = CaseSyncState(env.sync_state) if env.sync_state else None
+    api_client = None
+    uploaders_by_suite = {}
+    for suite in suites:
+        result_uploader = ResultsUploader(
+            environment=env,
+            suite=suite,
+            skip_run=True,
+            api_client=api_client,
+            case_index=case_index,
+            metadata=metadata,
+            sync_state=sync_state,
+        )
+        api_client = result_uploader.api_request_handler.client
+        uploaders_by_suite.setdefault(env.suite_id or suite.name, []).append(result_uploader)
+    if len(uploaders_by_suite) < 2 or env.auto_creation_response is None or _single_suite_project(result_uploader):
+        for result_uploaders in uploaders_by_suite.values():
+            _upload_results(result_uploaders)
+        return
+    env.log(f"Uploading {len(suites)} specifications to {len(uploaders_by_suite)} suites concurrently.")
+    with ThreadPoolExecutor(max_workers=min(settings.MAX_WORKERS_UPLOAD_SUITES, len(uploaders_by_suite))) as executor:
+        futures = [executor.submit(_upload_results, result_uploaders) for result_uploaders in uploaders_by_suite.values()]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        finally:
+            # Uploads which did not start yet are cancelled when an upload failed
+            for future in futures:
+                future.cancel()
+
+
+def _single_suite_project(result_uploader: ResultsUploader) -> bool:
+    """Specs are uploaded to the only suite of single suite projects (fetched project data is reused by uploads)."""
+    env = result_uploader.environment
+    project = result_uploader.api_request_handler.get_project_data(env.project, env.project_id)
+    return project.suite_mode == SuiteModes.single_suite
+
+
+def _upload_results(result_uploaders: list[ResultsUploader]):
+    for result_uploader in result_uploaders:
+        result_uploader.upload_results()
+
+
 @click.command(context_settings=CONTEXT_SETTINGS)
-@click.option("-f", "--file", type=click.Path(), metavar="", help="Filename and path.")
+@click.option(
+    "-f",
+    "--file",
+    type=click.Path(),
+    multiple=True,
+    metavar="",
+    help="Filename and path, or glob pattern. Can be repeated to import several specs.",
+)
 @click.option(
     "--suite-id",
     type=click.IntRange(min=1),
@@ -36,6 +100,44 @@ def print_config(env: Environment):
     help="List of case fields and values for new test cases creation. "
          "Usage: --case-fields type_id:1 --case-fields priority_id:3",
 )
+@click.option(
+    "--validation",
+    type=click.Choice(OpenApiParser.VALIDATION_MODES, case_sensitive=False),
+    default="full",
+    metavar="",
+    help="Validation of the spec: full, structural (OpenAPI schema only) or off.",
+)
+@click.option(
+    "--parse-cache",
+    is_flag=True,
+    help="Reuse resolved and validated spec from previous runs if the spec did not change.",
+)
+@click.option(
+    "--sync-state",
+    type=click.Path(dir_okay=False),
+    metavar="",
+    help="File with fingerprints of synced cases. Cases are matched by automation ID "
+         "and only cases changed since the last sync are updated.",
+)
+@click.option(
+    "--flag-deleted",
+    is_flag=True,
+    help="Prefix titles of synced cases no longer in the spec with [DELETED] (requires --sync-state).",
+)
+@click.option(
+    "--schema-rendering",
+    type=click.Choice(OpenApiParser.SCHEMA_RENDERING_MODES, case_sensitive=False),
+    default="inline",
+    metavar="",
+    help="Schemas in case texts: inline, or shared (component schemas in section "
+         "descriptions, referenced by name in cases).",
+)
+@click.option(
+    "--case-text-limit",
+    type=click.IntRange(min=1),
+    metavar="",
+    help="Maximum number of characters of each case text, longer texts are truncated.",
+)
 @click.pass_context
 @pass_environment
 def cli(environment: Environment, context: click.Context, *args, **kwargs):
@@ -43,13 +145,17 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
     environment.cmd = "parse_openapi"
     environment.set_parameters(context)
     environment.check_for_required_parameters()
+    if environment.flag_deleted and not environment.sync_state:
+        environment.elog(FAULT_MAPPING["option_requires_other"].format(option="--flag-deleted", other_option="--sync-state"))
+        exit(1)
+    if environment.sync_state:
+        # Synced cases are matched by automation ID, so that existing cases are not added again
+        environment.case_matcher = MatchersParser.AUTO
     settings.ALLOW_ELAPSED_MS = environment.allow_ms
     print_config(environment)
     try:
-        parsed_suites = OpenApiParser(environment).parse_file()
-        for suite in parsed_suites:
-            result_uploader = ResultsUploader(environment=environment, suite=suite, skip_run=True)
-            result_uploader.upload_results()
+        specs = OpenApiParser.list_specs(environment.file)
+        upload_suites(environment, parse_openapi_specs(environment, specs))
     except FileNotFoundError:
         environment.elog(FAULT_MAPPING["missing_file"])
         exit(1)
@@ -8,6 +8,7 @@ PARSE_JUNIT_FAULT_MAPPING = dict(
 FAULT_MAPPING = dict(
     missing_file="Please provide a valid path to your results file with the -f argument.",
     invalid_file="Provided file is not a valid file.",
+    zstd_not_available="Reading zstd compressed reports requires the zstandard package (pip install zstandard).",
     missing_host="Please provide a TestRail server address with the -h argument.",
     missing_project="Please specify the project name using the --project argument.",
     missing_username="Please provide a valid TestRail username using the -u argument.",
@@ -39,11 +40,14 @@ FAULT_MAPPING = dict(
     dataclass_validation_error="Unable to parse field {field} in {class_name} tag. {reason}",
     unknown_section_id="There are some sections that have IDs and not exist in Test Rail.",
     missing_run_id_when_case_id_present="--case-id needs to be passed together with --run-id parameter.",
+    incompatible_options="{option} can not be used together with {other_option}.",
+    option_requires_other="{option} requires {other_option}.",
     mismatch_between_case_id_and_result_file="Could not match --case-id with result file. "
     "Please make sure that:\n--case-id matches ID "
     "(if present) under `testcase` tag in result xml file\nand\n"
     "only one result is present in result xml file.",
     unexpected_error_during_request_send="Unexpected error occurred during sending request: {request}",
+    invalid_response_content="Unable to decode response content received for: {uri}",
     automation_id_unavailable=f"The automation_id field is not properly configured. "
     f"Please configure it in the TestRail Administration under Customizations > Case Fields.\n"
     f"The field should have the following mandatory details:\n"
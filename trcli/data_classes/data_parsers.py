@@ -1,6 +1,12 @@
+import ast
+import copy
 import re
+from functools import lru_cache
 from typing import Union
 
+# Marks cached values which are not literals (None is a valid literal)
+_NOT_A_LITERAL = object()
+
 
 class MatchersParser:
 
@@ -8,7 +14,13 @@ class MatchersParser:
     NAME = "name"
     PROPERTY = "property"
 
+    # IDs as whole words separated by spaces or by underscores ("C123" followed by digits only)
+    ID_WORD_PATTERN = re.compile(r"(?<![^ ])[cC](?P<space>\d+)(?![^ ])|(?<![^_])[cC](?P<underscore>\d+)(?![^_])")
+    ID_TAG_PATTERN = re.compile(r"\[(.*?)\]")
+    NAMES_CACHE_SIZE = 65536
+
     @staticmethod
+    @lru_cache(maxsize=NAMES_CACHE_SIZE)
     def parse_name_with_id(case_name: str) -> (int, str):
         """Parses case names expecting an ID following one of the following patterns:
         - "C123 my test case"
@@ -20,21 +32,26 @@ class MatchersParser:
         - "my test case [C123]"
         - "module 1 [C123] my test case"
 
+        IDs separated by spaces take precedence over IDs separated by underscores and over IDs in brackets.
+        Results are cached, as names of parametrized tests are usually repeated.
+
         :param case_name: Name of the test case
         :return: Tuple with test case ID and test case name without the ID
         """
-        for char in [" ", "_"]:
-            parts = case_name.split(char)
-            parts_copy = parts.copy()
-            for idx, part in enumerate(parts):
-                if part.lower().startswith("c") and len(part) > 1:
-                    id_part = part[1:]
-                    if id_part.isnumeric():
-                        parts_copy.pop(idx)
-                        return int(id_part), char.join(parts_copy)
-
-        results = re.findall(r"\[(.*?)\]", case_name)
-        for result in results:
+        underscore_match = None
+        for match in MatchersParser.ID_WORD_PATTERN.finditer(case_name):
+            if match.group("space") is not None:
+                return int(match.group("space")), MatchersParser.__remove_word(case_name, match, " ")
+            if underscore_match is None:
+                underscore_match = match
+        if underscore_match is not None:
+            return int(underscore_match.group("underscore")), MatchersParser.__remove_word(
+                case_name, underscore_match, "_"
+            )
+
+        if "[" not in case_name:
+            return None, case_name
+        for result in MatchersParser.ID_TAG_PATTERN.findall(case_name):
             if result.lower().startswith("c"):
                 case_id = result[1:]
                 if case_id.isnumeric():
@@ -45,9 +62,40 @@ class MatchersParser:
 
         return None, case_name
 
+    @staticmethod
+    def __remove_word(case_name: str, match: re.Match, separator: str) -> str:
+        """Removes matched word together with one separator, as if words were joined without it."""
+        start, end = match.span()
+        if start:
+            return case_name[:start - 1] + case_name[end:]
+        return case_name[end + len(separator):]
+
 
 class FieldsParser:
 
+    LITERALS_CACHE_SIZE = 4096
+
+    @staticmethod
+    def parse_literal(value: str):
+        """Safely parses Python literal (e.g. list of IDs) from field value.
+
+        :param value: Field value
+        :return: Parsed literal or the value itself if it is not a valid literal
+        """
+        literal = FieldsParser.__literal(value)
+        if literal is _NOT_A_LITERAL:
+            return value
+        # Cached literals are shared, callers get their own copy of containers
+        return copy.deepcopy(literal) if isinstance(literal, (list, dict, set)) else literal
+
+    @staticmethod
+    @lru_cache(maxsize=LITERALS_CACHE_SIZE)
+    def __literal(value: str):
+        try:
+            return ast.literal_eval(value)
+        except Exception:
+            return _NOT_A_LITERAL
+
     @staticmethod
     def resolve_fields(fields: Union[list[str], dict]) -> (dict, str):
         error = None
@@ -57,10 +105,7 @@ class FieldsParser:
                 for field in fields:
                     field, value = field.split(":", maxsplit=1)
                     if value.startswith("["):
-                        try:
-                            value = eval(value)
-                        except Exception:
-                            pass
+                        value = FieldsParser.parse_literal(value)
                     fields_dictionary[field] = value
             elif isinstance(fields, dict):
                 fields_dictionary = fields
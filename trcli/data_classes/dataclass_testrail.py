@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from time import gmtime, strftime
 from typing import List, Optional
 
-from serde import field, serialize, deserialize, to_dict
+from serde import field, serialize, deserialize
 
 from trcli import settings
+from trcli.data_classes.serializers import fast_to_dict
 from trcli.data_classes.validation_exception import ValidationException
 
 
@@ -99,7 +100,7 @@ class TestRailResult:
         self.result_fields = new_results_fields
 
     def to_dict(self) -> dict:
-        result_dict = to_dict(self)
+        result_dict = fast_to_dict(self)
         result_dict.update(self.result_fields)
         return result_dict
 
@@ -122,6 +123,9 @@ class TestRailCase:
     result: TestRailResult = field(default=None, metadata={"serde_skip": True})
     custom_automation_id: str = field(default=None, skip_if_default=True)
 
+    # Row of the result in the result store of the suite, when results are stored in columns (result is None)
+    result_row = None
+
     def __int__(self):
         return int(self.case_id) if self.case_id is not None else -1
 
@@ -151,7 +155,7 @@ class TestRailCase:
         self.case_fields = new_case_fields
 
     def to_dict(self) -> dict:
-        case_dict = to_dict(self)
+        case_dict = fast_to_dict(self)
         case_dict.update(self.case_fields)
         return case_dict
 
@@ -220,6 +224,10 @@ class TestRailSuite:
     def __post_init__(self):
         current_time = strftime("%d-%m-%y %H:%M:%S", gmtime())
         self.name = f"{self.source} {current_time}" if self.name is None else self.name
+        # Helpers set by parsers, not fields: ResultStore holding the results of all cases (see --columnar-results)
+        self.result_store = None
+        # Renderer of case texts rendered only for cases whose bodies are sent (see OpenApiCaseRenderer)
+        self.case_renderer = None
 
 
 @dataclass
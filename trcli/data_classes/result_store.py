@@ -0,0 +1,131 @@
+import math
+import sys
+from array import array
+from collections import Counter
+from typing import Iterator, List, Optional
+
+from trcli.data_classes.dataclass_testrail import TestRailResult
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ResultStore:
+    """Columnar in-memory store for test results of very large reports.
+
+    Case IDs, status IDs and elapsed seconds are kept in typed arrays, classnames and titles are interned.
+    Rarely used fields (attachments and result fields) are kept sparse, by row.
+    Missing values are stored as -1 (case ID), 0 (status ID) and NaN (elapsed).
+    """
+
+    def __init__(self):
+        self.case_ids = array("q")
+        self.status_ids = array("b")
+        self.elapsed = array("d")
+        self.classnames: List[str] = []
+        self.titles: List[str] = []
+        self.comments: List[Optional[str]] = []
+        self._attachments = {}
+        self._result_fields = {}
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def append(
+        self,
+        case_id: Optional[int],
+        status_id: Optional[int],
+        elapsed: Optional[float],
+        classname: str,
+        title: str,
+        comment: str = None,
+        attachments: list = None,
+        result_fields: dict = None,
+    ) -> int:
+        """Adds a single result to the store.
+
+        :returns: row of the added result
+        """
+        row = len(self.case_ids)
+        self.case_ids.append(-1 if case_id is None else int(case_id))
+        self.status_ids.append(status_id or 0)
+        self.elapsed.append(self.__to_seconds(elapsed))
+        self.classnames.append(sys.intern(classname))
+        self.titles.append(sys.intern(title))
+        self.comments.append(comment)
+        if attachments:
+            self._attachments[row] = attachments
+        if result_fields:
+            self._result_fields[row] = result_fields
+        return row
+
+    def extend(self, other: "ResultStore", rows: range = None):
+        """Appends results of another store (all of them or a range of its rows), keeping their order."""
+        rows = range(len(other)) if rows is None else rows
+        columns = slice(rows.start, rows.stop)
+        offset = len(self) - rows.start
+        self.case_ids.extend(other.case_ids[columns])
+        self.status_ids.extend(other.status_ids[columns])
+        self.elapsed.extend(other.elapsed[columns])
+        self.classnames.extend(other.classnames[columns])
+        self.titles.extend(other.titles[columns])
+        self.comments.extend(other.comments[columns])
+        self._attachments.update(
+            {offset + row: value for row, value in other._attachments.items() if row in rows}
+        )
+        self._result_fields.update(
+            {offset + row: value for row, value in other._result_fields.items() if row in rows}
+        )
+
+    def automation_id(self, row: int) -> str:
+        # Normalized the same way as TestRailCase.custom_automation_id of the case of the row
+        return f"{self.classnames[row]}.{self.titles[row]}".strip()
+
+    def set_case_id(self, row: int, case_id: int):
+        self.case_ids[row] = int(case_id)
+
+    def status_counts(self) -> dict:
+        """Returns number of results per status ID (0 for results without status)."""
+        if numpy is not None and len(self):
+            statuses = numpy.frombuffer(self.status_ids, dtype=numpy.int8)
+            counts = numpy.bincount(statuses)
+            return {status: int(count) for status, count in enumerate(counts) if count}
+        return dict(Counter(self.status_ids))
+
+    def total_elapsed(self) -> float:
+        """Returns sum of elapsed seconds of all results with known elapsed time."""
+        if numpy is not None and len(self):
+            return float(numpy.nansum(numpy.frombuffer(self.elapsed, dtype=numpy.float64)))
+        return math.fsum(value for value in self.elapsed if not math.isnan(value))
+
+    def result_bodies(self, global_result_fields: dict = None) -> Iterator[dict]:
+        """Yields bodies for adding results, only for results that already have case ID.
+        Bodies have the same shape as TestRailResult.to_dict().
+        """
+        for row, case_id in enumerate(self.case_ids):
+            if case_id == -1:
+                continue
+            body = {"case_id": case_id}
+            if self.status_ids[row]:
+                body["status_id"] = self.status_ids[row]
+            if self.comments[row] is not None:
+                body["comment"] = self.comments[row]
+            elapsed = self.elapsed[row]
+            if not math.isnan(elapsed):
+                elapsed = TestRailResult.proper_format_for_elapsed(elapsed)
+                if elapsed is not None:
+                    body["elapsed"] = elapsed
+            body["attachments"] = self._attachments.get(row, [])
+            if global_result_fields:
+                body.update(global_result_fields)
+            body.update(self._result_fields.get(row, {}))
+            yield body
+
+    @staticmethod
+    def __to_seconds(elapsed) -> float:
+        try:
+            return math.nan if elapsed is None else float(elapsed)
+        except ValueError:
+            return math.nan
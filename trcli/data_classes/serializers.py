@@ -0,0 +1,63 @@
+import dataclasses
+from typing import Any, Callable, Dict
+
+from serde import to_dict
+
+_serializers: Dict[type, Callable[[Any], dict]] = {}
+
+
+def fast_to_dict(obj: Any) -> dict:
+    """Serializes dataclass instance to dict with a serializer generated once per class.
+    Output is the same as pyserde to_dict for the flat dataclasses used in request bodies.
+    Dicts are returned as shallow copies.
+    """
+    if isinstance(obj, dict):
+        return dict(obj)
+    serializer = _serializers.get(type(obj))
+    if serializer is None:
+        serializer = compile_serializer(type(obj))
+        _serializers[type(obj)] = serializer
+    return serializer(obj)
+
+
+def compile_serializer(cls: type) -> Callable[[Any], dict]:
+    """Generates to_dict function for a pyserde dataclass honoring skip and skip_if_default fields.
+    Fields holding nested dataclasses are delegated to pyserde.
+    """
+    namespace = {"_serde_to_dict": to_dict}
+    lines = ["def _to_dict(obj):", "    data = {}"]
+    for field in dataclasses.fields(cls):
+        if field.metadata.get("serde_skip"):
+            continue
+        value = f"obj.{field.name}"
+        converted = _converter(field, value)
+        if field.metadata.get("serde_skip_if_default") and field.default is not dataclasses.MISSING:
+            if field.default is None:
+                lines.append(f"    if {value} is not None:")
+            else:
+                namespace[f"_default_{field.name}"] = field.default
+                lines.append(f"    if {value} != _default_{field.name}:")
+            lines.append(f"        data[{field.name!r}] = {converted}")
+        else:
+            lines.append(f"    data[{field.name!r}] = {converted}")
+    lines.append("    return data")
+    exec("\n".join(lines), namespace)
+    serializer = namespace["_to_dict"]
+    serializer.__qualname__ = f"{cls.__name__}._to_dict"
+    return serializer
+
+
+def _converter(field: dataclasses.Field, value: str) -> str:
+    field_type = getattr(field.type, "__origin__", field.type)
+    type_args = getattr(field.type, "__args__", ())
+    # Optional[X] is Union[X, None]
+    if type_args and type(None) in type_args:
+        inner = next(arg for arg in type_args if arg is not type(None))
+        field_type = getattr(inner, "__origin__", inner)
+    if dataclasses.is_dataclass(field_type):
+        return f"_serde_to_dict({value})"
+    if field_type is list:
+        return f"None if {value} is None else list({value})"
+    if field_type is dict:
+        return f"None if {value} is None else dict({value})"
+    return value
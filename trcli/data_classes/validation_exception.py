@@ -12,3 +12,7 @@ class ValidationException(Exception):
         self.class_name = class_name
         self.reason = reason
         super().__init__(f"Unable to parse {field_name} in {class_name} property. {reason}")
+
+    def __reduce__(self):
+        # Raised in worker processes parsing reports, rebuilt from its attributes in the parent
+        return type(self), (self.field_name, self.class_name, self.reason)
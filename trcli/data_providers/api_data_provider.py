@@ -1,8 +1,7 @@
 from typing import List
 
-from serde.json import to_dict
-
-from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailSuite
+from trcli.data_classes.serializers import fast_to_dict
 
 
 class ApiDataProvider:
@@ -19,14 +18,14 @@ class ApiDataProvider:
 
     def add_suites_data(self) -> list:
         """Return list of bodies for adding suites"""
-        return [to_dict(self.suites_input)]
+        return [fast_to_dict(self.suites_input)]
 
     def add_sections_data(self, return_all_items=False) -> list:
         """Return list of bodies for adding sections.
         The ID of the test suite (ignored if the project is operating in single suite mode, required otherwise)
         """
         return [
-            to_dict(section)
+            fast_to_dict(section)
             for section in self.suites_input.testsections
             if section.section_id is None or return_all_items
         ]
@@ -40,6 +39,8 @@ class ApiDataProvider:
                 if case.case_id is None or return_all_items:
                     case.add_global_case_fields(self.case_fields)
                     bodies.append(case)
+        if self.suites_input.case_renderer is not None:
+            self.suites_input.case_renderer.render(bodies)
         return bodies
 
     def existing_cases(self):
@@ -51,6 +52,8 @@ class ApiDataProvider:
                 if case.case_id is not None:
                     case.add_global_case_fields(self.case_fields)
                     bodies.append(case)
+        if self.suites_input.case_renderer is not None:
+            self.suites_input.case_renderer.render(bodies)
         return bodies
 
     def add_run(self, run_name: str, case_ids=None, milestone_id=None):
@@ -79,17 +82,25 @@ class ApiDataProvider:
             "case_ids": case_ids
         }
 
-    def add_results_for_cases(self, bulk_size):
-        """Return bodies for adding results for cases. Returns bodies for results that already have case ID."""
-        testcases = [sections.testcases for sections in self.suites_input.testsections]
+    def add_results_for_cases(self, bulk_size, cases: List[TestRailCase] = None):
+        """Return bodies for adding results for cases. Returns bodies for results that already have case ID.
+        When cases are given, only their results are returned (not supported with result store).
+        """
+        if self.suites_input.result_store is not None:
+            bodies = list(self.suites_input.result_store.result_bodies(self.result_fields))
+        else:
+            if cases is not None:
+                testcases = [cases]
+            else:
+                testcases = [sections.testcases for sections in self.suites_input.testsections]
 
-        bodies = []
+            bodies = []
 
-        for sublist in testcases:
-            for case in sublist:
-                if case.case_id is not None:
-                    case.result.add_global_result_fields(self.result_fields)
-                    bodies.append(case.result.to_dict())
+            for sublist in testcases:
+                for case in sublist:
+                    if case.case_id is not None:
+                        case.result.add_global_result_fields(self.result_fields)
+                        bodies.append(case.result.to_dict())
 
         result_bulks = ApiDataProvider.divide_list_into_bulks(
             bodies,
@@ -183,7 +194,10 @@ class ApiDataProvider:
             )
             if matched_case is not None:
                 matched_case.case_id = case_updater["case_id"]
-                matched_case.result.case_id = case_updater["case_id"]
+                if matched_case.result is not None:
+                    matched_case.result.case_id = case_updater["case_id"]
+                else:
+                    self.suites_input.result_store.set_case_id(matched_case.result_row, case_updater["case_id"])
                 matched_case.section_id = case_updater["section_id"]
 
     @staticmethod
@@ -4,19 +4,27 @@ from collections import deque
 from pathlib import Path
 from abc import abstractmethod
 import pprint
+import queue
+import threading
 from typing import Union
 
 from trcli.cli import Environment
 from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.settings import LOG_BUFFER_LINES, LOG_FILE_BUFFER_SIZE
 
 class LogParser():
 
-    def __init__(self, environment: Environment):
+    # Width of formatted lines, longer lines are split by pprint
+    LINE_WIDTH = 200
+
+    def __init__(self, environment: Environment, filepath: Union[str, Path] = None):
         self.env = environment    
-        self.internal = self.env.file
+        self.internal = Path(filepath if filepath is not None else self.env.file)
+        self.path = None
+        self.__file = None
 
     def setup(self, folder: str, extension = 'log') -> str:
-        self.lines = []
+        self.__close()
         self.path = Path(self.internal.parent, folder, self.internal.stem + "." + extension)
         if os.path.exists(self.path):
             try:
@@ -25,20 +33,10 @@ class LogParser():
                 print(f"An error occurred while deleting the file: {e}")
     
     def save(self, title: str):
-        if self.lines.__len__() != 0:
-            directory = os.path.dirname(self.path)
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-
-            try:
-                file = open(self.path, 'w')
-                for line in self.lines:
-                    file.write(line + '\n')
-
-                self.env.log(f"{title}: The parser file was created. -path: {self.path}")
-
-            except Exception as e:
-                print(f"An error occurred while writing the file: {e}")           
+        """Closes the file the lines were written to, the file is created only when a line was added."""
+        if self.__file is not None:
+            self.__close()
+            self.env.log(f"{title}: The parser file was created. -path: {self.path}")
 
     def add(self, log, level = 0, index = 1):
 
@@ -53,7 +51,26 @@ class LogParser():
     def __add(self, log, depth = 1):
         if log is not None:
             data = self.__format_line(log, depth)
-            self.lines.append(data)
+            self.__write(data)
+
+    def __write(self, line: str):
+        """Lines are streamed to the file through a buffered writer, instead of being kept in memory."""
+        if self.__file is None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.__file = open(self.path, 'w', buffering=LOG_FILE_BUFFER_SIZE)
+            except Exception as e:
+                print(f"An error occurred while writing the file: {e}")
+                return
+        self.__file.write(line + '\n')
+
+    def __close(self):
+        if self.__file is not None:
+            try:
+                self.__file.close()
+            except Exception as e:
+                print(f"An error occurred while writing the file: {e}")
+            self.__file = None
 
     def __format_line(self, data, level):
         # try:
@@ -64,17 +81,90 @@ class LogParser():
         #     text = json.dumps(content, indent=4)
         #     return f"json: {text}"
         # except json.JSONDecodeError:
-        return pprint.pformat(data, indent=4, compact=False, width=200, depth=level)
- 
+        if data is None or isinstance(data, (str, int, float, bool)):
+            # Same as pformat of a scalar fitting the line
+            text = repr(data)
+            if len(text) <= self.LINE_WIDTH:
+                return text
+        return pprint.pformat(data, indent=4, compact=False, width=self.LINE_WIDTH, depth=level)
+
+
+class BufferedLog():
+    """
+    Log sink collecting messages and writing them to stdout in chunks, instead of writing each message.
+    Chunks can be written by a background thread, so that the producer of messages is not blocked
+    by terminal output. Messages are written in order, remaining ones when the log is closed.
+    """
+
+    def __init__(self, environment: Environment, buffer_lines: int = LOG_BUFFER_LINES, background: bool = False):
+        self.env = environment
+        self.buffer_lines = buffer_lines
+        self.__lines = []
+        self.__chunks = None
+        self.__writer = None
+        if background:
+            self.__chunks = queue.SimpleQueue()
+            self.__writer = threading.Thread(target=self.__write_chunks, daemon=True)
+            self.__writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def log(self, msg: str):
+        """Logs a message, unless silent mode is enabled."""
+        if self.env.silent:
+            return
+        self.__lines.append(msg)
+        if len(self.__lines) >= self.buffer_lines:
+            self.flush()
+
+    def vlog(self, msg: str):
+        """Logs a message only if the verbose option is enabled."""
+        if self.env.verbose:
+            self.log(msg)
+
+    def flush(self):
+        if not self.__lines:
+            return
+        chunk = "\n".join(self.__lines)
+        self.__lines = []
+        if self.__chunks is not None:
+            self.__chunks.put(chunk)
+        else:
+            self.env.log(chunk)
+
+    def close(self):
+        """Writes remaining messages and waits until the background writer wrote all of them."""
+        self.flush()
+        if self.__writer is not None:
+            self.__chunks.put(None)
+            self.__writer.join()
+            self.__writer = None
+            self.__chunks = None
+
+    def __write_chunks(self):
+        while True:
+            chunk = self.__chunks.get()
+            if chunk is None:
+                return
+            self.env.log(chunk)
+
+
 class FileParser():
     """
     Each new parser should inherit from this class, to make file reading modular.
     """
-    def __init__(self, environment: Environment):
-        self.filepath = self.check_file(environment.file)
+    def __init__(self, environment: Environment, filepath: Union[str, Path] = None):
+        """
+        :param filepath: file to parse, the file given by environment if not given
+        """
+        self.filepath = self.check_file(filepath if filepath is not None else environment.file)
         self.filename = self.filepath.name
         self.env = environment
-        self.log = LogParser(environment)   
+        self.log = LogParser(environment, self.filepath)   
 
     @staticmethod
     def check_file(filepath: Union[str, Path]) -> Path:
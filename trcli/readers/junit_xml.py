@@ -1,11 +1,17 @@
 import glob
-from pathlib import Path
-from typing import Union
-from unittest import TestCase, TestSuite
+import io
+import mmap
+import re
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, Optional, Union
 from xml.etree import ElementTree as etree
 
-from junitparser import JUnitXml, JUnitXmlError, Element, Attr
+from junitparser import JUnitXml, JUnitXmlError, Element, Attr, TestCase, TestSuite
 
+from trcli import settings
 from trcli.cli import Environment
 from trcli.data_classes.data_parsers import MatchersParser, FieldsParser
 from trcli.data_classes.dataclass_testrail import (
@@ -15,7 +21,11 @@ from trcli.data_classes.dataclass_testrail import (
     TestRailProperty,
     TestRailResult,
 )
+from trcli.data_classes.result_store import ResultStore
 from trcli.readers.file_parser import FileParser
+from trcli.readers.parse_cache import ParseCache
+from trcli.readers.report_sources import ReportSource, iter_sequential_contents, list_report_sources, open_report
+from trcli.settings import MAX_WORKERS_PARSE_FILES, PARSE_CHUNKS_PER_WORKER, PARSE_CACHE_DIR
 
 TestCase.id = Attr("id")
 TestSuite.id = Attr("id")
@@ -33,11 +43,31 @@ class Property(Element):
 
 
 class JunitParser(FileParser):
+    MERGED_REPORT_NAME = "Merged-JUnit-report.xml"
+    # Comments and CDATA sections are matched only to skip testsuite tags inside them
+    SUITE_TAGS_PATTERN = re.compile(
+        rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>"
+        rb"|<(?P<closing>/)?testsuite(?=[\s/>])(?:[^>\"']|\"[^\"]*\"|'[^']*')*?(?P<empty>/)?>",
+        re.DOTALL,
+    )
 
-    def __init__(self, environment: Environment):
+    def __init__(self, environment: Environment, sources: list[ReportSource] = None):
+        """
+        :param sources: reports to parse, by default reports matched by the file pattern
+            (archives are expanded to their report members)
+        """
         super().__init__(environment)
+        self.files = self.list_sources(self.filepath) if sources is None else sources
+        if len(self.files) > 1:
+            self.filename = self.MERGED_REPORT_NAME
+        elif self.files[0].member:
+            self.filename = PurePosixPath(self.files[0].member).name
         self.case_matcher = environment.case_matcher
         self.special = environment.special_parser
+        self.columnar = environment.columnar_results
+        self.parallel = environment.parallel_parsing
+        self.use_cache = environment.parse_cache
+        self.suite_name = None
 
     @classmethod
     def _add_root_element_to_tree(cls, filepath: Union[str, Path]) -> etree:
@@ -58,159 +88,549 @@ class JunitParser(FileParser):
 
     @staticmethod
     def check_file(filepath: Union[str, Path]) -> Path:
+        """Returns path of the report, or the pattern itself if it matches more than one report."""
         filepath = Path(filepath)
         files = glob.glob(str(filepath))
         if not files:
             raise FileNotFoundError("File not found.")
         elif len(files) == 1:
-            return filepath
-        sub_suites = []
-        for file in files:
-            suite = JUnitXml.fromfile(file)
-            sub_suites.append(suite)
-        suite = sub_suites.pop(0)
-        for sub_suite in sub_suites:
-            suite += sub_suite
-        merged_report_path = Path().cwd().joinpath("Merged-JUnit-report.xml")
-        suite.write(merged_report_path)
-        return merged_report_path
+            return Path(files[0])
+        return filepath
+
+    @staticmethod
+    def list_sources(filepath: Union[str, Path]) -> list[ReportSource]:
+        """Returns reports matched by the file pattern, with zip and tar archives expanded to their reports."""
+        sources = [source for file in sorted(glob.glob(str(filepath))) for source in list_report_sources(file)]
+        if not sources:
+            raise FileNotFoundError("File not found.")
+        return sources
 
     def parse_file(self) -> list[TestRailSuite]:
-        self.env.log(f"Parsing JUnit report.")
-        suite = JUnitXml.fromfile(
-            self.filepath, parse_func=self._add_root_element_to_tree
+        if not self.use_cache:
+            return self.__parse_file()
+        cache = ParseCache(PARSE_CACHE_DIR)
+        cache_key = cache.key(
+            dict.fromkeys(source.path for source in self.files),
+            {
+                "case_matcher": self.case_matcher,
+                "special_parser": self.special,
+                "columnar_results": self.columnar,
+                "allow_ms": settings.ALLOW_ELAPSED_MS,
+            },
         )
+        cached = cache.load(cache_key)
+        if cached is not None:
+            self.env.log(f"Loaded parsed JUnit report from cache.")
+            generated_name, suites = cached
+            if generated_name:
+                # Name of suites without root name includes parsing time
+                for suite in suites:
+                    suite.name = None
+                    suite.__post_init__()
+            return suites
+        suites = self.__parse_file()
+        for suite in suites:
+            for section in suite.testsections:
+                self._release_junit_elements(section.testcases)
+        generated_name = self.special != "saucectl" and self.suite_name is None
+        if not cache.store(cache_key, (generated_name, suites)):
+            self.env.vlog(f"Parsed JUnit report could not be cached in {PARSE_CACHE_DIR}.")
+        return suites
 
+    def __parse_file(self) -> list[TestRailSuite]:
+        self.env.log(f"Parsing JUnit report.")
         if self.special == "saucectl":
-            suites = self.split_sauce_report(suite)
+            return self._parse_sauce_report()
+
+        if len(self.files) > 1 or self.parallel:
+            test_sections, result_store = self._parse_files()
         else:
-            suites = [suite]
+            result_store = ResultStore() if self.columnar else None
+            test_sections = list(self.iter_sections(result_store))
+        cases_count = sum(len(section.testcases) for section in test_sections)
+        self.env.log(f"Processed {cases_count} test cases in {len(test_sections)} sections.")
+        testrail_suite = TestRailSuite(
+            self.suite_name,
+            testsections=test_sections,
+            source=self.filename,
+        )
+        testrail_suite.result_store = result_store
+        return [testrail_suite]
 
-        testrail_suites = []
+    def parse_file_streamed(self) -> tuple[TestRailSuite, Iterator[TestRailSection]]:
+        """
+        Returns suite without sections and iterator parsing its sections lazily, so that sections can be
+        processed while the report is still parsed. Name of the suite is set once first section is read.
+        """
+        self.env.log(f"Parsing JUnit report.")
+        result_store = ResultStore() if self.columnar else None
+        testrail_suite = TestRailSuite(None, source=self.filename)
+        testrail_suite.result_store = result_store
 
-        for suite in suites:
-            if suite.name:
-                self.env.log(f"Processing suite - {suite.name}")
-            cases_count = 0
-            test_sections = []
-            processed_section_properties = []
-            for section in suite:
-                if not len(section):
-                    continue
-                test_cases = []
-                properties = []
-                for prop in section.properties():
-                    if prop.name not in processed_section_properties:
-                        properties.append(TestRailProperty(prop.name, prop.value))
-                        processed_section_properties.append(prop.name)
-                for case in section:
-                    cases_count += 1
-                    case_id = None
-                    case_name = case.name
-                    attachments = []
-                    result_fields = []
-                    case_fields = []
-                    comments = []
+        def sections() -> Iterator[TestRailSection]:
+            if len(self.files) > 1 or self.parallel:
+                test_sections, report_store = self._parse_files()
+                if result_store is not None:
+                    result_store.extend(report_store)
+            else:
+                test_sections = self.iter_sections(result_store)
+            for section in test_sections:
+                if self.suite_name is not None:
+                    testrail_suite.name = self.suite_name
+                yield section
+
+        return testrail_suite, sections()
+
+    def iter_sections(self, result_store: ResultStore = None) -> Iterator[TestRailSection]:
+        """
+        Streams the report with iterparse, yielding sections one by one. Test cases are converted as soon as
+        they are read and their XML elements are dropped, so memory does not grow with the size of the report.
+        Name of the suite (testsuites root) is available in suite_name once first section is read.
+        """
+        processed_section_properties = []
+        for section, test_cases in self._iter_suites(result_store):
+            if test_cases:
+                yield TestRailSection(
+                    section.name,
+                    testcases=test_cases,
+                    properties=self._parse_section_properties(section.properties(), processed_section_properties),
+                )
+
+    def _iter_suites(
+        self, result_store: ResultStore = None, source=None
+    ) -> Iterator[tuple[TestSuite, list[TestRailCase]]]:
+        """
+        Yields each top level testsuite of the report (empty ones included) with its parsed test cases.
+        Cases of nested test suites follow direct cases of the testsuite.
+        For SauceLabs reports, session URL (url property of the top level testsuite) is added to results,
+        test cases preceding the properties are parsed when the testsuite ends.
+
+        :param source: file object to read the report from instead of the first report source
+        """
+        if source is None:
+            with open_report(self.files[0]) as stream:
+                yield from self._iter_suites(result_store, stream)
+            return
+        self.suite_name = None
+        open_elements = []
+        # Open testsuite elements: [element, direct test cases, test cases of nested test suites]
+        open_suites = []
+        sauce_session = None
+        for event, elem in etree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                parent = open_elements[-1] if open_elements else None
+                if parent is None:
+                    if elem.tag == "testsuites":
+                        self.suite_name = elem.get("name")
+                        if self.suite_name:
+                            self.env.log(f"Processing suite - {self.suite_name}")
+                    elif elem.tag != "testsuite":
+                        raise JUnitXmlError("Invalid format.")
+                if elem.tag == "testsuite" and (
+                    parent is None
+                    or (len(open_elements) == 1 and parent.tag == "testsuites")
+                    or (open_suites and open_suites[-1][0] is parent)
+                ):
+                    open_suites.append([elem, [], []])
+                open_elements.append(elem)
+                continue
+
+            open_elements.pop()
+            parent = open_elements[-1] if open_elements else None
+            if elem.tag == "testcase" and open_suites and open_suites[-1][0] is parent:
+                case = TestCase.fromelem(elem)
+                if self.special == "saucectl" and sauce_session is None:
+                    # Properties with session URL can follow the test cases, case is parsed at the end of the suite
+                    open_suites[-1][1].append(case)
+                else:
+                    open_suites[-1][1].append(self._parse_case(case, result_store, sauce_session))
+                # Parser reads ahead, so the element is not necessarily the last child any more
+                parent.remove(elem)
+            elif elem.tag == "properties" and self.special == "saucectl" and len(open_suites) == 1 \
+                    and open_suites[0][0] is parent:
+                for prop in elem.iterfind("property[@name='url']"):
+                    sauce_session = prop.get("value")
+            elif open_suites and open_suites[-1][0] is elem:
+                _, direct_cases, nested_cases = open_suites.pop()
+                test_cases = direct_cases + nested_cases
+                if open_suites:
+                    open_suites[-1][2].extend(test_cases)
+                else:
+                    if self.special == "saucectl":
+                        test_cases = [
+                            self._parse_case(case, result_store, sauce_session) if isinstance(case, TestCase) else case
+                            for case in test_cases
+                        ]
                     sauce_session = None
-                    automation_id = f"{case.classname}.{case_name}"
-                    if self.case_matcher == MatchersParser.NAME:
-                        case_id, case_name = MatchersParser.parse_name_with_id(case_name)
-                    for case_props in case.iterchildren(Properties):
-                        for prop in case_props.iterchildren(Property):
-                            if prop.name and self.case_matcher == MatchersParser.PROPERTY and prop.name == "test_id":
-                                case_id = int(prop.value.lower().replace("c", ""))
-                            if prop.name and prop.name.startswith("testrail_attachment"):
-                                attachments.append(prop.value)
-                            if prop.name and prop.name.startswith("testrail_result_field"):
-                                result_fields.append(prop.value)
-                            if prop.name and prop.name.startswith("testrail_result_comment"):
-                                comments.append(prop.value)
-                            if prop.name and prop.name.startswith("testrail_case_field"):
-                                case_fields.append(prop.value)
-                            if prop.name and prop.name.startswith("testrail_sauce_session"):
-                                sauce_session = prop.value
-                    result_fields_dict, error = FieldsParser.resolve_fields(result_fields)
-                    if error:
-                        self.env.elog(error)
-                        raise Exception(error)
-                    case_fields_dict, error = FieldsParser.resolve_fields(case_fields)
-                    if error:
-                        self.env.elog(error)
-                        raise Exception(error)
-                    result = TestRailResult(
-                        case_id,
-                        elapsed=case.time,
-                        junit_result_unparsed=case.result,
-                        attachments=attachments,
-                        result_fields=result_fields_dict
-                    )
-                    for comment in reversed(comments):
-                        result.prepend_comment(comment)
-                    if sauce_session:
-                        result.prepend_comment(f"SauceLabs session: {sauce_session}")
-                    test_cases.append(
-                        TestRailCase(
-                            title=case_name,
-                            case_id=case_id,
-                            result=result,
-                            custom_automation_id=automation_id,
-                            case_fields=case_fields_dict
-                        )
-                    )
-                test_sections.append(
-                    TestRailSection(
-                        section.name,
-                        testcases=test_cases,
-                        properties=properties,
-                    )
+                    yield TestSuite.fromelem(elem), test_cases
+                if parent is not None:
+                    parent.remove(elem)
+
+    def _parse_sauce_report(self) -> list[TestRailSuite]:
+        """
+        Parses SauceLabs report in a single streamed pass. Sections named "<suite> - <section>" are grouped
+        into a suite each, session URL of a section is added to its results instead of section properties.
+        Reports matched by the file pattern are merged the same way as in _parse_files.
+        """
+        self.env.log(f"Processing SauceLabs report.")
+        result_store = ResultStore() if self.columnar else None
+        # SauceLabs suites: name -> sections as [name, properties, test cases, ranges of result store rows]
+        sauce_suites = {}
+        sections_by_key = {}
+        for index, source in enumerate(self.files):
+            with open_report(source) as stream:
+                rows_start = len(result_store) if result_store is not None else 0
+                for section, test_cases in self._iter_suites(result_store, stream):
+                    rows_end = len(result_store) if result_store is not None else 0
+                    rows = range(rows_start, rows_end)
+                    rows_start = rows_end
+                    if not test_cases:
+                        continue
+                    properties = [TestRailProperty(prop.name, prop.value) for prop in section.properties()]
+                    key = self._suite_key(section, properties)
+                    merged = sections_by_key.get(key) if index else None
+                    if merged is None:
+                        divider_index = section.name.find("-")
+                        suite_name = section.name[:divider_index].strip()
+                        section_name = section.name[divider_index + 1:].strip()
+                        properties = [prop for prop in properties if prop.name != "url"]
+                        merged = [section_name, properties, test_cases, [rows]]
+                        sauce_suites.setdefault(suite_name, []).append(merged)
+                        sections_by_key.setdefault(key, merged)
+                    else:
+                        merged[2].extend(test_cases)
+                        merged[3].append(rows)
+        self.env.log(f"Found {len(sauce_suites)} SauceLabs suites.")
+        testrail_suites = []
+        for suite_name, sections in sauce_suites.items():
+            if suite_name:
+                self.env.log(f"Processing suite - {suite_name}")
+            suite_store = None
+            if result_store is not None:
+                suite_store = ResultStore()
+                for _, _, test_cases, section_rows in sections:
+                    offsets = []
+                    for rows in section_rows:
+                        offsets.append((rows, len(suite_store) - rows.start))
+                        suite_store.extend(result_store, rows)
+                    for case in test_cases:
+                        case.result_row += next(offset for rows, offset in offsets if case.result_row in rows)
+            processed_section_properties = []
+            test_sections = [
+                TestRailSection(
+                    name,
+                    testcases=test_cases,
+                    properties=self._parse_section_properties(properties, processed_section_properties),
                 )
+                for name, properties, test_cases, _ in sections
+            ]
+            cases_count = sum(len(section.testcases) for section in test_sections)
             self.env.log(f"Processed {cases_count} test cases in {len(test_sections)} sections.")
-            testrail_suites.append(
-                TestRailSuite(
-                    suite.name,
-                    testsections=test_sections,
-                    source=self.filename,
-                )
+            testrail_suite = TestRailSuite(suite_name, testsections=test_sections, source=self.filename)
+            testrail_suite.result_store = suite_store
+            testrail_suites.append(testrail_suite)
+        return testrail_suites
+
+    def _parse_files(self) -> tuple[list[TestRailSection], Optional[ResultStore]]:
+        """
+        Parses reports matched by the file pattern in a process pool and merges them in memory, in file order.
+        Test suites equal to an already read test suite of previous reports (same name, hostname, timestamp
+        and properties) are merged into it, the same way junitparser merges reports.
+        In parallel mode each plain report is also split into chunks of top level test suites, parsed separately.
+        Archive members are decompressed by the workers, except for members of compressed tar archives, which
+        can only be read sequentially and are read here, while previous members are already parsed.
+        """
+        if len(self.files) > 1:
+            self.env.log(f"Merging {len(self.files)} JUnit reports.")
+        tasks = []
+        for index, source in enumerate(self.files):
+            splittable = self.parallel and source.member is None and not source.compressed
+            chunks = self.split_report(source.path) if splittable else [None]
+            tasks.extend((index, source, chunk) for chunk in chunks)
+        if self.parallel:
+            self.env.log(f"Parsing {len(tasks)} report chunks in parallel.")
+        with ProcessPoolExecutor(
+            max_workers=min(len(tasks), MAX_WORKERS_PARSE_FILES),
+            initializer=_init_report_worker,
+            initargs=(settings.ALLOW_ELAPSED_MS, self.special),
+        ) as executor:
+            parsed_chunks = list(self.__map_tasks(executor, tasks))
+        self.suite_name = parsed_chunks[0][0]
+        if self.suite_name:
+            self.env.log(f"Processing suite - {self.suite_name}")
+        result_store = ResultStore() if self.columnar else None
+        # Merged test suites: [name, properties, test cases]
+        merged_suites = []
+        suites_by_key = {}
+        for (index, _, _), (_, suites, report_store) in zip(tasks, parsed_chunks):
+            if result_store is not None:
+                offset = len(result_store)
+                result_store.extend(report_store)
+                for _, _, _, test_cases in suites:
+                    for case in test_cases:
+                        case.result_row += offset
+            for key, name, properties, test_cases in suites:
+                merged = suites_by_key.get(key) if index else None
+                if merged is None:
+                    merged = [name, properties, test_cases]
+                    merged_suites.append(merged)
+                    suites_by_key.setdefault(key, merged)
+                else:
+                    merged[2].extend(test_cases)
+        processed_section_properties = []
+        test_sections = [
+            TestRailSection(
+                name,
+                testcases=test_cases,
+                properties=self._parse_section_properties(properties, processed_section_properties),
             )
+            for name, properties, test_cases in merged_suites
+            if test_cases
+        ]
+        return test_sections, result_store
 
-        return testrail_suites
+    def __map_tasks(self, executor: Executor, tasks: list[tuple]) -> Iterator[tuple]:
+        """
+        Submits parsing tasks in order and yields their results in the same order. Only a limited number
+        of tasks is submitted ahead, so that contents read from compressed tar archives are not all held in memory.
+        """
+        pending = deque()
+        contents = {}
+        for _, source, chunk in tasks:
+            content = None
+            if source.sequential:
+                if source.path not in contents:
+                    members = [member for member in self.files if member.path == source.path]
+                    contents[source.path] = iter_sequential_contents(members)
+                content = next(contents[source.path])
+            if len(pending) >= MAX_WORKERS_PARSE_FILES * PARSE_CHUNKS_PER_WORKER:
+                yield pending.popleft().result()
+            pending.append(
+                executor.submit(_parse_report_file, source, self.case_matcher, self.columnar, chunk, content)
+            )
+        while pending:
+            yield pending.popleft().result()
 
-    def split_sauce_report(self, suite) -> list[JUnitXml]:
-        self.env.log(f"Processing SauceLabs report.")
-        subsuites = {}
+    @classmethod
+    def split_report(cls, filepath: Union[str, Path]) -> list[Optional[tuple[int, int, int, int]]]:
+        """
+        Scans memory mapped report for byte offsets of top level testsuite elements and groups them
+        into chunks of similar size, which can be parsed independently.
+
+        :returns: chunks as (end of prolog, start of chunk, end of chunk, start of epilogue) offsets,
+            [None] if report can not be split
+        """
+        with open(filepath, "rb") as file:
+            try:
+                report = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file can not be mapped
+                return [None]
+            with report:
+                suites = []
+                depth = 0
+                start = None
+                for match in cls.SUITE_TAGS_PATTERN.finditer(report):
+                    if match.group(0).startswith(b"<!"):
+                        continue
+                    if match.group("closing"):
+                        depth -= 1
+                        if not depth:
+                            suites.append((start, match.end()))
+                    elif match.group("empty"):
+                        if not depth:
+                            suites.append((match.start(), match.end()))
+                    else:
+                        if not depth:
+                            start = match.start()
+                        depth += 1
+        # Report with testsuite root or single test suite is parsed as a whole
+        if len(suites) < 2 or depth:
+            return [None]
+        prolog_end = suites[0][0]
+        epilogue_start = suites[-1][1]
+        chunks_count = min(len(suites), MAX_WORKERS_PARSE_FILES * PARSE_CHUNKS_PER_WORKER)
+        chunk_size = (epilogue_start - prolog_end) / chunks_count
+        chunks = []
+        chunk_start = prolog_end
+        for suite_start, suite_end in suites:
+            if suite_end - prolog_end >= chunk_size * (len(chunks) + 1):
+                chunks.append((prolog_end, chunk_start, suite_end, epilogue_start))
+                chunk_start = suite_end
+        if chunk_start != epilogue_start:
+            chunks.append((prolog_end, chunk_start, epilogue_start, epilogue_start))
+        return chunks
+
+    def _parse_suite(self, suite: JUnitXml) -> TestRailSuite:
+        if suite.name:
+            self.env.log(f"Processing suite - {suite.name}")
+        cases_count = 0
+        result_store = ResultStore() if self.columnar else None
+        test_sections = []
+        processed_section_properties = []
         for section in suite:
             if not len(section):
                 continue
-            divider_index = section.name.find('-')
-            subsuite_name = section.name[:divider_index].strip()
-            section.name = section.name[divider_index + 1:].strip()
-            new_xml = JUnitXml(subsuite_name)
-            if subsuite_name not in subsuites.keys():
-                subsuites[subsuite_name] = new_xml
-            subsuites[subsuite_name].add_testsuite(section)
-
-        for suite_name, suite in subsuites.items():
-            for section in suite:
-                if not len(section):
-                    continue
-                session_url = None
-                session_prop = None
-                for section_prop in section.properties():
-                    if section_prop.name == "url":
-                        session_prop = section_prop
-                        session_url = section_prop.value
-                if session_prop:
-                    section.remove_property(session_prop)
-                for case in section:
-                    case_props = case.child(Properties)
-                    if not case_props:
-                        case_props = Properties()
-                        case.append(case_props)
-                    case_prop = Property()
-                    case_prop.name = "testrail_sauce_session"
-                    case_prop.value = session_url
-                    case_props.append(case_prop)
-
-        self.env.log(f"Found {len(subsuites)} SauceLabs suites.")
-
-        return [v for k, v in subsuites.items()]
+            properties = self._parse_section_properties(section.properties(), processed_section_properties)
+            test_cases = [self._parse_case(case, result_store) for case in section]
+            cases_count += len(test_cases)
+            test_sections.append(
+                TestRailSection(
+                    section.name,
+                    testcases=test_cases,
+                    properties=properties,
+                )
+            )
+        self.env.log(f"Processed {cases_count} test cases in {len(test_sections)} sections.")
+        testrail_suite = TestRailSuite(
+            suite.name,
+            testsections=test_sections,
+            source=self.filename,
+        )
+        testrail_suite.result_store = result_store
+        return testrail_suite
+
+    @staticmethod
+    def _parse_section_properties(section_properties: Iterable, processed_section_properties: list) -> list:
+        properties = []
+        for prop in section_properties:
+            if prop.name not in processed_section_properties:
+                properties.append(TestRailProperty(prop.name, prop.value))
+                processed_section_properties.append(prop.name)
+        return properties
+
+    @staticmethod
+    def _suite_key(section: TestSuite, properties: list[TestRailProperty]) -> tuple:
+        """Returns key of the test suite, equal for test suites which junitparser merges into one."""
+        return (
+            section.name,
+            section.hostname,
+            section.timestamp,
+            tuple(sorted(((prop.name, prop.value) for prop in properties), key=lambda prop: prop[0] or "")),
+        )
+
+    @staticmethod
+    def _release_junit_elements(test_cases: list[TestRailCase]):
+        """Drops raw XML elements of results, which are needed only for calculating the result."""
+        for case in test_cases:
+            if case.result is not None:
+                case.result.junit_result_unparsed = None
+
+    def _parse_case(self, case: TestCase, result_store: ResultStore = None, sauce_session: str = None) -> TestRailCase:
+        """:param sauce_session: SauceLabs session URL of the test suite, takes precedence over the case property"""
+        case_id = None
+        case_name = case.name
+        attachments = []
+        result_fields = []
+        case_fields = []
+        comments = []
+        automation_id = f"{case.classname}.{case_name}"
+        if self.case_matcher == MatchersParser.NAME:
+            case_id, case_name = MatchersParser.parse_name_with_id(case_name)
+        for case_props in case.iterchildren(Properties):
+            for prop in case_props.iterchildren(Property):
+                if prop.name and self.case_matcher == MatchersParser.PROPERTY and prop.name == "test_id":
+                    case_id = int(prop.value.lower().replace("c", ""))
+                if prop.name and prop.name.startswith("testrail_attachment"):
+                    attachments.append(prop.value)
+                if prop.name and prop.name.startswith("testrail_result_field"):
+                    result_fields.append(prop.value)
+                if prop.name and prop.name.startswith("testrail_result_comment"):
+                    comments.append(prop.value)
+                if prop.name and prop.name.startswith("testrail_case_field"):
+                    case_fields.append(prop.value)
+                if prop.name and prop.name.startswith("testrail_sauce_session"):
+                    sauce_session = sauce_session or prop.value
+        result_fields_dict, error = FieldsParser.resolve_fields(result_fields)
+        if error:
+            self.env.elog(error)
+            raise Exception(error)
+        case_fields_dict, error = FieldsParser.resolve_fields(case_fields)
+        if error:
+            self.env.elog(error)
+            raise Exception(error)
+        result = TestRailResult(
+            case_id,
+            elapsed=case.time,
+            junit_result_unparsed=case.result,
+            attachments=attachments,
+            result_fields=result_fields_dict
+        )
+        for comment in reversed(comments):
+            result.prepend_comment(comment)
+        if sauce_session:
+            result.prepend_comment(f"SauceLabs session: {sauce_session}")
+        test_case = TestRailCase(
+            title=case_name,
+            case_id=case_id,
+            result=result,
+            custom_automation_id=automation_id,
+            case_fields=case_fields_dict
+        )
+        if result_store is not None:
+            test_case.result_row = result_store.append(
+                case_id,
+                result.status_id,
+                case.time,
+                classname=str(case.classname),
+                title=case.name,
+                comment=result.comment,
+                attachments=attachments,
+                result_fields=result_fields_dict,
+            )
+            test_case.result = None
+        return test_case
+
+
+# Special parser of a worker process parsing reports (see JunitParser._parse_files)
+_worker_special_parser = None
+
+
+def _init_report_worker(allow_ms: bool, special_parser: Optional[str]):
+    # Workers do not inherit settings of the command unless they are forked
+    global _worker_special_parser
+    settings.ALLOW_ELAPSED_MS = allow_ms
+    _worker_special_parser = special_parser
+
+
+def _parse_report_file(
+    source: ReportSource,
+    case_matcher: str,
+    columnar: bool,
+    chunk: tuple[int, int, int, int] = None,
+    content: bytes = None,
+) -> tuple[Optional[str], list[tuple], Optional[ResultStore]]:
+    """
+    Parses single report, or its chunk (see JunitParser.split_report), in a worker process.
+
+    :param content: raw content of the report, if already read from archive
+
+    :returns: name of the suite, test suites of the report as (merge key, name, properties, test cases)
+        and result store (columnar mode only)
+    """
+    environment = Environment()
+    environment.file = source.path
+    environment.silent = True
+    environment.case_matcher = case_matcher
+    environment.columnar_results = columnar
+    environment.special_parser = _worker_special_parser
+    parser = JunitParser(environment, [source])
+    result_store = ResultStore() if columnar else None
+    suites = []
+    with ExitStack() as stack:
+        if chunk is not None:
+            prolog_end, start, end, epilogue_start = chunk
+            with open(source.path, "rb") as file:
+                prolog = file.read(prolog_end)
+                file.seek(start)
+                report = file.read(end - start)
+                file.seek(epilogue_start)
+                epilogue = file.read()
+            stream = io.BytesIO(prolog + report + epilogue)
+        else:
+            stream = stack.enter_context(open_report(source, content))
+        for section, test_cases in parser._iter_suites(result_store, stream):
+            properties = [TestRailProperty(prop.name, prop.value) for prop in section.properties()]
+            JunitParser._release_junit_elements(test_cases)
+            suites.append((JunitParser._suite_key(section, properties), section.name, properties, test_cases))
+    return parser.suite_name, suites, result_store
@@ -1,18 +1,142 @@
-import json
+import glob
+import io
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import yaml
 
+from trcli.cli import Environment
 from trcli.data_classes.dataclass_testrail import (
     TestRailCase,
     TestRailSuite,
     TestRailSection,
     TestRailResult,
 )
-from trcli.readers.file_parser import FileParser
-from openapi_spec_validator import validate_spec, openapi_v30_spec_validator, openapi_v31_spec_validator
+from trcli.readers.file_parser import BufferedLog, FileParser
+from trcli.readers.parse_cache import ParseCache
+from trcli.readers.openapi_resolver import OpenApiRefResolver, ResolutionCache
+from openapi_spec_validator import openapi_v30_spec_validator, openapi_v31_spec_validator
 from openapi_spec_validator.readers import read_from_filename
-from prance import ResolvingParser
+from trcli.settings import (
+    PARSE_CACHE_DIR,
+    MAX_WORKERS_OPENAPI_CASES,
+    MAX_WORKERS_PARSE_FILES,
+    OPENAPI_PARALLEL_MIN_OPERATIONS,
+    PARSE_CHUNKS_PER_WORKER,
+)
+
+
+class SchemaDumper(yaml.SafeDumper):
+    """Dumps objects shared in the resolved specification in full each time, without YAML aliases.
+
+    The pure-Python emitter is used on purpose: libyaml folds long scalars differently,
+    which would change the texts of cases already uploaded to TestRail.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
+
+class ComponentSchemaDumper(SchemaDumper):
+    """Dumps component schemas as references to them (see SchemaRenderer)."""
+
+    # Component schemas by identity: id -> (schema, name), set by subclasses created per renderer
+    components = {}
+
+    def represent_component(self, data):
+        component = self.components.get(id(data))
+        if component is not None and component[0] is data:
+            return self.represent_dict({"$ref": f"#/components/schemas/{component[1]}"})
+        return self.represent_dict(data)
+
+
+ComponentSchemaDumper.add_representer(dict, ComponentSchemaDumper.represent_component)
+
+
+class SchemaRenderer:
+    """
+    Renders parts of the specification as indented YAML. Resolved specification shares referenced objects,
+    so rendered text is memoized by identity of the rendered object (the object is kept, so its id is not reused).
+    When component schemas are given, they are rendered as references and printed separately (see render_components).
+    """
+
+    def __init__(self, schemas: dict = None):
+        """
+        :param schemas: component schemas of the resolved specification (components/schemas)
+        """
+        self.schemas = schemas
+        self.__rendered = {}
+        self.__component_texts = {}
+        self.__dumper = SchemaDumper
+        self.__components = {}
+        if schemas:
+            self.__components = {
+                id(schema): (schema, name) for name, schema in schemas.items() if isinstance(schema, dict)
+            }
+            self.__dumper = type(
+                "SpecComponentSchemaDumper", (ComponentSchemaDumper,), {"components": self.__components}
+            )
+
+    def __getstate__(self):
+        # Memoized texts and components are keyed by identity, which is not kept by pickling
+        return {"schemas": self.schemas}
+
+    def __setstate__(self, state):
+        self.__init__(state["schemas"])
+
+    def render(self, details) -> str:
+        cached = self.__rendered.get(id(details))
+        if cached is not None and cached[0] is details:
+            return cached[1]
+        text = self.__dump(details)
+        self.__rendered[id(details)] = (details, text)
+        return text
+
+    def __dump(self, details) -> str:
+        lines = yaml.dump(details, Dumper=self.__dumper).splitlines(keepends=True)
+        return "".join(f"    {line}" for line in lines)
+
+    def component_names(self, details_list: Iterable, names: dict = None) -> list[str]:
+        """
+        Returns names of component schemas used by the details, directly or by other component schemas.
+
+        :param names: names found before (ordered), objects are walked only once for all of them
+        """
+        names = {} if names is None else names
+        visited = set()
+        pending = list(details_list)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, dict):
+                if id(node) in visited:
+                    continue
+                visited.add(id(node))
+                component = self.__components.get(id(node))
+                if component is not None and component[0] is node:
+                    if component[1] in names:
+                        # Components used by the component were found with it
+                        continue
+                    names[component[1]] = None
+                pending.extend(reversed(list(node.values())))
+            elif isinstance(node, list):
+                pending.extend(reversed(node))
+        return list(names)
+
+    def render_components(self, names: Iterable[str]) -> str:
+        """Renders component schemas, each of them in full, components used by them as references."""
+        texts = []
+        for name in names:
+            text = self.__component_texts.get(name)
+            if text is None:
+                # Shallow copy of the schema is rendered, so that the schema itself is not rendered as a reference
+                text = self.__component_texts[name] = self.__dump({name: dict(self.schemas[name])})
+            texts.append(text)
+        return "".join(texts)
 
 
 class OpenApiTestCase:
@@ -25,8 +149,13 @@ class OpenApiTestCase:
             response_description: str,
             operation_id: str = None,
             request_details: dict = None,
-            response_details: dict = None
+            response_details: dict = None,
+            renderer: SchemaRenderer = None,
+            text_limit: int = None
     ):
+        """
+        :param text_limit: maximum number of characters of each text, longer texts are truncated
+        """
         self.path = path
         self.verb = verb
         self.operation_id = operation_id
@@ -34,6 +163,34 @@ class OpenApiTestCase:
         self.response_description = response_description
         self.request_details = request_details
         self.response_details = response_details
+        self.renderer = renderer or SchemaRenderer()
+        self.text_limit = text_limit
+
+    @classmethod
+    def from_operation(
+            cls,
+            path: str,
+            verb: str,
+            verb_details: dict,
+            response_code: str,
+            renderer: SchemaRenderer = None,
+            text_limit: int = None
+    ) -> "OpenApiTestCase":
+        """Creates test case for a response of the operation (verb of the path)."""
+        request_details = verb_details.copy()
+        request_details.pop("responses")
+        response_data = verb_details["responses"][response_code]
+        return cls(
+            path=path,
+            verb=verb,
+            operation_id=verb_details.get("operationId"),
+            request_details=request_details,
+            response_code=response_code,
+            response_description=response_data.get("description", None),
+            response_details=response_data,
+            renderer=renderer,
+            text_limit=text_limit
+        )
 
     @property
     def name(self) -> str:
@@ -47,109 +204,219 @@ class OpenApiTestCase:
         name = f"{self.path}.{self.verb.upper()}.{self.response_code}"
         return name
 
+    @property
+    def texts(self) -> dict:
+        """Returns rendered texts of the test case, as case fields."""
+        texts = {
+            "custom_preconds": self.preconditions,
+            "custom_steps": self.steps,
+            "custom_expected": self.expected
+        }
+        if self.text_limit:
+            texts = {field: self.__truncate(text) for field, text in texts.items()}
+        return texts
+
+    def __truncate(self, text: str) -> str:
+        if len(text) <= self.text_limit:
+            return text
+        omitted = len(text) - self.text_limit
+        return text[:self.text_limit] + f"\n\n... ({omitted} more characters, see the specification)"
+
     @property
     def preconditions(self) -> str:
-        details = self.request_details.copy()
-        preconditions = ""
+        details = self.request_details
+        preconditions = []
 
         key = "deprecated"
         if key in details and details[key]:
-            preconditions += """
+            preconditions.append("""
 ||| :WARNING
 || ENDPOINT IS DEPRECATED
-"""
+""")
 
         key = "summary"
         if key in details and details[key]:
-            preconditions += self._format_text("Summary", details[key])
-            details.pop(key)
+            preconditions.append(self._format_text("Summary", details[key]))
 
         key = "description"
         if key in details and details[key]:
-            preconditions += self._format_text("Description", details[key])
-            details.pop(key)
+            preconditions.append(self._format_text("Description", details[key]))
 
         key = "externalDocs"
         if key in details and details[key]:
-            preconditions += self._format_text("External Docs", details[key])
-            details.pop(key)
+            preconditions.append(self._format_text("External Docs", details[key]))
 
-        return preconditions
+        return "".join(preconditions)
 
     @property
     def steps(self) -> str:
-        details = self.request_details.copy()
-        steps = f"""
+        details = self.request_details
+        steps = [f"""
 Request
 =======
     {self.verb.upper()} {self.path}
-"""
+"""]
 
         key = "parameters"
         if key in details and details[key]:
-            steps += self._format_text("Parameters", details[key])
-            details.pop(key)
+            steps.append(self._format_text("Parameters", details[key]))
 
         key = "requestBody"
         if key in details and details[key]:
-            steps += self._format_text("Request body schema", details[key])
-            details.pop(key)
+            steps.append(self._format_text("Request body schema", details[key]))
 
         key = "security"
         if key in details and details[key]:
-            steps += self._format_text("Security", details[key])
-            details.pop(key)
+            steps.append(self._format_text("Security", details[key]))
 
-        return steps
+        return "".join(steps)
 
     @property
     def expected(self) -> str:
-        details = self.response_details.copy()
-        expected = f"""
+        details = self.response_details
+        expected = [f"""
 Response code
 =======
 {self.response_code} ({self.response_description})
-"""
+"""]
         key = "content"
         if key in details and details[key]:
-            expected += self._format_text("Response content", details[key])
-            details.pop(key)
-        return expected
+            expected.append(self._format_text("Response content", details[key]))
+        return "".join(expected)
 
-    @staticmethod
-    def _format_text(title, details):
+    def _format_text(self, title, details):
         text = f"""
 {title}
 =======
 """
         if type(details) is str:
-            text += details
-        else:
-            details = yaml.dump(details, Dumper=yaml.Dumper)
-            for line in details.splitlines(keepends=True):
-                text += f"    {line}"
-        return text
+            return text + details
+        return text + self.renderer.render(details)
+
+
+class OpenApiCase(TestRailCase):
+    """
+    TestRail case of a response of an OpenAPI operation. Texts of the case are rendered only when its body
+    is needed, most cases already exist in TestRail and only their automation ID and title are used.
+    """
+
+    def __init__(self, openapi_test: OpenApiTestCase):
+        super().__init__(
+            openapi_test.name,
+            custom_automation_id=openapi_test.unique_id,
+            result=TestRailResult(),
+            case_fields={"template_id": 1}
+        )
+        self.openapi_test = openapi_test
+
+    @property
+    def rendered(self) -> bool:
+        return self.openapi_test is None
+
+    def render(self, texts: dict = None):
+        """
+        Adds texts of the case to its case fields, if not added yet.
+
+        :param texts: texts rendered by OpenApiCaseRenderer, rendered here if not given
+        """
+        if self.openapi_test is None:
+            return
+        self.case_fields.update(texts if texts is not None else self.openapi_test.texts)
+        self.openapi_test = None
+
+    def to_dict(self) -> dict:
+        self.render()
+        return super().to_dict()
+
+
+class OpenApiCaseRenderer:
+    """
+    Renders texts of OpenAPI cases whose bodies are about to be sent (see TestRailSuite.case_renderer).
+    Cases of many operations are rendered in a process pool, in chunks of consecutive cases.
+    """
+
+    def __init__(self, paths: dict, environment: Environment, schemas: dict = None, text_limit: int = None):
+        """
+        :param paths: paths of the resolved specification
+        :param schemas: component schemas rendered as references (see SchemaRenderer)
+        :param text_limit: maximum number of characters of each text of a case
+        """
+        self.paths = paths
+        self.env = environment
+        self.schemas = schemas
+        self.text_limit = text_limit
+
+    def render(self, cases: list[TestRailCase]):
+        pending = [case for case in cases if isinstance(case, OpenApiCase) and not case.rendered]
+        operations = {(case.openapi_test.path, case.openapi_test.verb) for case in pending}
+        if len(operations) < OPENAPI_PARALLEL_MIN_OPERATIONS or MAX_WORKERS_OPENAPI_CASES < 2:
+            for case in pending:
+                case.render()
+            return
+        keys = [
+            (case.openapi_test.path, case.openapi_test.verb, case.openapi_test.response_code) for case in pending
+        ]
+        chunk_size = math.ceil(len(keys) / (MAX_WORKERS_OPENAPI_CASES * PARSE_CHUNKS_PER_WORKER))
+        chunks = [keys[start:start + chunk_size] for start in range(0, len(keys), chunk_size)]
+        self.env.log(f"Rendering {len(keys)} test cases of {len(operations)} operations in parallel.")
+        # Suites are uploaded by several threads (see upload_suites), forking from one of them
+        # may copy locks held by the other threads into the workers
+        in_thread = threading.current_thread() is not threading.main_thread()
+        mp_context = multiprocessing.get_context("spawn") if in_thread else None
+        with ProcessPoolExecutor(
+            max_workers=MAX_WORKERS_OPENAPI_CASES, mp_context=mp_context, initializer=_init_case_worker,
+            initargs=(self.paths, self.schemas, self.text_limit)
+        ) as executor:
+            texts = (
+                case_texts for chunk_texts in executor.map(_render_case_texts, chunks) for case_texts in chunk_texts
+            )
+            for case, case_texts in zip(pending, texts):
+                case.render(case_texts)
 
 
 class OpenApiParser(FileParser):
+    VALIDATION_MODES = ["full", "structural", "off"]
+    SCHEMA_RENDERING_MODES = ["inline", "shared"]
+
+    def __init__(
+            self, environment: Environment, filepath: Union[str, Path] = None, resolution_cache: ResolutionCache = None
+    ):
+        """
+        :param filepath: spec to parse, the file given by environment if not given
+        :param resolution_cache: files referenced by specs and their resolved objects, shared by parsers of several specs
+        """
+        super().__init__(environment, filepath)
+        self.validation = environment.validation
+        self.schema_rendering = environment.schema_rendering
+        self.case_text_limit = environment.case_text_limit
+        self.resolution_cache = resolution_cache
+        self.diagnostics = None
 
     def parse_file(self, save: False) -> list[TestRailSuite]:
-        self.env.log(f"Parsing OpenAPI specification.")
+        self.env.log(f"Parsing OpenAPI specification {self.filename}.")
         spec = self.resolve_openapi_spec()
 
         self.log.setup("warning", "txt")
 
-        handle = OpenAPIHandleCases(self)
+        # Diagnostics of sections and cases are written in chunks, lines of cases only in verbose mode
+        self.diagnostics = BufferedLog(self.env, background=bool(self.env.verbose))
+        try:
+            handle = OpenAPIHandleCases(self)
 
-        handle.getSections(spec)
+            handle.getSections(spec)
 
-        sections, case_count = handle.getTestCases(spec)
+            sections, case_count = handle.getTestCases(spec)
+        finally:
+            self.diagnostics.close()
  
         test_suite = TestRailSuite(
             spec["info"]["title"],
             testsections=[section for _name, section in sections.items() if section.testcases],
             source=self.filename
         )
+        test_suite.case_renderer = OpenApiCaseRenderer(
+            spec["paths"], self.env, handle.renderer.schemas, self.case_text_limit
+        )
 
         self.log.save("Warning Data")
         
@@ -160,40 +427,102 @@ class OpenApiParser(FileParser):
         ## Show summary of data extraction from openAPI file
         ##
 
-        self.env.log(f"Processed {case_count} test cases based on possible responses.")       
+        self.env.log(
+            f"Processed {case_count} test cases in {len(test_suite.testsections)} sections based on possible responses."
+        )       
         
         return [test_suite]
 
+    @staticmethod
+    def list_specs(files: Union[str, Path, Iterable[Union[str, Path]]]) -> list[Path]:
+        """Returns specs given by file names or glob patterns, each spec once, in order of the patterns."""
+        if isinstance(files, (str, Path)):
+            files = [files]
+        specs = {}
+        for pattern in files:
+            matches = sorted(glob.glob(str(pattern)))
+            if not matches:
+                raise FileNotFoundError("File not found.")
+            for match in matches:
+                specs.setdefault(Path(match).resolve(), Path(match))
+        return list(specs.values())
+
     def resolve_openapi_spec(self) -> dict:
+        spec_dictionary, error = self.__load_openapi_spec()
+        if error is not None:
+            self.__log_error(error.args)
+
+            raise error  # "This openapi file have internal problems."
+        return spec_dictionary
+
+    def __load_openapi_spec(self) -> tuple[Optional[dict], Optional[Exception]]:
+        """
+        Returns resolved spec or the error of its resolution/validation. With parse cache enabled, both outcomes
+        are cached by content of the spec and checked against content of files referenced by the spec.
+        """
+        if not self.env.parse_cache:
+            spec_dictionary, error, _ = self.__resolve_and_validate()
+            return spec_dictionary, error
+        cache = ParseCache(PARSE_CACHE_DIR)
+        options = {"format": "openapi", "validation": self.validation}
+        cache_key = cache.content_key([self.filepath.read_bytes()], options)
+        cached = cache.load(cache_key)
+        if cached is not None:
+            spec_dictionary, error, documents = cached
+            if all(self.__content_hash(path) == content_hash for path, content_hash in documents.items()):
+                self.env.log(f"Loaded resolved OpenAPI specification from cache.")
+                return spec_dictionary, error
+        spec_dictionary, error, documents = self.__resolve_and_validate()
+        documents = {path: self.__content_hash(path) for path in documents}
+        if not cache.store(cache_key, (spec_dictionary, error, documents)):
+            self.env.vlog(f"Resolved OpenAPI specification could not be cached in {PARSE_CACHE_DIR}.")
+        return spec_dictionary, error
+
+    def __resolve_and_validate(self) -> tuple[Optional[dict], Optional[Exception], list[str]]:
+        """:returns: resolved spec (None if invalid), error and files referenced by the spec"""
         spec_path = self.filepath
         unresolved_spec_dict, spec_url = read_from_filename(str(spec_path.absolute()))
+        resolver = OpenApiRefResolver(unresolved_spec_dict, spec_path, self.resolution_cache)
         try:
-            parser = ResolvingParser(spec_string=json.dumps(unresolved_spec_dict), backend='openapi-spec-validator')
-            spec_dictionary = parser.specification
-            self.__validate_spec_version(spec_dictionary)
-            return spec_dictionary
+            self.__validate_spec(unresolved_spec_dict, spec_url)
+            spec_dictionary = resolver.resolve()
+            if resolver.ignored_siblings:
+                self.env.log(
+                    f"Keys next to $ref are ignored in {len(resolver.ignored_siblings)} references "
+                    f"(e.g. {resolver.ignored_siblings[0]})."
+                )
+            return spec_dictionary, None, resolver.external_documents
         except Exception as e:
-            self.__log_error(e.args)
+            return None, e, resolver.external_documents
 
-            raise e  # "This openapi file have internal problems."
-
-    def __validate_spec_version(self, spec_dictionary):
-
-        list_versions = self.__valid_versions_list()
-        list_validator = self.__get_list_validator()
-
-        for version in list_versions:
-            spec_validator = list_validator[version]
-            try:
-                validate_spec(spec_dictionary, validator=spec_validator)
-                return True
-            except:
-                return False
-
-        raise "This openapi file dont have a 3.x layout version."
+    @staticmethod
+    def __content_hash(path: str) -> Optional[str]:
+        try:
+            return ParseCache.content_hash(Path(path).read_bytes())
+        except OSError:
+            return None
+
+    def __validate_spec(self, unresolved_spec_dict: dict, spec_url: str):
+        """
+        Validates the compact unresolved spec (references are followed by the validator), once.
+        Full validation includes semantic checks (e.g. path parameters), structural validation checks
+        the spec only against the OpenAPI schema. Version of the spec is always checked.
+        """
+        spec_validator = self.__get_list_validator().get(self.__spec_version(unresolved_spec_dict))
+        if spec_validator is None:
+            raise ValueError("This openapi file dont have a 3.x layout version.")
+        if self.validation == "full":
+            spec_validator.validate(unresolved_spec_dict, spec_url=spec_url)
+        elif self.validation == "structural":
+            spec_validator.schema_validator.validate(unresolved_spec_dict)
 
-    def __valid_versions_list(self):
-        return ["OAS 3.0", "OAS 3.1"]
+    @staticmethod
+    def __spec_version(spec_dictionary: dict) -> Optional[str]:
+        version = str(spec_dictionary.get("openapi", ""))
+        for prefix, name in (("3.0.", "OAS 3.0"), ("3.1.", "OAS 3.1")):
+            if version.startswith(prefix):
+                return name
+        return None
 
     def __get_list_validator(self):
         return {
@@ -224,6 +553,31 @@ class OpenApiParser(FileParser):
         self.log.save("Parser Error")   
 
 
+def parse_openapi_specs(environment: Environment, files: list[Path]) -> list[TestRailSuite]:
+    """
+    Parses several specs, in a process pool when there are more of them. Parsers of a process share
+    a resolution cache, so that files referenced by several specs are read and resolved once.
+    Output of each parser is logged once it is done, in order of the specs.
+    """
+    if len(files) < 2 or MAX_WORKERS_PARSE_FILES < 2:
+        resolution_cache = ResolutionCache()
+        return [suite for file in files for suite in OpenApiParser(environment, file, resolution_cache).parse_file(False)]
+    suites = []
+    with ProcessPoolExecutor(
+        max_workers=min(MAX_WORKERS_PARSE_FILES, len(files)), initializer=_init_spec_worker
+    ) as executor:
+        for output, parsed_suites, error in executor.map(_parse_spec, [environment] * len(files), files):
+            if output:
+                environment.log(output, new_line=False)
+            if error is not None:
+                raise error
+            for suite in parsed_suites:
+                # Renderer of the suite renders texts in this process
+                suite.case_renderer.env = environment
+            suites.extend(parsed_suites)
+    return suites
+
+
 class OpenAPIHandleCases():
        
     def __init__(self, parser: OpenApiParser):
@@ -231,8 +585,10 @@ class OpenAPIHandleCases():
         self.parser = parser
         self.log = parser.log
         self.env = parser.env
+        self.diagnostics = parser.diagnostics
 
         self.sections = { "untagged": TestRailSection("untagged") }
+        self.renderer = SchemaRenderer()
 
     def getSections(self, spec: dict):
 
@@ -254,7 +610,7 @@ class OpenAPIHandleCases():
         if "x-tagGroups" in spec:        
             
             for group in spec["x-tagGroups"]:
-                group_name = item.get("name", "null")
+                group_name = group.get("name", "null")
                 if group_name not in self.sections:
                     self.sections[group_name] = OpenAPIGroupSection(self.parser, group_name)   
 
@@ -262,7 +618,7 @@ class OpenAPIHandleCases():
                     if tag not in self.sections:
                         self.log.add(f'Tag {tag} assigned not found!: tag-group {group_name} ')
              
-        self.env.log(f'==============================================================')
+        self.diagnostics.log(f'==============================================================')
            
     ##
     ## Identify the test cases in the openAPI file
@@ -273,6 +629,8 @@ class OpenAPIHandleCases():
         try:
             
             case_count = 0
+            if self.parser.schema_rendering == "shared":
+                self.renderer = SchemaRenderer(spec.get("components", {}).get("schemas"))
             for path, path_data in spec["paths"].items():
 
                 for verb, verb_details in path_data.items():
@@ -289,40 +647,37 @@ class OpenAPIHandleCases():
                     if group not in self.sections:
                         self.sections[group] = OpenAPIShortSection(self.parser, name, description)
                     
-                    for response, response_data in verb_details["responses"].items():
-                        request_details = verb_details.copy()
-                        request_details.pop("responses")
-                        openapi_test = OpenApiTestCase(
-                            path=path,
-                            verb=verb,
-                            operation_id=operationId,
-                            request_details=request_details,
-                            response_code=response,
-                            response_description=response_data.get("description", None),
-                            response_details=response_data
+                    for response in verb_details["responses"]:
+                        openapi_test = OpenApiTestCase.from_operation(
+                            path, verb, verb_details, response, self.renderer, self.parser.case_text_limit
                         )
                         section: TestRailSection = self.sections[group]
-                        section.testcases.append(
-                            TestRailCase(
-                                openapi_test.name,
-                                custom_automation_id=f"{openapi_test.unique_id}",
-                                result=TestRailResult(),
-                                case_fields={
-                                    "template_id": 1,
-                                    "custom_preconds": openapi_test.preconditions,
-                                    "custom_steps": openapi_test.steps,
-                                    "custom_expected": openapi_test.expected
-                                }
-                            )
-                        )
+                        section.testcases.append(OpenApiCase(openapi_test))
 
-                        self.env.log(f' ... {openapi_test.name}')
+                        self.diagnostics.vlog(f' ... {openapi_test.name}')
                         case_count += 1
-            
+
+            if self.renderer.schemas:
+                self.__describe_components()
             return self.sections, case_count
 
         except Exception as e:
-            self.env.log(f'Process Failure: -error: {e}')
+            self.diagnostics.log(f'Process Failure: -error: {e}')
+
+    def __describe_components(self):
+        """Adds component schemas used by cases of each section to the description of the section."""
+        for section in self.sections.values():
+            names = {}
+            for case in section.testcases:
+                self.renderer.component_names(
+                    [case.openapi_test.request_details, case.openapi_test.response_details], names
+                )
+            if names:
+                description = f"{section.description}\n" if section.description else ""
+                section.description = f"""{description}
+Schemas
+=======
+{self.renderer.render_components(names)}"""
 
     ##
     ## Get tag information
@@ -385,17 +740,59 @@ class OpenAPIGroupSection(TestRailSection):
 
     def __init__(self, parser: OpenApiParser, name: str):
         super().__init__(name)
-        parser.env.log(f'Group-Section#: {name}')
+        parser.diagnostics.log(f'Group-Section#: {name}')
 
 class OpenAPITagSection(TestRailSection):
 
     def __init__(self, parser: OpenApiParser, name: str, description = None):
         super().__init__(name, description=description)
-        parser.env.log(f'Tag-Section#: {name}')
+        parser.diagnostics.log(f'Tag-Section#: {name}')
 
 class OpenAPIShortSection(TestRailSection):
 
     def __init__(self, parser: OpenApiParser, name: str, description: str):
         super().__init__(name, description=description)
-        parser.env.log(f'Short-Section#: {name}')
+        parser.diagnostics.log(f'Short-Section#: {name}')
+
+
+# Paths of the spec, renderer and text limit of a worker process rendering test cases (see OpenApiCaseRenderer)
+_worker_paths = None
+_worker_renderer = None
+_worker_text_limit = None
+
 
+def _init_case_worker(paths: dict, schemas: dict = None, text_limit: int = None):
+    global _worker_paths, _worker_renderer, _worker_text_limit
+    _worker_paths = paths
+    _worker_renderer = SchemaRenderer(schemas)
+    _worker_text_limit = text_limit
+
+
+def _render_case_texts(cases: list[tuple[str, str, str]]) -> list[dict]:
+    """Renders texts of test cases, given as (path, verb, response code), in a worker process."""
+    return [
+        OpenApiTestCase.from_operation(
+            path, verb, _worker_paths[path][verb], response, _worker_renderer, _worker_text_limit
+        ).texts
+        for path, verb, response in cases
+    ]
+
+
+# Resolution cache of a worker process parsing specs (see parse_openapi_specs)
+_worker_resolution_cache = None
+
+
+def _init_spec_worker():
+    global _worker_resolution_cache
+    _worker_resolution_cache = ResolutionCache()
+
+
+def _parse_spec(environment: Environment, file: Path) -> tuple[str, list[TestRailSuite], Optional[Exception]]:
+    """Parses spec in a worker process, returns output of the parser, parsed suites and error of parsing."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            suites = OpenApiParser(environment, file, _worker_resolution_cache).parse_file(False)
+        except Exception as error:
+            return output.getvalue(), [], error
+    return output.getvalue(), suites, None
@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import Any, Optional, Union
+from urllib.parse import unquote
+
+from openapi_spec_validator.readers import read_from_filename
+
+
+class ResolutionCache:
+    """
+    Files referenced by specifications and their resolved objects, shared by resolvers of several specifications,
+    so that components shared by the specifications are read and resolved only once.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        # Resolved objects by (document, JSON pointer)
+        self.resolved = {}
+        # Files referenced by each file, in order of first reference
+        self.references = {}
+
+
+class OpenApiRefResolver:
+    """
+    Resolves $ref references of OpenAPI specification in memory. Each referenced object is resolved only once
+    and the resolved object is shared by all references to it, instead of being inlined as a deep copy per
+    reference. References closing a cycle are kept as they are, so the resolved specification is never recursive.
+    Local references (#/components/...) and references to files relative to the referencing document are supported.
+    Keys next to $ref (e.g. description, allowed by OpenAPI 3.1) are ignored, as by OpenAPI 3.0 and by prance,
+    which resolved specifications before. References with such keys are listed in ignored_siblings.
+    """
+
+    def __init__(self, spec: dict, spec_path: Union[str, Path] = None, cache: ResolutionCache = None):
+        """
+        :param spec: unresolved specification
+        :param spec_path: path of the specification file, base of relative file references
+        :param cache: referenced files and their resolved objects, shared with resolvers of other specifications
+        """
+        self.spec = spec
+        self.spec_path = str(Path(spec_path).absolute()) if spec_path is not None else None
+        self.__cache = cache if cache is not None else ResolutionCache()
+        # Files referenced by the specification itself, in order of first reference
+        self.__references = {}
+        # Resolved objects of the specification by (document, JSON pointer)
+        self.__resolved = {}
+        self.__resolving = set()
+        # $ref values of references whose sibling keys were ignored
+        self.ignored_siblings = []
+
+    @property
+    def external_documents(self) -> list[str]:
+        """Files referenced by the specification, directly or by other referenced files."""
+        documents = {}
+        pending = list(self.__references)
+        while pending:
+            document = pending.pop(0)
+            if document != self.spec_path and document not in documents:
+                documents[document] = None
+                pending.extend(self.__cache.references.get(document, ()))
+        return list(documents)
+
+    def resolve(self) -> dict:
+        """Returns resolved specification, the unresolved specification is not modified."""
+        return self.__resolve(self.spec, self.spec_path, "")
+
+    def __resolve(self, node: Any, document: Optional[str], pointer: str) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self.__resolve_reference(node, document)
+            key = (document, pointer)
+            resolved_objects = self.__resolved if document == self.spec_path else self.__cache.resolved
+            resolved = resolved_objects.get(key)
+            if resolved is not None:
+                return resolved
+            self.__resolving.add(key)
+            try:
+                resolved = {
+                    name: self.__resolve(value, document, f"{pointer}/{self.__escape(name)}")
+                    for name, value in node.items()
+                }
+            finally:
+                self.__resolving.discard(key)
+            resolved_objects[key] = resolved
+            return resolved
+        if isinstance(node, list):
+            return [self.__resolve(item, document, f"{pointer}/{index}") for index, item in enumerate(node)]
+        return node
+
+    def __resolve_reference(self, node: dict, document: Optional[str]) -> Any:
+        location, _, pointer = node["$ref"].partition("#")
+        if len(node) > 1:
+            self.ignored_siblings.append(node["$ref"])
+        if location:
+            base = Path(document).parent if document else Path.cwd()
+            referenced = str((base / unquote(location)).resolve())
+            if referenced != document:
+                references = self.__references if document == self.spec_path else \
+                    self.__cache.references.setdefault(document, {})
+                references[referenced] = None
+            document = referenced
+        pointer = unquote(pointer).rstrip("/")
+        key = (document, pointer)
+        if key in self.__resolving:
+            # Reference to an object which is being resolved creates a cycle
+            return node
+        self.__resolving.add(key)
+        try:
+            return self.__resolve(self.__lookup(document, pointer), document, pointer)
+        finally:
+            self.__resolving.discard(key)
+
+    def __lookup(self, document: Optional[str], pointer: str) -> Any:
+        if document == self.spec_path:
+            target = self.spec
+        else:
+            if document not in self.__cache.documents:
+                self.__cache.documents[document], _ = read_from_filename(document)
+            target = self.__cache.documents[document]
+        for token in pointer.split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                target = target[int(token)] if isinstance(target, list) else target[token]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise ValueError(f"Unresolvable reference: {document or ''}#{pointer}")
+        return target
+
+    @staticmethod
+    def __escape(name: Any) -> str:
+        return str(name).replace("~", "~0").replace("/", "~1")
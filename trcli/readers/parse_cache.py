@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+import trcli
+from trcli import settings
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed reports, so that retried uploads do not parse the same report again.
+    Entries are keyed by size, modification time and inode of the report files (or by their content)
+    together with parser options affecting the result. Parsed data is stored pickled.
+    Entries unused for longer than the maximum age are evicted, least recently used entries are evicted
+    when the cache grows over the maximum size.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: Union[str, Path], max_size: int = None, max_age: float = None):
+        """
+        :param max_size: maximum total size of entries in bytes, PARSE_CACHE_MAX_SIZE by default
+        :param max_age: maximum age of unused entries in seconds, PARSE_CACHE_MAX_AGE by default
+        """
+        self.directory = Path(directory)
+        self.max_size = settings.PARSE_CACHE_MAX_SIZE if max_size is None else max_size
+        self.max_age = settings.PARSE_CACHE_MAX_AGE if max_age is None else max_age
+
+    @classmethod
+    def key(cls, files: Iterable[Union[str, Path]], options: dict) -> str:
+        """
+        :param files: report files which are parsed
+        :param options: parser options affecting the parsed data
+        :returns: cache key
+        """
+        identity = {"version": trcli.__version__, "format": cls.FORMAT_VERSION, "options": options, "files": []}
+        for file in files:
+            stat = os.stat(file)
+            identity["files"].append([str(Path(file).resolve()), stat.st_size, stat.st_mtime_ns, stat.st_ino])
+        return cls.__digest(identity)
+
+    @classmethod
+    def content_key(cls, contents: Iterable[bytes], options: dict) -> str:
+        """
+        :param contents: contents of the parsed files, entries stay valid when files are moved or touched
+        :param options: parser options affecting the parsed data
+        :returns: cache key
+        """
+        identity = {
+            "version": trcli.__version__,
+            "format": cls.FORMAT_VERSION,
+            "options": options,
+            "contents": [cls.content_hash(content) for content in contents],
+        }
+        return cls.__digest(identity)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def load(self, key: str) -> Optional[Any]:
+        """Returns cached data or None if there is no usable entry for the key."""
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as file:
+                data = pickle.load(file)
+            # Modification time of entries records their last use
+            with suppress(OSError):
+                os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupted or incompatible entry, it gets replaced by the next store
+            return None
+
+    def store(self, key: str, data: Any) -> bool:
+        """
+        Stores data atomically, so that concurrent jobs never read partially written entries.
+
+        :returns: True if data was stored
+        """
+        file = None
+        stored = False
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(file.name, self.__path(key))
+            stored = True
+        except (OSError, pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            # Data which can not be pickled is not cached
+            return False
+        finally:
+            if not stored and file is not None:
+                with suppress(OSError):
+                    os.remove(file.name)
+        self.evict(keep=key)
+        return True
+
+    def evict(self, keep: str = None):
+        """
+        Removes entries unused for longer than the maximum age and least recently used entries over
+        the maximum size, and temporary files left by interrupted stores.
+
+        :param keep: key of the entry which is never removed
+        """
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.suffix == ".tmp":
+                # Temporary files of stores in progress are recent
+                if now - stat.st_mtime > self.max_age:
+                    with suppress(OSError):
+                        path.unlink()
+            elif path.suffix == ".pickle":
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if path.stem != keep and (now - mtime > self.max_age or total_size > self.max_size):
+                with suppress(OSError):
+                    path.unlink()
+                    total_size -= size
+
+    @staticmethod
+    def __digest(identity: dict) -> str:
+        content = json.dumps(identity, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def __path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
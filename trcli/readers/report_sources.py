@@ -0,0 +1,177 @@
+import bz2
+import fnmatch
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+import zlib
+from contextlib import ExitStack, contextmanager
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+from trcli.constants import FAULT_MAPPING
+from trcli.settings import ARCHIVE_READ_AHEAD_SIZE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TAR_PATTERNS = ("*.tar", "*.tar.gz", "*.tgz", "*.tar.bz2", "*.tbz2", "*.tar.xz", "*.txz")
+COMPRESSED_TAR_PATTERNS = TAR_PATTERNS[1:]
+ZIP_PATTERNS = ("*.zip",)
+DECOMPRESSORS = {
+    ".gz": lambda stream: gzip.GzipFile(fileobj=stream),
+    ".bz2": lambda stream: _Bz2Reader(stream),
+    ".xz": lambda stream: lzma.LZMAFile(stream),
+    ".zst": lambda stream: _zstd_reader(stream),
+}
+
+
+class BadBz2File(OSError):
+    """Raised for corrupted bz2 streams, which bz2 reports as plain OSError."""
+
+
+# Errors raised for corrupted archives and compressed streams
+INVALID_SOURCE_ERRORS = (
+    zipfile.BadZipFile, tarfile.TarError, gzip.BadGzipFile, zlib.error, BadBz2File, lzma.LZMAError, EOFError
+) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+class ReportSource(NamedTuple):
+    """Report file, or report member of a zip/tar archive. Both can be compressed (gz, bz2, xz, zst)."""
+
+    path: str
+    member: Optional[str] = None
+
+    def __str__(self):
+        return f"{self.path}:{self.member}" if self.member else self.path
+
+    @property
+    def compressed(self) -> bool:
+        return PurePosixPath(self.member or self.path).suffix.lower() in DECOMPRESSORS
+
+    @property
+    def sequential(self) -> bool:
+        """Members of compressed tar archives can only be read one after another."""
+        return self.member is not None and _matches(self.path, COMPRESSED_TAR_PATTERNS)
+
+
+def list_report_sources(path: str) -> List[ReportSource]:
+    """Returns the report itself or report members of an archive (XML files, possibly compressed), by name."""
+    if _matches(path, ZIP_PATTERNS):
+        with zipfile.ZipFile(path) as archive:
+            members = [info.filename for info in archive.infolist() if not info.is_dir()]
+    elif _matches(path, TAR_PATTERNS):
+        with tarfile.open(path, "r:*") as archive:
+            members = [info.name for info in archive if info.isfile()]
+    else:
+        return [ReportSource(path)]
+    return [ReportSource(path, member) for member in sorted(members) if _is_report(member)]
+
+
+@contextmanager
+def open_report(source: ReportSource, content: bytes = None) -> Iterator[BinaryIO]:
+    """
+    Opens report for streamed reading, decompressing it on the fly.
+
+    :param content: raw content of the report, already read from archive
+    """
+    with ExitStack() as stack:
+        if content is not None:
+            stream = io.BytesIO(content)
+        elif source.member is None:
+            stream = stack.enter_context(open(source.path, "rb"))
+        elif _matches(source.path, ZIP_PATTERNS):
+            archive = stack.enter_context(zipfile.ZipFile(source.path))
+            stream = stack.enter_context(archive.open(source.member))
+        else:
+            archive = stack.enter_context(tarfile.open(source.path, "r:*"))
+            stream = stack.enter_context(archive.extractfile(source.member))
+        decompressor = DECOMPRESSORS.get(PurePosixPath(source.member or source.path).suffix.lower())
+        if decompressor is not None:
+            stream = stack.enter_context(decompressor(stream))
+        yield stream
+
+
+def iter_sequential_contents(sources: List[ReportSource], read_ahead: int = ARCHIVE_READ_AHEAD_SIZE) -> Iterator[bytes]:
+    """
+    Reads raw contents of members of compressed tar archive in order of sources, in as few passes as possible.
+    Members which are stored before their turn are kept in memory up to read_ahead bytes in total, the others
+    are read by another pass over the archive.
+    """
+    pending = [source.member for source in sources]
+    while pending:
+        wanted = set(pending)
+        read_ahead_contents = {}
+        read_ahead_size = 0
+        found = False
+        with tarfile.open(sources[0].path, "r|*") as archive:
+            for info in archive:
+                if info.name == pending[0]:
+                    found = True
+                    wanted.discard(pending.pop(0))
+                    yield archive.extractfile(info).read()
+                    while pending and pending[0] in read_ahead_contents:
+                        content = read_ahead_contents.pop(pending[0])
+                        read_ahead_size -= len(content)
+                        wanted.discard(pending.pop(0))
+                        yield content
+                    if not pending:
+                        return
+                elif info.name in wanted and info.name not in read_ahead_contents \
+                        and read_ahead_size + info.size <= read_ahead:
+                    read_ahead_contents[info.name] = archive.extractfile(info).read()
+                    read_ahead_size += info.size
+        if not found:
+            raise tarfile.ReadError(f"Member {pending[0]} not found in {sources[0].path}.")
+
+
+def _is_report(name: str) -> bool:
+    name = name.lower()
+    suffix = PurePosixPath(name).suffix
+    if suffix in DECOMPRESSORS:
+        name = name[: -len(suffix)]
+    return name.endswith(".xml")
+
+
+def _matches(path: str, patterns: tuple) -> bool:
+    name = PurePosixPath(path).name.lower()
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _zstd_reader(stream: BinaryIO) -> BinaryIO:
+    if zstandard is None:
+        raise ImportError(FAULT_MAPPING["zstd_not_available"])
+    return zstandard.ZstdDecompressor().stream_reader(stream)
+
+
+class _Bz2Reader(bz2.BZ2File):
+    """BZ2File raising BadBz2File for corrupted streams, errors of the underlying file (with errno) are kept."""
+
+    def read(self, size=-1):
+        with _bz2_errors():
+            return super().read(size)
+
+    def read1(self, size=-1):
+        with _bz2_errors():
+            return super().read1(size)
+
+    def readinto(self, b):
+        with _bz2_errors():
+            return super().readinto(b)
+
+    def readline(self, size=-1):
+        with _bz2_errors():
+            return super().readline(size)
+
+
+@contextmanager
+def _bz2_errors():
+    try:
+        yield
+    except OSError as error:
+        if type(error) is OSError and error.errno is None:
+            raise BadBz2File(*error.args) from error
+        raise
@@ -0,0 +1,121 @@
+import fnmatch
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, Union
+
+from trcli.settings import WATCH_POLL_INTERVAL
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+
+class ReportWatcher:
+    """
+    Watches a directory for reports matching file name pattern and yields each of them once it is complete.
+    Uses inotify (when inotify_simple is installed) to get notified about reports closed after writing or
+    moved into the directory, otherwise the directory is polled and a report is considered complete when
+    its size and modification time did not change between two polls.
+    Reports already present in the directory are yielded too. Watching ends after timeout seconds without
+    a new report. Reports which could not be processed can be retried, they are yielded again once they change.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        pattern: str = "*.xml",
+        timeout: float = 600,
+        poll_interval: float = WATCH_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and INotify is not None
+        self.__seen = set()
+        # Reports which are possibly still written: path -> (size, modification time)
+        self.__pending: Dict[Path, Tuple[int, int]] = {}
+        # Retried reports: path -> (size, modification time) when they could not be processed
+        self.__retried: Dict[Path, Tuple[int, int]] = {}
+
+    def __iter__(self) -> Iterator[Path]:
+        if not self.directory.is_dir():
+            raise FileNotFoundError("Directory not found.")
+        if self.use_inotify:
+            return self.__watch_events()
+        return self.__watch_polling()
+
+    def __watch_polling(self) -> Iterator[Path]:
+        last_report = time.monotonic()
+        while True:
+            completed = self.__poll(self.__list_reports())
+            yield from completed
+            now = time.monotonic()
+            if completed:
+                last_report = now
+            elif now - last_report >= self.timeout:
+                return
+            time.sleep(self.poll_interval)
+
+    def __watch_events(self) -> Iterator[Path]:
+        with INotify() as inotify:
+            inotify.add_watch(self.directory, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+            last_report = time.monotonic()
+            # Reports written before watching started are polled until they are complete
+            self.__poll(self.__list_reports())
+            while True:
+                events = inotify.read(timeout=int(self.poll_interval * 1000))
+                completed = self.__poll(list(self.__pending))
+                for event in events:
+                    path = self.directory / event.name
+                    if path not in self.__seen and self.__matches(path):
+                        self.__pending.pop(path, None)
+                        self.__retried.pop(path, None)
+                        self.__seen.add(path)
+                        completed.append(path)
+                yield from completed
+                now = time.monotonic()
+                if completed:
+                    last_report = now
+                elif now - last_report >= self.timeout:
+                    return
+
+    def retry(self, path: Path):
+        """Yields the report again once it changes, e.g. when it was yielded before it was completely written."""
+        self.__seen.discard(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return
+        self.__retried[path] = (stat.st_size, stat.st_mtime_ns)
+
+    def __list_reports(self) -> list[Path]:
+        return sorted(path for path in self.directory.iterdir() if self.__matches(path))
+
+    def __poll(self, reports: list[Path]) -> list[Path]:
+        """Returns reports which did not change since previous poll."""
+        completed = []
+        for path in reports:
+            if path in self.__seen:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self.__pending.pop(path, None)
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self.__retried.get(path) == signature:
+                continue
+            if stat.st_size and self.__pending.get(path) == signature:
+                del self.__pending[path]
+                self.__retried.pop(path, None)
+                self.__seen.add(path)
+                completed.append(path)
+            else:
+                self.__pending[path] = signature
+        return completed
+
+    def __matches(self, path: Path) -> bool:
+        return fnmatch.fnmatch(path.name, self.pattern) and path.is_file()
@@ -1,6 +1,23 @@
+import os
+from pathlib import Path
+
 MAX_WORKERS_ADD_CASE = 10
 MAX_WORKERS_ADD_RESULTS = 10
+VERIFY_BATCH_SIZE = 50
+MAX_WORKERS_PARSE_FILES = os.cpu_count() or 1
+PARSE_CHUNKS_PER_WORKER = 4
+ARCHIVE_READ_AHEAD_SIZE = 64 * 1024 * 1024
 DEFAULT_API_CALL_RETRIES = 3
 DEFAULT_API_CALL_TIMEOUT = 30
 DEFAULT_BATCH_SIZE = 50
 ALLOW_ELAPSED_MS = False
+PARSE_CACHE_DIR = Path.home() / ".cache" / "trcli"
+PARSE_CACHE_MAX_SIZE = 4 * 1024 ** 3
+PARSE_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+WATCH_POLL_INTERVAL = 2
+PIPELINE_QUEUE_SIZE = 64
+MAX_WORKERS_OPENAPI_CASES = os.cpu_count() or 1
+OPENAPI_PARALLEL_MIN_OPERATIONS = 500
+MAX_WORKERS_UPLOAD_SUITES = 4
+LOG_BUFFER_LINES = 1000
+LOG_FILE_BUFFER_SIZE = 1024 * 1024